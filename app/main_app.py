@@ -4,6 +4,7 @@ ETF RAG 챗봇 메인 애플리케이션
 - ETF 분석, 추천, 비교 기능 제공
 - 사용자 레벨 및 투자 성향별 맞춤 서비스
 - 대화형 인터페이스 및 시각화 제공
+- LLM 답변은 토큰이 도착하는 대로 스트리밍 표시 (차트는 먼저 표시)
 """
 
 import streamlit as st
@@ -12,7 +13,7 @@ import sys
 import os
 import logging
 import re
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 # 프로젝트 루트 경로 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -21,30 +22,92 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from chatbot.etf_analysis import analyze_etf, LEVEL_PROMPTS, plot_etf_bar, plot_etf_summary_bar
 from chatbot.clova_client import ClovaClient
 from chatbot.recommendation_engine import ETFRecommendationEngine
-from chatbot.etf_comparison import ETFComparison
+from chatbot.etf_comparison import (
+    ETFComparison, MAX_LARGE_COMPARISON_ETFS, CUMULATIVE_RETURN_WINDOWS,
+    DEFAULT_CUMULATIVE_RETURN_WINDOW, cumulative_return_chart_name
+)
 from chatbot.config import Config
+from chatbot.cache_store import CacheStore
+from chatbot.diversity import SimilarityIndex
+from chatbot.screener import parse_screen_query
+from chatbot.result_cache import ResultCache, result_key
+from chatbot.fingerprint import combine_fingerprints
 from chatbot.utils import (
     extract_etf_name_from_input, validate_user_profile,
-    safe_read_csv_with_fallback
+    safe_read_csv_with_fallback, normalize_etf_name
 )
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 앱에서 읽는 원본 데이터 종류 (Config.DATA_PATHS 키)
+DATA_TYPES = ['etf_info', 'etf_prices', 'etf_performance', 'etf_aum', 'etf_reference', 'etf_risk']
+
+# 비교 요청 키워드 (요청 유형 분류, ETF명 추출 시 제거)
+COMPARE_KEYWORDS = ["비교", "비교해줘", "비교해주세요", "vs", "대", "차이", "어떤게", "어느게"]
+
+@st.cache_resource
+def get_cache_store() -> CacheStore:
+    """점수 캐시 조회기 (Streamlit 프로세스당 1개, 재실행 간 메모리 사본 유지)"""
+    config = Config()
+    return CacheStore(
+        config.get_data_path('cache'),
+        config.get_data_path('cache_manifest'),
+        config.get_data_path('cache_topk')
+    )
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """요청 결과 캐시 (Streamlit 프로세스당 1개, 세션 간 공유)"""
+    config = Config()
+    settings = config.RESULT_CACHE_SETTINGS
+    return ResultCache(
+        max_entries=settings['max_entries'],
+        ttl_seconds=settings['ttl_seconds'],
+        disk_path=config.get_data_path('result_cache') if settings['disk'] else None,
+        max_disk_entries=settings['max_disk_entries']
+    )
+
+@st.cache_resource
+def get_llm_cache() -> ResultCache:
+    """LLM 응답 캐시 (Streamlit 프로세스당 1개, 세션 간 공유, ETF_LLM_CACHE_DISK=1이면 디스크 계층 사용)"""
+    config = Config()
+    settings = config.LLM_CACHE_SETTINGS
+    return ResultCache(
+        max_entries=settings['max_entries'],
+        ttl_seconds=settings['ttl_seconds'],
+        disk_path=config.get_data_path('llm_cache') if settings['disk'] else None,
+        max_disk_entries=settings['max_disk_entries']
+    )
+
+@st.cache_resource
+def load_similarity_index(path: str, mtime: float) -> Optional[SimilarityIndex]:
+    """다양성 재정렬용 유사 이웃 (파일 수정 시각이 바뀌면 다시 로드)"""
+    return SimilarityIndex.load(path)
+
 class ETFChatbotApp:
     """ETF 챗봇 애플리케이션 클래스"""
     
     def __init__(self):
         """애플리케이션 초기화"""
         self.config = Config()
-        self.clova_client = ClovaClient()
+        self.clova_client = ClovaClient(response_cache=get_llm_cache())
         self.recommendation_engine = ETFRecommendationEngine()
-        self.comparison_engine = ETFComparison()
+        
+        # 요청 결과 캐시 (같은 질문은 추천/비교 계산과 LLM 호출 없이 응답)
+        self.result_cache = get_result_cache()
+        
+        # 점수 캐시 조회기 (세션 간 공유, 캐시가 다시 게시되면 다음 요청부터 새 버전 사용)
+        self.cache_store = get_cache_store()
+        self.comparison_engine = ETFComparison(cache_store=self.cache_store, chart_cache=self.result_cache)
         
         # 데이터 로딩 (캐싱 적용)
         self.data = self._load_data()
         
+        # 이번 요청에서 표시할 시각화 (처리가 끝나면 세션 상태에 저장)
+        self.visualizations = None
+        
         logger.info("ETF 챗봇 애플리케이션 초기화 완료")
 
     @st.cache_data
@@ -59,9 +122,7 @@ class ETFChatbotApp:
             data = {}
             
             # 각 데이터 파일 로딩
-            data_types = ['etf_info', 'etf_prices', 'etf_performance', 'etf_aum', 'etf_reference', 'etf_risk']
-            
-            for data_type in data_types:
+            for data_type in DATA_TYPES:
                 file_path = _self.config.get_data_path(data_type)
                 if file_path and os.path.exists(file_path):
                     # 안전한 CSV 읽기 사용
@@ -130,6 +191,64 @@ class ETFChatbotApp:
             help="투자 성향과 스타일을 선택하세요."
         )
         self.user_investor_type = investor_type_display
+        
+        # 추천 다양성 재정렬 (같은 기초지수/수익률이 비슷한 ETF 중복 완화)
+        self.diversify = st.sidebar.checkbox(
+            "🧩 비슷한 ETF 중복 줄이기",
+            value=self.config.DIVERSITY_DEFAULT_ENABLED,
+            help="같은 기초지수를 추종하거나 수익률 움직임이 비슷한 ETF가 추천 목록에 몰리지 않도록 분산합니다."
+        )
+        
+        # Level 3: 투자 차원 가중치 직접 조정
+        self.custom_weights = None
+        if self.config.get_level_number(self.user_level) >= self.config.CUSTOM_WEIGHTS_MIN_LEVEL:
+            self._setup_custom_weights()
+        
+        # LLM 응답 캐시 상태 / 디버깅용 우회
+        self._setup_llm_cache_panel()
+
+    def _setup_llm_cache_panel(self):
+        """LLM 응답 캐시 적중률 표시 및 우회 옵션"""
+        stats = self.clova_client.cache_stats()
+        if stats is None:
+            return
+        with st.sidebar.expander("🗄️ LLM 응답 캐시"):
+            self.clova_client.cache_bypass = st.checkbox(
+                "캐시 우회 (디버깅용)",
+                value=self.clova_client.cache_bypass,
+                help="저장된 응답을 사용하지 않고 매번 CLOVA API를 호출합니다."
+            )
+            hit_rate = f"{stats['hit_rate']:.0%}" if stats['hit_rate'] is not None else "-"
+            st.caption(
+                f"적중률 {hit_rate} · 적중 {stats['hits'] + stats['disk_hits']} "
+                f"(디스크 {stats['disk_hits']}) · 미적중 {stats['misses']} · 항목 {stats['entries']}"
+            )
+
+    def _setup_custom_weights(self):
+        """투자 차원 가중치 슬라이더 (선택한 투자자 유형의 가중치에서 시작)"""
+        use_custom = st.sidebar.checkbox(
+            "🎚️ 차원 가중치 직접 조정",
+            value=False,
+            help="투자자 유형의 고정 가중치 대신 8개 투자 차원의 비중을 직접 정합니다. (합계는 자동으로 100%로 맞춰집니다)"
+        )
+        if not use_custom:
+            return
+        
+        type_weights = self.config.INVESTOR_TYPE_WEIGHTS.get(self.user_investor_type, {})
+        weights = {}
+        for dimension, label in self.config.INVESTOR_DIMENSION_LABELS.items():
+            weights[dimension] = st.sidebar.slider(
+                f"{label} ({dimension})",
+                min_value=0.0, max_value=1.0,
+                value=float(type_weights.get(dimension, 0.0)),
+                step=0.05,
+                key=f"custom_weight_{dimension}"
+            )
+        
+        if sum(weights.values()) <= 0:
+            st.sidebar.warning("가중치가 모두 0이면 투자자 유형 가중치를 사용합니다.")
+            return
+        self.custom_weights = weights
 
     def run(self):
         """메인 애플리케이션 실행"""
@@ -185,21 +304,53 @@ class ETFChatbotApp:
             placeholder="예: 반도체 ETF 5개 추천해줘"
         )
         
-        if user_input:
-            # 사용자 프로필 생성
-            user_profile = {
-                "level": self.config.get_level_number(self.user_level),
-                "investor_type": self.user_investor_type
-            }
-            
-            # 요청 유형 분류 및 처리
-            response = self._process_user_request(user_input, user_profile)
-            
-            # 채팅 히스토리에 추가
-            st.session_state.chat_history.append(("user", user_input))
-            st.session_state.chat_history.append(("bot", response))
+        if not user_input:
+            st.session_state.pop("last_request", None)
+            return
+        
+        # 사용자 프로필 생성
+        user_profile = {
+            "level": self.config.get_level_number(self.user_level),
+            "investor_type": self.user_investor_type
+        }
+        if self.custom_weights:
+            user_profile["custom_weights"] = self.custom_weights
+        
+        # 입력값은 재실행 사이에 유지되므로 같은 질문/프로필/다양성 설정으로 재실행되면
+        # (차트 기간 선택 등 표시만 바꾸는 위젯) 요청을 다시 처리하지 않고 저장된 시각화만 다시 표시
+        request_key = (user_input, repr(sorted(user_profile.items())), self.diversify)
+        last_request = st.session_state.get("last_request")
+        if last_request is not None and last_request["key"] == request_key:
+            self._display_visualizations(last_request["visualizations"])
+            return
+        
+        # 요청 유형 분류 및 처리
+        self.visualizations = None
+        response = self._process_user_request(user_input, user_profile)
+        
+        # 시각화를 먼저 표시
+        self._display_visualizations(self.visualizations)
+        
+        # 스트리밍 답변은 토큰이 도착하는 대로 표시하고,
+        # 끝나면 임시 표시를 지우고 채팅 히스토리로 옮김
+        if not isinstance(response, str):
+            placeholder = st.empty()
+            with placeholder.container():
+                response = st.write_stream(response)
+            placeholder.empty()
+            if not isinstance(response, str):
+                response = "".join(str(chunk) for chunk in response)
+        
+        # 처리한 요청과 시각화를 저장하고 채팅 히스토리에 추가 (새로 처리한 요청일 때만)
+        st.session_state.last_request = {
+            "key": request_key,
+            "visualizations": self.visualizations,
+            "response": response
+        }
+        st.session_state.chat_history.append(("user", user_input))
+        st.session_state.chat_history.append(("bot", response))
 
-    def _process_user_request(self, user_input: str, user_profile: Dict) -> str:
+    def _process_user_request(self, user_input: str, user_profile: Dict) -> Union[str, Iterator[str]]:
         """
         사용자 요청 처리
         
@@ -208,14 +359,13 @@ class ETFChatbotApp:
             user_profile: 사용자 프로필
         
         Returns:
-            처리 결과 응답
+            처리 결과 응답 (LLM 답변을 새로 생성하면 텍스트 청크 스트림)
         """
         # 요청 유형 키워드 정의
         recommend_keywords = ["추천", "추천해줘", "추천해주세요", "추천해주", "추천해"]
-        compare_keywords = ["비교", "비교해줘", "비교해주세요", "vs", "대", "차이", "어떤게", "어느게"]
         
         is_recommendation = any(keyword in user_input for keyword in recommend_keywords)
-        is_comparison = any(keyword in user_input for keyword in compare_keywords)
+        is_comparison = any(keyword in user_input for keyword in COMPARE_KEYWORDS)
         
         try:
             if is_recommendation:
@@ -229,26 +379,44 @@ class ETFChatbotApp:
             logger.error(f"요청 처리 중 오류: {e}")
             return f"요청 처리 중 오류가 발생했습니다: {str(e)}"
 
-    def _handle_recommendation_request(self, user_input: str, user_profile: Dict) -> str:
+    def _handle_recommendation_request(self, user_input: str, user_profile: Dict) -> Union[str, Iterator[str]]:
         """추천 요청 처리"""
         try:
             # 추천 개수 추출
             number_match = re.search(r'(\d+)개', user_input)
             top_n = int(number_match.group(1)) if number_match else 5
             
-            # 카테고리 키워드 추출
-            category_keyword = self._extract_category_keyword(user_input)
+            # 조건 검색 조건 추출 (총보수/자산규모/운용사/레버리지 제외 등) 후 나머지 문장에서 카테고리 키워드 추출
+            screen_conditions, remaining_input = parse_screen_query(user_input)
+            category_keyword = self._extract_category_keyword(remaining_input)
             
-            # 캐시 데이터 로드
-            cache_path = self.config.get_data_path('cache')
-            if not os.path.exists(cache_path):
+            # 캐시 데이터 조회 (메모리 사본 재사용, 새 버전이 게시되었으면 교체)
+            cache_df, topk_views = self.cache_store.snapshot()
+            if cache_df is None:
                 return "추천 캐시 데이터를 찾을 수 없습니다. 먼저 캐시를 생성해주세요."
             
-            cache_df = pd.read_csv(cache_path, encoding='utf-8-sig')
+            # 결과 캐시 조회 (정규화된 요청 + 프로필 + 데이터 버전이 같으면 저장된 답변 사용)
+            similarity = self._get_similarity_index() if self.diversify else None
+            request = [
+                user_profile.get('level'), user_profile.get('investor_type'), user_profile.get('custom_weights'),
+                category_keyword.strip().lower(), top_n, screen_conditions,
+                similarity.built_at if similarity is not None else None
+            ]
+            data_version = self._data_version()
+            answer_key = result_key('recommend_answer', data_version, self.clova_client.model, *request)
+            cached_answer = self.result_cache.get(answer_key)
+            if cached_answer is not None:
+                return cached_answer
             
-            # ETF 추천 실행
-            recommendations = self.recommendation_engine.fast_recommend_etfs(
-                user_profile, cache_df, category_keyword=category_keyword, top_n=top_n
+            # ETF 추천 실행 (사전 계산 상위 K개 목록이 있으면 우선 사용)
+            recommendations = self.result_cache.get_or_compute(
+                result_key('recommend', data_version, *request),
+                lambda: self.recommendation_engine.fast_recommend_etfs(
+                    user_profile, cache_df, category_keyword=category_keyword, top_n=top_n,
+                    topk_views=topk_views, custom_weights=user_profile.get('custom_weights'),
+                    similarity=similarity, screen_conditions=screen_conditions
+                ),
+                cacheable=lambda records: not (records and '오류가 발생' in str(records[0].get('안내', '')))
             )
             
             # 안내 메시지만 있을 때는 LLM 호출 없이 안내 문구만 출력
@@ -258,9 +426,9 @@ class ETFChatbotApp:
             if recommendations:
                 # 추천 설명 생성
                 explanation_prompt = self.recommendation_engine.generate_recommendation_explanation(
-                    recommendations, user_profile, category_keyword
+                    recommendations, user_profile, category_keyword, screen_conditions=screen_conditions
                 )
-                return self.clova_client.generate_response(explanation_prompt)
+                return self._stream_answer(explanation_prompt, data_version, answer_key)
             else:
                 return f"'{category_keyword}' 조건에 맞는 ETF를 찾을 수 없습니다. 다른 키워드로 다시 시도해보세요."
                 
@@ -268,19 +436,77 @@ class ETFChatbotApp:
             logger.error(f"추천 요청 처리 오류: {e}")
             return f"추천 처리 중 오류가 발생했습니다: {str(e)}"
 
-    def _handle_comparison_request(self, user_input: str, user_profile: Dict) -> str:
+    def _data_version(self) -> str:
+        """결과 캐시 키용 데이터 버전 (점수 캐시 빌드 식별자 + 원본 데이터 파일 수정 시각)"""
+        self.cache_store.get()
+        mtimes = []
+        for data_type in DATA_TYPES:
+            path = self.config.get_data_path(data_type)
+            mtimes.append(os.path.getmtime(path) if path and os.path.exists(path) else None)
+        return combine_fingerprints(self.cache_store.version, *mtimes)
+
+    def _stream_answer(self, prompt: str, data_version: str, answer_key: str) -> Union[str, Iterator[str]]:
+        """
+        LLM 답변 스트림 (끝까지 오류 없이 받으면 결과 캐시에 저장)
+        
+        Args:
+            prompt: LLM 프롬프트
+            data_version: 데이터 버전 (LLM 응답 캐시 키)
+            answer_key: 결과 캐시의 최종 답변 키
+        
+        Returns:
+            텍스트 청크 스트림 (API 미설정이면 안내 문구)
+        """
+        if not self.clova_client.is_configured():
+            return self.clova_client.generate_response(prompt)
+        
+        def store_answer(response: str):
+            if self._is_cacheable_answer(response):
+                self.result_cache.set(answer_key, response)
+        
+        return self.clova_client.stream_response(prompt, snapshot=data_version, on_complete=store_answer)
+
+    def _is_cacheable_answer(self, response: str) -> bool:
+        """LLM 응답 저장 여부 (API 미설정/호출 오류 응답은 저장하지 않고 다음 요청에서 다시 시도)"""
+        return bool(response) and self.clova_client.is_configured() and not response.startswith('⚠️')
+
+    def _get_similarity_index(self) -> Optional[SimilarityIndex]:
+        """유사 이웃 인덱스 (파일이 없으면 None → 점수 순서 그대로 추천)"""
+        path = self.config.get_data_path('cache_similarity')
+        if not os.path.exists(path):
+            return None
+        return load_similarity_index(path, os.path.getmtime(path))
+
+    def _handle_comparison_request(self, user_input: str, user_profile: Dict) -> Union[str, Iterator[str]]:
         """비교 요청 처리"""
         try:
-            # ETF명 추출
-            etf_names = self._extract_etf_names(user_input)
+            # ETF명 추출 (직접 나열한 ETF가 2개 이상이면 그대로 비교, 아니면 카테고리 전체 비교 또는 키워드 검색)
+            etf_names = self._extract_listed_etf_names(user_input)
+            if len(etf_names) < 2:
+                etf_names = self._extract_category_comparison(user_input, user_profile) or self._extract_etf_names(user_input)
             
             if len(etf_names) < 2:
                 return "비교할 ETF를 2개 이상 명확히 입력해주세요. (예: 'KODEX 200 vs TIGER 200 비교해줘')"
             
-            # ETF 비교 실행
-            comparison_result = self.comparison_engine.compare_etfs(
-                etf_names, user_profile, 
-                self.data['etf_prices'], self.data['etf_info']
+            # 결과 캐시 키 (같은 ETF 조합은 입력 순서와 무관하게 같은 요청)
+            request = [
+                sorted(normalize_etf_name(name) for name in etf_names),
+                user_profile.get('level'), user_profile.get('investor_type')
+            ]
+            data_version = self._data_version()
+            
+            # ETF 비교 실행 (결과에 표/차트 생성 함수가 있어 메모리 계층에만 저장됨,
+            # 차트 JSON은 표시할 때 생성되어 별도 키로 저장)
+            comparison_result = self.result_cache.get_or_compute(
+                result_key('compare', data_version, *request),
+                lambda: self.comparison_engine.compare_etfs(
+                    etf_names, user_profile, 
+                    self.data['etf_prices'], self.data['etf_info'],
+                    snapshot=data_version,
+                    perf_df=self.data['etf_performance'], aum_df=self.data['etf_aum'],
+                    ref_idx_df=self.data['etf_reference'], risk_df=self.data['etf_risk']
+                ),
+                cacheable=lambda result: bool(result) and 'error' not in result
             )
             
             # 비교 결과가 없거나 에러가 있으면 안내 문구만 출력
@@ -297,6 +523,10 @@ class ETFChatbotApp:
                 except Exception:
                     level_num = 2
             level_prompt = LEVEL_PROMPTS.get(level_num, "")
+            if comparison_result.get('mode') == 'large':
+                comparison_targets = "상위 ETF들(나머지 ETF 요약 통계 대비)"
+            else:
+                comparison_targets = "두 ETF"
             comparison_prompt = f"""{level_prompt}
 아래 ETF 비교 분석 결과를 바탕으로 사용자에게 맞춤형 분석과 추천사항을 제공해주세요.
 
@@ -304,20 +534,23 @@ class ETFChatbotApp:
 
 다음 내용을 포함해서 설명해주세요:
 1. 사용자 프로필(레벨, 투자자 유형)에 가장 적합한 ETF를 1개만 명확히 골라 추천하고, 그 이유를 구체적으로 설명하세요.
-2. 두 ETF의 장단점, 투자 시 주의사항, 구체적인 투자 전략을 비교해 설명하세요.
+2. {comparison_targets}의 장단점, 투자 시 주의사항, 구체적인 투자 전략을 비교해 설명하세요.
 3. 데이터(점수, 위험, 수익률 등)에 근거한 판단을 반드시 포함하세요.
 4. 각 ETF의 순위(1위, 2위 등)를 명확히 표시하세요.
 
 사용자의 레벨에 맞는 어투와 깊이로 작성하고, 데이터 기반 근거를 포함해주세요.
 """
-            response = self.clova_client.generate_response(comparison_prompt)
-            self._display_comparison_visualizations(comparison_result)
+            answer_key = result_key('compare_answer', data_version, self.clova_client.model, *request)
+            response = self.result_cache.get(answer_key)
+            if response is None:
+                response = self._stream_answer(comparison_prompt, data_version, answer_key)
+            self.visualizations = ("comparison", comparison_result)
             return response
         except Exception as e:
             logger.error(f"비교 요청 처리 오류: {e}")
             return f"비교 처리 중 오류가 발생했습니다: {str(e)}"
 
-    def _handle_analysis_request(self, user_input: str, user_profile: Dict) -> str:
+    def _handle_analysis_request(self, user_input: str, user_profile: Dict) -> Union[str, Iterator[str]]:
         """분석 요청 처리"""
         try:
             # ETF명 추출
@@ -331,11 +564,11 @@ class ETFChatbotApp:
                 self.data['etf_reference'], self.data['etf_risk']
             )
             
-            # LLM 응답 생성
-            response = self.clova_client.generate_etf_analysis(etf_info, user_profile)
+            # LLM 응답 스트림 (시각화를 먼저 표시한 뒤 토큰이 도착하는 대로 표시)
+            response = self.clova_client.stream_etf_analysis(etf_info, user_profile, snapshot=self._data_version())
             
-            # 시각화 표시 
-            self._display_etf_visualizations(etf_info)
+            # 시각화 등록 (응답 스트림보다 먼저 표시)
+            self.visualizations = ("analysis", etf_info)
             
             return response
             
@@ -353,29 +586,8 @@ class ETFChatbotApp:
         Returns:
             추출된 카테고리 키워드 또는 빈 문자열
         """
-        # ETF 관련 주요 키워드 정의
-        keywords = [
-            # 기술 관련
-            '반도체', 'AI', '인공지능', '메타버스', '블록체인', '클라우드',
-            # 바이오/헬스케어
-            '바이오', '생명공학', '헬스케어', '제약', '의료',
-            # 금융
-            '금융', '은행', '보험', '증권',
-            # 에너지/자원
-            '에너지', '태양광', '풍력', '원자재', '원유', '가스',
-            # 자동차/교통
-            '자동차', '전기차', '배터리', '모빌리티',
-            # 부동산
-            '부동산', 'REITs', '리츠',
-            # 채권
-            '채권', '국채', '기업채', '회사채',
-            # 원자재/통화
-            '금', '은', '달러', '엔화', '유로', '위안',
-            # 지역
-            '중국', '미국', '일본', '유럽', '신흥국', '한국',
-            # 투자 스타일
-            '배당', '성장', '가치', '소형주', '대형주', '중형주'
-        ]
+        # ETF 관련 주요 키워드 (Config에서 관리, 캐시 빌더의 사전 계산 목록과 공유)
+        keywords = self.config.CATEGORY_KEYWORDS
         
         user_input_lower = user_input.lower()
         for keyword in keywords:
@@ -390,19 +602,45 @@ class ETFChatbotApp:
         
         return ""
 
-    def _extract_etf_names(self, user_input: str) -> List[str]:
+    def _extract_category_comparison(self, user_input: str, user_profile: Dict) -> List[str]:
         """
-        사용자 입력에서 ETF명 추출
+        카테고리 전체 비교 요청에서 비교 대상 ETF명 추출 (예: "반도체 ETF 전체 비교", "2차전지 ETF 30개 비교")
         
         Args:
             user_input: 사용자 입력 텍스트
+            user_profile: 사용자 프로필 (레벨 위험도 제한 적용)
         
         Returns:
-            추출된 ETF명 리스트 (최대 6개)
+            카테고리 ETF명 리스트 (점수순, 최대 MAX_LARGE_COMPARISON_ETFS개, 해당 요청이 아니면 빈 리스트)
         """
-        compare_keywords = ["비교", "비교해줘", "비교해주세요", "vs", "대", "차이", "어떤게", "어느게"]
+        number_match = re.search(r'(\d+)개', user_input)
+        if not number_match and not any(keyword in user_input for keyword in ["전체", "모두", "전부"]):
+            return []
         
-        # 구분자로 분리 시도
+        category_keyword = self._extract_category_keyword(user_input)
+        if not category_keyword:
+            return []
+        
+        cache_df, topk_views = self.cache_store.snapshot()
+        if cache_df is None:
+            return []
+        
+        top_n = min(int(number_match.group(1)) if number_match else MAX_LARGE_COMPARISON_ETFS, MAX_LARGE_COMPARISON_ETFS)
+        recommendations = self.recommendation_engine.fast_recommend_etfs(
+            user_profile, cache_df, category_keyword=category_keyword, top_n=top_n, topk_views=topk_views
+        )
+        return [rec['ETF명'] for rec in recommendations if rec.get('ETF명')]
+
+    def _extract_listed_etf_names(self, user_input: str) -> List[str]:
+        """
+        구분자(vs, 쉼표, 와/과 등)로 직접 나열한 ETF명 추출
+        
+        Args:
+            user_input: 사용자 입력 텍스트
+        
+        Returns:
+            나열된 ETF명 리스트 (최대 6개, 2개 미만이면 빈 리스트)
+        """
         separators = [',', ' vs ', ' 대 ', ' VS ', '랑', ' 랑 ', ' 와 ', ' 과 ', '/']
         
         for sep in separators:
@@ -413,7 +651,7 @@ class ETFChatbotApp:
                 for part in parts:
                     clean_name = part.strip()
                     # 비교 키워드 제거
-                    for keyword in compare_keywords:
+                    for keyword in COMPARE_KEYWORDS:
                         clean_name = clean_name.replace(keyword, '').strip()
                     
                     if clean_name and len(clean_name) > 2:
@@ -421,10 +659,26 @@ class ETFChatbotApp:
                 
                 if len(etf_names) >= 2:
                     return etf_names[:6]  # 최대 6개
+        return []
+
+    def _extract_etf_names(self, user_input: str) -> List[str]:
+        """
+        사용자 입력에서 ETF명 추출
+        
+        Args:
+            user_input: 사용자 입력 텍스트
+        
+        Returns:
+            추출된 ETF명 리스트 (최대 6개)
+        """
+        # 구분자로 분리 시도
+        etf_names = self._extract_listed_etf_names(user_input)
+        if etf_names:
+            return etf_names
         
         # 구분자가 없으면 키워드 기반 추출
         clean_text = user_input
-        for keyword in compare_keywords:
+        for keyword in COMPARE_KEYWORDS:
             clean_text = clean_text.replace(keyword, ' ')
         
         words = [w.strip() for w in clean_text.split() if len(w.strip()) > 2]
@@ -443,8 +697,23 @@ class ETFChatbotApp:
         
         return etf_candidates[:6]  # 최대 6개
 
+    def _display_visualizations(self, visualizations: Optional[Tuple[str, Any]]):
+        """
+        요청 처리 중 등록된(또는 세션 상태에 저장된) 시각화 표시
+        
+        Args:
+            visualizations: (종류, 데이터) 튜플 - 'comparison'은 비교 결과, 'analysis'는 ETF 분석 결과
+        """
+        if not visualizations:
+            return
+        kind, payload = visualizations
+        if kind == "comparison":
+            self._display_comparison_visualizations(payload)
+        elif kind == "analysis":
+            self._display_etf_visualizations(payload)
+
     def _display_comparison_visualizations(self, comparison_result: Dict):
-        """비교 시각화 표시"""
+        """비교 시각화 표시 (각 차트는 여기서 꺼낼 때 생성됨)"""
         if 'visualizations' not in comparison_result:
             return
         
@@ -469,6 +738,9 @@ class ETFChatbotApp:
         if 'radar_chart' in visualizations:
             st.plotly_chart(visualizations['radar_chart'], use_container_width=True)
         
+        if 'metric_heatmap' in visualizations:
+            st.plotly_chart(visualizations['metric_heatmap'], use_container_width=True)
+        
         col3, col4 = st.columns(2)
         with col3:
             if 'returns_comparison' in visualizations:
@@ -477,6 +749,13 @@ class ETFChatbotApp:
             if 'cost_performance' in visualizations:
                 st.plotly_chart(visualizations['cost_performance'], use_container_width=True)
         
+        # 누적 수익률 (선택한 기간의 차트만 생성)
+        windows = [window for window in CUMULATIVE_RETURN_WINDOWS if cumulative_return_chart_name(window) in visualizations]
+        if windows:
+            default_index = windows.index(DEFAULT_CUMULATIVE_RETURN_WINDOW) if DEFAULT_CUMULATIVE_RETURN_WINDOW in windows else 0
+            window = st.radio("누적 수익률 기간", windows, index=default_index, horizontal=True, key="cumulative_return_window")
+            st.plotly_chart(visualizations[cumulative_return_chart_name(window)], use_container_width=True)
+        
         if 'heatmap' in visualizations:
             st.plotly_chart(visualizations['heatmap'], use_container_width=True)
 
@@ -0,0 +1,348 @@
+"""
+캐시 파일 게시/조회 모듈
+- 캐시 빌드 중에도 서비스가 반쯤 쓰인 파일을 읽지 않도록 원자적 게시(임시 파일 + os.replace)
+- 캐시마다 매니페스트(JSON) 동반: 버전, 빌드 시각, 스키마, 행 수, 내용 해시, 입력 지문
+- 읽는 쪽은 매니페스트를 확인해 메모리 사본을 재사용하거나 새 버전으로 교체(hot-swap)
+
+게시 순서:
+1. 캐시 CSV를 같은 디렉토리의 임시 파일에 쓰고 os.replace로 교체
+2. 매니페스트를 같은 방식으로 교체 (매니페스트가 바뀌는 순간 새 버전이 게시됨)
+
+두 교체 사이에 읽으면 CSV 내용 해시가 매니페스트와 맞지 않으므로,
+읽는 쪽은 기존 메모리 사본을 유지하고 다음 조회 때 다시 확인합니다.
+
+주요 기능:
+1. atomic_write / atomic_write_csv / atomic_write_json: 원자적 파일 쓰기
+2. publish_cache: 캐시 CSV (+ 사전 계산 상위 K개 목록) + 매니페스트 게시
+3. load_manifest: 매니페스트 로드
+4. CacheStore: 매니페스트 기반 캐시 조회 및 hot-swap
+"""
+
+import io
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import pandas as pd
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 매니페스트 형식 버전
+MANIFEST_VERSION = 1
+
+# 캐시 CSV에서 문자열로 읽어야 하는 컬럼 (앞자리 0 보존)
+STRING_COLUMNS = {'종목코드': str}
+
+
+# =============================================================================
+# 원자적 파일 쓰기
+# =============================================================================
+
+def atomic_write(path: str, write: Callable[[str], None]):
+    """
+    임시 파일에 쓴 뒤 os.replace로 교체 (읽는 쪽은 이전 파일 또는 완성된 새 파일만 봄)
+
+    Args:
+        path: 최종 파일 경로
+        write: 임시 파일 경로를 받아 내용을 쓰는 함수
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    # 같은 파일 시스템에 있어야 os.replace가 원자적이므로 대상 디렉토리에 임시 파일 생성
+    # (확장자를 유지해야 pandas가 .gz 등 압축 형식을 추론할 수 있음)
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix=f".{os.path.basename(path)}", dir=directory)
+    os.close(fd)
+    try:
+        # mkstemp는 0600으로 만들므로 기존 파일 권한(없으면 umask 기본값)을 유지
+        if os.path.exists(path):
+            mode = os.stat(path).st_mode & 0o777
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_path, mode)
+        write(tmp_path)
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_csv(df: pd.DataFrame, path: str, **kwargs):
+    """DataFrame을 CSV로 원자적 저장 (기본: index=False, utf-8-sig)"""
+    kwargs.setdefault('index', False)
+    kwargs.setdefault('encoding', 'utf-8-sig')
+    atomic_write(path, lambda tmp: df.to_csv(tmp, **kwargs))
+
+
+def atomic_write_json(obj: Any, path: str, indent: Optional[int] = 2):
+    """JSON 객체를 원자적 저장 (큰 객체는 indent=None으로 간결하게)"""
+    def write(tmp: str):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, ensure_ascii=False, indent=indent, default=str)
+    atomic_write(path, write)
+
+
+def file_digest(path: str) -> str:
+    """파일 내용 sha256 해시"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# =============================================================================
+# 캐시 게시
+# =============================================================================
+
+def dataframe_schema(df: pd.DataFrame) -> Dict[str, str]:
+    """컬럼명 → dtype 문자열 (컬럼 순서 유지)"""
+    return {column: str(dtype) for column, dtype in df.dtypes.items()}
+
+
+def publish_cache(
+    df: pd.DataFrame,
+    cache_path: str,
+    manifest_path: str,
+    version: int,
+    fingerprints: Optional[Dict[str, Any]] = None,
+    topk_views: Optional[Dict[str, Any]] = None,
+    topk_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    캐시 CSV와 매니페스트를 원자적으로 게시
+
+    Args:
+        df: 캐시 DataFrame
+        cache_path: 캐시 CSV 경로
+        manifest_path: 매니페스트 JSON 경로
+        version: 캐시 형식 버전
+        fingerprints: 입력 데이터 지문 ({'global': ..., 'etfs': {...}})
+        topk_views: 사전 계산 상위 K개 목록 (TopKViews.to_dict(), 캐시 행 위치 기준)
+        topk_path: 상위 K개 목록 JSON 경로
+
+    Returns:
+        게시된 매니페스트
+    """
+    atomic_write_csv(df, cache_path)
+    digest = file_digest(cache_path)
+
+    # 상위 K개 목록은 캐시 행 위치를 참조하므로 캐시 내용 해시와 묶어서 저장
+    if topk_views is not None and topk_path:
+        atomic_write_json({**topk_views, 'cache_sha256': digest}, topk_path, indent=None)
+
+    manifest = {
+        'manifest_version': MANIFEST_VERSION,
+        'version': version,
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'rows': len(df),
+        'schema': dataframe_schema(df),
+        'sha256': digest,
+        'topk_views': os.path.basename(topk_path) if topk_views is not None and topk_path else None,
+        'fingerprints': fingerprints or {}
+    }
+    atomic_write_json(manifest, manifest_path)
+    return manifest
+
+
+def load_manifest(manifest_path: str) -> Optional[Dict[str, Any]]:
+    """
+    매니페스트(또는 함께 게시된 JSON 파일) 로드
+
+    Args:
+        manifest_path: JSON 파일 경로
+
+    Returns:
+        매니페스트 딕셔너리 또는 None (없거나 읽기 실패)
+    """
+    if not manifest_path or not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"매니페스트 로드 실패: {e}")
+        return None
+
+
+# =============================================================================
+# 캐시 조회 (hot-swap)
+# =============================================================================
+
+class CacheStore:
+    """
+    매니페스트 기반 캐시 조회기
+
+    `get()`은 파일 상태(수정 시각, 크기)가 바뀌지 않았으면 메모리 사본을 그대로 반환하고,
+    새 버전이 게시되었으면 검증(내용 해시, 스키마) 후 사본을 교체합니다.
+    검증에 실패하면(게시 도중 등) 기존 사본을 유지합니다.
+    """
+
+    def __init__(
+        self,
+        cache_path: str,
+        manifest_path: Optional[str] = None,
+        topk_path: Optional[str] = None
+    ):
+        """
+        조회기 초기화
+
+        Args:
+            cache_path: 캐시 CSV 경로
+            manifest_path: 매니페스트 JSON 경로 (없으면 매니페스트 없이 CSV만 확인)
+            topk_path: 사전 계산 상위 K개 목록 JSON 경로 (선택)
+        """
+        self.cache_path = cache_path
+        self.manifest_path = manifest_path
+        self.topk_path = topk_path
+        self.df = None
+        self.topk_views = None
+        self.manifest = None
+        self._snapshot: Tuple[Optional[pd.DataFrame], Optional[Dict[str, Any]]] = (None, None)
+        self._signature = None
+        self._verified = False  # 메모리 사본이 매니페스트 검증을 통과했는지
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[str]:
+        """현재 메모리 사본의 빌드 식별자 (빌드 시각 + 해시 앞부분)"""
+        if self.manifest:
+            return f"{self.manifest.get('built_at')}:{str(self.manifest.get('sha256', ''))[:12]}"
+        return None
+
+    def _file_signature(self) -> Optional[Tuple]:
+        """캐시/매니페스트 파일 상태 (변경 감지용)"""
+        signature = []
+        for path in (self.cache_path, self.manifest_path):
+            if not path:
+                continue
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        if signature and signature[0] is None:
+            return None
+        return tuple(signature)
+
+    def get(self) -> Optional[pd.DataFrame]:
+        """
+        현재 캐시 반환 (새 버전이 게시되었으면 교체 후 반환)
+
+        Returns:
+            캐시 DataFrame 또는 None (캐시 파일 없음)
+        """
+        signature = self._file_signature()
+        if signature is not None and signature == self._signature:
+            return self.df
+
+        with self._lock:
+            # 다른 스레드가 먼저 교체했을 수 있으므로 다시 확인
+            signature = self._file_signature()
+            if signature is None:
+                if self.df is None:
+                    logger.warning(f"캐시 파일을 찾을 수 없습니다: {self.cache_path}")
+                return self.df
+            if signature != self._signature:
+                self._reload(signature)
+            return self.df
+
+    def snapshot(self) -> Tuple[Optional[pd.DataFrame], Optional[Dict[str, Any]]]:
+        """
+        같은 빌드의 (캐시, 상위 K개 목록) 쌍 반환
+
+        `get()`과 `topk_views`를 따로 읽으면 그 사이에 교체될 수 있으므로,
+        목록을 함께 쓰는 쪽은 이 메서드를 사용합니다.
+        """
+        self.get()
+        return self._snapshot
+
+    def _reload(self, signature: Tuple):
+        """
+        새 버전 검증 후 메모리 사본 교체 (실패 시 기존 사본 유지)
+
+        파싱/검증에 실패한 파일 상태도 기록해, 파일이 다시 바뀔 때까지는
+        조회마다 다시 읽고 해시를 계산하지 않습니다.
+        """
+        manifest = load_manifest(self.manifest_path)
+
+        if manifest is not None and self.manifest is not None \
+                and manifest.get('sha256') == self.manifest.get('sha256') and self.df is not None \
+                and self._verified:
+            # 내용이 같으면 다시 파싱하지 않음 (touch 등)
+            self.manifest = manifest
+            self._signature = signature
+            return
+
+        try:
+            with open(self.cache_path, 'rb') as f:
+                raw = f.read()
+        except Exception as e:
+            logger.error(f"캐시 파일 읽기 실패: {e}")
+            return
+
+        try:
+            df = pd.read_csv(
+                io.BytesIO(raw), encoding='utf-8-sig', dtype=STRING_COLUMNS, float_precision='round_trip'
+            )
+        except Exception as e:
+            logger.error(f"캐시 파싱 실패: {e}")
+            self._signature = signature
+            return
+
+        problem = None
+        if manifest is not None:
+            problem = self._validate(manifest, raw, df)
+            if problem:
+                if self.df is not None:
+                    logger.warning(f"캐시 새 버전 검증 실패, 기존 버전 유지: {problem}")
+                    self._signature = signature
+                    return
+                # 메모리 사본이 없으면 그대로 사용 (캐시/매니페스트 파일이 바뀌면 다시 검증)
+                logger.warning(f"캐시 검증 실패, 파일을 그대로 사용합니다: {problem}")
+        else:
+            logger.info("캐시 매니페스트가 없어 CSV만 확인합니다.")
+
+        previous = self.version
+        self.df = df
+        self.manifest = manifest
+        self.topk_views = self._load_topk_views(manifest) if not problem else None
+        self._snapshot = (df, self.topk_views)
+        self._signature = signature
+        self._verified = manifest is not None and not problem
+        if previous is None:
+            logger.info(f"캐시 로드 완료: {len(df)}개 레코드 (버전 {self.version})")
+        else:
+            logger.info(f"캐시 교체: {previous} → {self.version} ({len(df)}개 레코드)")
+
+    def _load_topk_views(self, manifest: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """캐시와 같은 빌드의 상위 K개 목록 로드 (캐시 내용 해시가 다르면 사용하지 않음)"""
+        if not self.topk_path or not manifest or not manifest.get('topk_views'):
+            return None
+        views = load_manifest(self.topk_path)
+        if views is None or views.get('cache_sha256') != manifest.get('sha256'):
+            logger.info("상위 K개 목록이 현재 캐시와 맞지 않아 사용하지 않습니다.")
+            return None
+        return views
+
+    @staticmethod
+    def _validate(manifest: Dict[str, Any], raw: bytes, df: pd.DataFrame) -> Optional[str]:
+        """매니페스트와 파일 내용 비교 (문제가 있으면 사유 반환)"""
+        if manifest.get('manifest_version', 0) > MANIFEST_VERSION:
+            return f"지원하지 않는 매니페스트 버전: {manifest.get('manifest_version')}"
+        expected = manifest.get('sha256')
+        if expected and hashlib.sha256(raw).hexdigest() != expected:
+            return "내용 해시가 매니페스트와 다름 (게시 진행 중일 수 있음)"
+        missing = [c for c in manifest.get('schema', {}) if c not in df.columns]
+        if missing:
+            return f"스키마 불일치 (누락 컬럼: {missing})"
+        if manifest.get('rows') is not None and manifest['rows'] != len(df):
+            return f"행 수 불일치 ({len(df)} != {manifest['rows']})"
+        return None
@@ -9,6 +9,9 @@ CLOVA API 클라이언트 모듈
 2. ETF 분석 결과를 자연어로 변환
 3. 사용자 레벨에 맞는 응답 생성
 4. API 호출 에러 처리 및 로깅
+5. 응답 캐시: (모델, 최대 토큰, 프롬프트, 데이터 버전)이 같으면 저장된 응답 재사용
+   (메모리 LRU + SQLite 디스크 계층, TTL/크기 제한, 적중률 통계, 디버깅용 우회)
+6. 스트리밍 응답: 토큰이 도착하는 대로 청크 단위로 반환 (첫 토큰까지의 대기 시간 단축)
 
 의존성:
 - langchain_community.chat_models.ChatClovaX
@@ -19,7 +22,7 @@ CLOVA API 클라이언트 모듈
 
 import streamlit as st
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Iterator
 import logging
 
 # CLOVA LLM 라이브러리 임포트 
@@ -30,6 +33,7 @@ except ImportError:
     logging.warning("ChatClovaX 라이브러리가 설치되지 않았습니다. CLOVA API 기능을 사용할 수 없습니다.")
 
 from .config import Config
+from .result_cache import ResultCache, result_key
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -47,14 +51,19 @@ class ClovaClient:
     - 프롬프트 생성 및 API 호출
     - 응답 파싱 및 에러 처리
     - 사용자 레벨별 맞춤 응답 생성
+    - 응답 캐시 (같은 프롬프트 반복 시 API 호출 생략)
     """
 
-    def __init__(self):
+    def __init__(self, response_cache: Optional[ResultCache] = None, cache_bypass: Optional[bool] = None):
         """
         CLOVA 클라이언트 초기화
         
         Streamlit 세션에서 API 키를 가져와 CLOVA LLM 클라이언트를 초기화합니다.
         API 키가 없거나 라이브러리가 설치되지 않은 경우 기본 설정으로 동작합니다.
+        
+        Args:
+            response_cache: 응답 캐시 (None이면 캐시 없이 매번 호출, 앱에서는 프로세스당 1개 공유)
+            cache_bypass: 캐시 우회 여부 (None이면 LLM_CACHE_SETTINGS['bypass'])
         """
         # Streamlit 세션에서 API 키 가져오기
         self.api_key = st.session_state.get("clova_api_key", "")
@@ -69,6 +78,10 @@ class ClovaClient:
         # 설정 관리 객체
         self.config = Config()
         
+        # 응답 캐시 (우회 시 조회/저장 없이 항상 API 호출)
+        self.response_cache = response_cache
+        self.cache_bypass = self.config.LLM_CACHE_SETTINGS['bypass'] if cache_bypass is None else cache_bypass
+        
         # CLOVA LLM 클라이언트 초기화 시도
         if self.api_key and ChatClovaX:
             try:
@@ -108,15 +121,25 @@ class ClovaClient:
             "Content-Type": "application/json"
         }
 
-    def generate_response(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+    def generate_response(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        snapshot: Optional[str] = None,
+        use_cache: bool = True
+    ) -> str:
         """
         CLOVA API를 통해 응답 생성
         
         주어진 프롬프트를 CLOVA LLM에 전송하여 자연어 응답을 생성합니다.
+        응답 캐시가 있으면 (모델, 최대 토큰, 프롬프트, 데이터 버전)이 같은 저장된 응답을 재사용하고,
+        오류 응답은 저장하지 않아 다음 요청에서 다시 호출합니다.
         
         Args:
             prompt: CLOVA LLM에 전송할 프롬프트 문자열
             max_tokens: 최대 토큰 수 (None인 경우 기본값 사용)
+            snapshot: 데이터 버전 식별자 (캐시 키, 데이터가 바뀌면 이전 응답은 조회되지 않음)
+            use_cache: False면 이번 호출만 캐시 우회
         
         Returns:
             str: CLOVA LLM이 생성한 응답 텍스트
@@ -126,9 +149,119 @@ class ClovaClient:
         if not self.is_configured():
             return "CLOVA API 키가 설정되지 않았거나 라이브러리가 설치되지 않았습니다."
         
+        max_tokens = max_tokens or self.max_tokens
+        if self.response_cache is None or self.cache_bypass or not use_cache:
+            return self._invoke(prompt, max_tokens)
+        
+        return self.response_cache.get_or_compute(
+            self.response_key(prompt, max_tokens, snapshot),
+            lambda: self._invoke(prompt, max_tokens),
+            cacheable=lambda content: bool(content) and not content.startswith('⚠️')
+        )
+
+    def stream_response(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        snapshot: Optional[str] = None,
+        use_cache: bool = True,
+        on_complete: Optional[Callable[[str], None]] = None
+    ) -> Iterator[str]:
+        """
+        CLOVA API 스트리밍 응답 생성 (ChatClovaX.stream)
+        
+        토큰이 도착하는 대로 텍스트 청크를 반환합니다. 응답 캐시에 같은 키의 응답이 있으면
+        API 호출 없이 저장된 응답을 한 번에 반환하고, 스트림이 오류 없이 끝나면 전체 응답을 저장합니다.
+        
+        Args:
+            prompt: CLOVA LLM에 전송할 프롬프트 문자열
+            max_tokens: 최대 토큰 수 (None인 경우 기본값 사용)
+            snapshot: 데이터 버전 식별자 (응답 캐시 키)
+            use_cache: False면 이번 호출만 캐시 우회
+            on_complete: 스트림이 오류 없이 끝났을 때 전체 응답으로 호출할 함수 (앱의 답변 캐시 저장 등)
+        
+        Yields:
+            str: 응답 텍스트 청크 (오류 시 '⚠️'로 시작하는 메시지)
+        """
+        # API 설정 확인
+        if not self.is_configured():
+            yield "CLOVA API 키가 설정되지 않았거나 라이브러리가 설치되지 않았습니다."
+            return
+        
+        max_tokens = max_tokens or self.max_tokens
+        cache = self.response_cache if use_cache and not self.cache_bypass else None
+        key = self.response_key(prompt, max_tokens, snapshot) if cache is not None else None
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                yield cached
+                if on_complete:
+                    on_complete(cached)
+                return
+        
+        chunks = []
+        try:
+            for chunk in self.llm.stream(prompt, max_tokens=max_tokens):
+                text = self._parse_response(chunk)
+                if text:
+                    chunks.append(text)
+                    yield text
+        except Exception as e:
+            error_msg = f"CLOVA API 스트리밍 중 오류 발생: {str(e)}"
+            logger.error(error_msg)
+            yield f"\n\n⚠️ {error_msg}" if chunks else f"⚠️ {error_msg}"
+            return
+        
+        content = "".join(chunks)
+        logger.info(f"CLOVA API 스트리밍 완료: {len(content)} 글자")
+        if not content:
+            return
+        if cache is not None:
+            cache.set(key, content)
+        if on_complete:
+            on_complete(content)
+
+    def response_key(self, prompt: str, max_tokens: Optional[int] = None, snapshot: Optional[str] = None) -> str:
+        """
+        응답 캐시 키
+        
+        Args:
+            prompt: 전체 프롬프트 문자열
+            max_tokens: 최대 토큰 수 (None인 경우 기본값)
+            snapshot: 데이터 버전 식별자
+        
+        Returns:
+            "llm:지문" (모델, 최대 토큰, 프롬프트, 데이터 버전의 해시)
+        """
+        return result_key('llm', self.model, max_tokens or self.max_tokens, prompt, snapshot)
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        응답 캐시 통계
+        
+        Returns:
+            ResultCache.stats() 결과 + 'bypass' (응답 캐시가 없으면 None)
+        """
+        if self.response_cache is None:
+            return None
+        stats = self.response_cache.stats()
+        stats['bypass'] = self.cache_bypass
+        return stats
+
+    def _invoke(self, prompt: str, max_tokens: int) -> str:
+        """
+        CLOVA API 호출 (캐시 없이)
+        
+        Args:
+            prompt: 프롬프트 문자열
+            max_tokens: 최대 토큰 수
+        
+        Returns:
+            str: 응답 텍스트 (오류 시 '⚠️'로 시작하는 메시지)
+        """
         try:
             # CLOVA API 호출
-            response = self.llm.invoke(prompt, max_tokens=max_tokens or self.max_tokens)
+            response = self.llm.invoke(prompt, max_tokens=max_tokens)
             
             # 응답 파싱
             content = self._parse_response(response)
@@ -170,7 +303,9 @@ class ClovaClient:
         # 4. 기본값: 전체 응답을 문자열로 변환
         return response_str
 
-    def generate_etf_analysis(self, etf_info: Dict[str, Any], user_profile: Dict[str, Any]) -> str:
+    def generate_etf_analysis(
+        self, etf_info: Dict[str, Any], user_profile: Dict[str, Any], snapshot: Optional[str] = None
+    ) -> str:
         """
         ETF 분석 응답 생성
         
@@ -182,6 +317,7 @@ class ClovaClient:
                      (시세분석, 수익률/보수, 자산규모/유동성, 위험 등 포함)
             user_profile: 사용자 프로필 딕셔너리
                          (level: 투자 레벨, investor_type: 투자자 유형)
+            snapshot: 데이터 버전 식별자 (응답 캐시 키)
         
         Returns:
             str: 사용자 레벨에 맞는 ETF 분석 텍스트
@@ -191,23 +327,69 @@ class ClovaClient:
             return "⚠️ CLOVA API가 설정되지 않았습니다. ETF 분석을 생성할 수 없습니다."
         
         try:
-            # 1. 시스템 프롬프트 생성 (사용자 레벨별 설정)
-            system_prompt = self.config.get_system_prompt(user_profile)
-            
-            # 2. 사용자 요청 프롬프트 생성 (ETF 분석 요청)
-            user_request = self._create_analysis_request(etf_info, user_profile)
-            
-            # 3. 최종 프롬프트 결합
-            full_prompt = f"{system_prompt}\n\n{user_request}"
+            # 1~3. 시스템 프롬프트 + ETF 분석 요청 프롬프트 결합
+            full_prompt = self._create_analysis_prompt(etf_info, user_profile)
             
             # 4. CLOVA API 호출하여 응답 생성
-            return self.generate_response(full_prompt)
+            return self.generate_response(full_prompt, snapshot=snapshot)
             
         except Exception as e:
             error_msg = f"ETF 분석 생성 중 오류: {str(e)}"
             logger.error(error_msg)
             return f"{error_msg}"
 
+    def stream_etf_analysis(
+        self,
+        etf_info: Dict[str, Any],
+        user_profile: Dict[str, Any],
+        snapshot: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        ETF 분석 스트리밍 응답 생성 (generate_etf_analysis의 스트리밍 버전)
+        
+        Args:
+            etf_info: ETF 분석 정보 딕셔너리
+            user_profile: 사용자 프로필 딕셔너리
+            snapshot: 데이터 버전 식별자 (응답 캐시 키)
+        
+        Yields:
+            str: ETF 분석 텍스트 청크
+        """
+        # API 설정 확인
+        if not self.is_configured():
+            yield "⚠️ CLOVA API가 설정되지 않았습니다. ETF 분석을 생성할 수 없습니다."
+            return
+        
+        try:
+            full_prompt = self._create_analysis_prompt(etf_info, user_profile)
+        except Exception as e:
+            error_msg = f"ETF 분석 생성 중 오류: {str(e)}"
+            logger.error(error_msg)
+            yield error_msg
+            return
+        
+        yield from self.stream_response(full_prompt, snapshot=snapshot)
+
+    def _create_analysis_prompt(self, etf_info: Dict[str, Any], user_profile: Dict[str, Any]) -> str:
+        """
+        ETF 분석 전체 프롬프트 생성 (시스템 프롬프트 + 분석 요청)
+        
+        Args:
+            etf_info: ETF 정보 딕셔너리
+            user_profile: 사용자 프로필 딕셔너리
+        
+        Returns:
+            str: CLOVA LLM에 전송할 전체 프롬프트
+        """
+        # 1. 시스템 프롬프트 생성 (사용자 레벨별 설정)
+        system_prompt = self.config.get_system_prompt(user_profile)
+        
+        # 2. 사용자 요청 프롬프트 생성 (ETF 분석 요청)
+        user_request = self._create_analysis_request(etf_info, user_profile)
+        
+        # 3. 최종 프롬프트 결합
+        return f"{system_prompt}\n\n{user_request}"
+
     def _create_analysis_request(self, etf_info: Dict[str, Any], user_profile: Dict[str, Any]) -> str:
         """
         ETF 분석 요청 프롬프트 생성
@@ -28,8 +28,18 @@ class Config:
         'etf_aum': 'data/자산규모 및 유동성(기간).csv',
         'etf_reference': 'data/참고지수(기간).csv',
         'etf_risk': 'data/투자위험(기간).csv',
-        'risk_tier': 'data/etf_re_bp_simplified.csv',
-        'cache': 'data/etf_scores_cache.csv'
+        'risk_tier': 'data/etf_re_bp_simplified.csv.gz',
+        'risk_tier_legacy': 'data/etf_re_bp_simplified.csv',  # 압축 전 이력 (이전 설치본 호환)
+        'risk_tier_latest': 'data/etf_risk_latest.csv',
+        'risk_state': 'data/etf_risk_state.csv',
+        'cache': 'data/etf_scores_cache.csv',
+        'cache_manifest': 'data/etf_scores_cache.manifest.json',
+        'cache_topk': 'data/etf_scores_topk.json',
+        'cache_build_report': 'data/etf_scores_cache.build.json',
+        'cache_build_history': 'data/etf_scores_cache.build_history.jsonl',
+        'cache_similarity': 'data/etf_similarity.json',
+        'result_cache': 'data/result_cache.sqlite3',
+        'llm_cache': 'data/llm_cache.sqlite3'
     }
     
     # =============================================================================
@@ -79,6 +89,19 @@ class Config:
         'IESE': '직접분석형 + 공격투자형 + 스토리형 + 포트폴리오조정형',
     }
     
+    # =============================================================================
+    # 투자 차원 이름 (Level 3 사용자 지정 가중치 슬라이더 표시용)
+    # =============================================================================
+    INVESTOR_DIMENSION_LABELS = {
+        'A': '자동추천', 'I': '직접분석',
+        'R': '안전추구', 'E': '공격투자',
+        'S': '스토리', 'T': '기술분석',
+        'B': '장기보유', 'P': '포트폴리오조정'
+    }
+    
+    # 사용자 지정 가중치를 허용하는 최소 레벨
+    CUSTOM_WEIGHTS_MIN_LEVEL = 3
+    
     # =============================================================================
     # 레벨별 Risk Tier 허용 범위
     # =============================================================================
@@ -88,6 +111,127 @@ class Config:
         3: 4   # Level 3: risk_tier 0~4 (모든 위험 레벨)
     }
     
+    # =============================================================================
+    # 추천 카테고리 키워드 (사용자 입력 추출 순서 = 나열 순서)
+    # - 캐시 빌더가 키워드별 × 레벨 × 투자자 유형 상위 TOPK_VIEW_SIZE개 목록을 미리 계산
+    # =============================================================================
+    CATEGORY_KEYWORDS = [
+        # 기술 관련
+        '반도체', 'AI', '인공지능', '메타버스', '블록체인', '클라우드',
+        # 바이오/헬스케어
+        '바이오', '생명공학', '헬스케어', '제약', '의료',
+        # 금융
+        '금융', '은행', '보험', '증권',
+        # 에너지/자원
+        '에너지', '태양광', '풍력', '원자재', '원유', '가스',
+        # 자동차/교통
+        '자동차', '전기차', '배터리', '모빌리티',
+        # 부동산
+        '부동산', 'REITs', '리츠',
+        # 채권
+        '채권', '국채', '기업채', '회사채',
+        # 원자재/통화
+        '금', '은', '달러', '엔화', '유로', '위안',
+        # 지역
+        '중국', '미국', '일본', '유럽', '신흥국', '한국',
+        # 투자 스타일
+        '배당', '성장', '가치', '소형주', '대형주', '중형주'
+    ]
+    
+    # 카테고리별 사전 계산 상위 목록 크기 (요청 개수가 이보다 크면 전체 계산)
+    TOPK_VIEW_SIZE = 50
+    
+    # =============================================================================
+    # 추천 다양성 (같은 기초지수/고상관 ETF 중복 완화)
+    # =============================================================================
+    # 유사 이웃 사전 계산 설정 (캐시 빌드 시 etf_similarity.json 생성)
+    SIMILARITY_SETTINGS = {
+        'lookback_days': 252,     # 최근 거래일 수 (약 1년)
+        'min_periods': 60,        # 상관계수 계산 최소 겹치는 거래일 수
+        'neighbours': 20,         # ETF별 저장할 이웃 수
+        'min_correlation': 0.5    # 이웃으로 저장할 최소 상관계수
+    }
+    
+    # 재정렬 후보 풀 크기 (TOPK_VIEW_SIZE 이하면 사전 계산 목록에서 후보를 가져옴)
+    DIVERSITY_CANDIDATE_POOL = 50
+    
+    # MMR 다양성 비중 (0: 점수 순서 그대로, 1: 다양성만 고려)
+    DIVERSITY_WEIGHT = 0.3
+    
+    # 다양성 재정렬 기본 사용 여부 (선택 기능: 사용자가 켜야 추천 순서가 바뀜)
+    DIVERSITY_DEFAULT_ENABLED = False
+    
+    # =============================================================================
+    # 조건 검색 (총보수/자산규모/거래량/변동성/위험등급/운용사/상품 특성)
+    # =============================================================================
+    # 상품 특성 플래그 → ETF명 또는 복제방법에서 찾을 키워드 (대소문자 무시)
+    SCREEN_FLAG_KEYWORDS = {
+        'leveraged': ['레버리지', '2X', '울트라'],
+        'inverse': ['인버스', '곱버스'],
+        'synthetic': ['합성'],
+        'active': ['액티브']
+    }
+    
+    # 상품 특성 플래그 표시 이름 (사용자 입력 해석/조건 설명 공용)
+    SCREEN_FLAG_LABELS = {
+        'leveraged': '레버리지',
+        'inverse': '인버스',
+        'synthetic': '합성',
+        'active': '액티브'
+    }
+    
+    # 운용사 공식 이름 (상품검색/자산규모 데이터의 운용사 값, 운용사 조건은 이 이름으로 변환)
+    SCREEN_MANAGERS = [
+        '삼성자산운용', '삼성액티브자산운용', '미래에셋자산운용', '케이비자산운용', '한국투자신탁운용',
+        '한국투자밸류자산운용', '한화자산운용', '신한자산운용', '키움투자자산운용', '엔에이치아문디자산운용',
+        '타임폴리오자산운용', '하나자산운용', '우리자산운용', '에셋플러스자산운용', '흥국자산운용',
+        '비엔케이자산운용', '교보악사자산운용', '현대자산운용', '브이아이자산운용', '디비자산운용',
+        '케이씨지아이자산운용', '마이다스에셋', '트러스톤자산운용', '유리에셋', '아이비케이자산운용',
+        '대신자산운용', '아이엠에셋자산운용', '더제이자산운용'
+    ]
+    
+    # 운용사 별칭 → 공식 이름 (영문 약칭/통칭, 대소문자 무시)
+    SCREEN_MANAGER_ALIASES = {
+        'KB': '케이비자산운용', 'NH': '엔에이치아문디자산운용', 'NH아문디': '엔에이치아문디자산운용',
+        'IBK': '아이비케이자산운용', 'DB': '디비자산운용', 'BNK': '비엔케이자산운용',
+        'KCGI': '케이씨지아이자산운용', 'VI': '브이아이자산운용', 'IM': '아이엠에셋자산운용',
+        '한국투자': '한국투자신탁운용', '한투': '한국투자신탁운용', '한국투자밸류': '한국투자밸류자산운용'
+    }
+    
+    # ETF 브랜드 → 운용사 공식 이름 (입력에 브랜드만 단어로 있어도 운용사 조건으로 해석, 대소문자 무시)
+    SCREEN_MANAGER_BRANDS = {
+        'KODEX': '삼성자산운용', 'KoAct': '삼성액티브자산운용', 'TIGER': '미래에셋자산운용',
+        'RISE': '케이비자산운용', 'ACE': '한국투자신탁운용', 'VITA': '한국투자밸류자산운용',
+        'PLUS': '한화자산운용', 'SOL': '신한자산운용', 'KIWOOM': '키움투자자산운용',
+        'HANARO': '엔에이치아문디자산운용', 'TIMEFOLIO': '타임폴리오자산운용', '1Q': '하나자산운용',
+        'WON': '우리자산운용', 'HK': '흥국자산운용', 'UNICORN': '현대자산운용', 'FOCUS': '브이아이자산운용',
+        'TRUSTON': '트러스톤자산운용', 'TREX': '유리에셋', 'ITF': '아이비케이자산운용'
+    }
+    
+    # =============================================================================
+    # 요청 결과 캐시 (같은 질문 반복 시 필터링/점수 계산/LLM 호출 생략)
+    # =============================================================================
+    RESULT_CACHE_SETTINGS = {
+        'max_entries': 512,             # 메모리 LRU 최대 항목 수
+        'ttl_seconds': 6 * 60 * 60,     # 항목 유효 시간 (6시간)
+        'max_disk_entries': 10000,      # 디스크 계층 최대 항목 수
+        # 디스크 계층(SQLite, DATA_PATHS['result_cache']) 사용 여부: 재시작/여러 프로세스 간 공유
+        'disk': os.getenv('ETF_RESULT_CACHE_DISK', '').lower() in ('1', 'true', 'yes')
+    }
+    
+    # =============================================================================
+    # LLM 응답 캐시 (같은 모델/최대 토큰/프롬프트/데이터 버전이면 CLOVA 호출 생략)
+    # =============================================================================
+    LLM_CACHE_SETTINGS = {
+        'max_entries': 256,             # 메모리 LRU 최대 항목 수
+        'ttl_seconds': 24 * 60 * 60,    # 항목 유효 시간 (24시간)
+        'max_disk_entries': 5000,       # 디스크 계층 최대 항목 수
+        # 디스크 계층(SQLite, DATA_PATHS['llm_cache']) 사용 여부: 재시작/여러 프로세스 간 공유
+        'disk': os.getenv('ETF_LLM_CACHE_DISK', '').lower() in ('1', 'true', 'yes'),
+        # 디버깅용 캐시 우회: 조회/저장 없이 항상 CLOVA 호출
+        'bypass': os.getenv('ETF_LLM_CACHE_BYPASS', '').lower() in ('1', 'true', 'yes')
+    }
+    
     # =============================================================================
     # 프롬프트 관리
     # =============================================================================
@@ -179,6 +323,15 @@ class Config:
         """데이터 파일 경로 반환"""
         return cls.DATA_PATHS.get(data_type, '')
     
+    @classmethod
+    def get_risk_tier_history_path(cls) -> str:
+        """위험도 분류 이력 경로 (.gz가 없고 이전 비압축 파일만 있으면 그 경로)"""
+        path = cls.get_data_path('risk_tier')
+        legacy_path = cls.get_data_path('risk_tier_legacy')
+        if not os.path.exists(path) and os.path.exists(legacy_path):
+            return legacy_path
+        return path
+    
     @classmethod
     def get_investor_type_description(cls, investor_type: str) -> str:
         """투자자 유형 설명 반환"""
@@ -0,0 +1,255 @@
+"""
+추천 다양성 재정렬 모듈
+- 같은 기초지수를 여러 운용사가 추종하는 ETF만 추천되는 문제 완화
+- 캐시 빌드 시 일별 수익률 상관관계로 ETF별 유사 이웃(상위 M개)을 사전 계산
+- 조회 시 후보 풀(상위 점수 ETF)에서 MMR(Maximal Marginal Relevance)로 상위 N개 선택
+
+유사도:
+- 기초지수가 같은 ETF: 1.0
+- 사전 계산 이웃: 수익률 상관계수 (SIMILARITY_SETTINGS['min_correlation'] 이상만 저장)
+- 그 외: 0.0
+
+주요 기능:
+1. return_correlation_neighbours: 시세 데이터로 ETF별 상관 이웃 계산 (행렬 연산 한 번)
+2. SimilarityIndex.build / save / load: 유사 이웃 사전 계산 및 저장
+3. SimilarityIndex.rerank: 후보 풀 MMR 재정렬
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache_store import atomic_write_json, load_manifest
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 유사 이웃 파일 형식 버전
+SIMILARITY_VERSION = 1
+
+
+def _benchmark_key(value: Any) -> str:
+    """기초지수 비교 키 (빈 값/결측은 빈 문자열 → 같은 지수로 보지 않음)"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    key = ' '.join(str(value).split()).lower()
+    return '' if key in ('', '-', 'nan', 'none') else key
+
+
+def return_correlation_neighbours(
+    prices: pd.DataFrame,
+    lookback_days: int = 252,
+    min_periods: int = 60,
+    neighbours: int = 20,
+    min_correlation: float = 0.5
+) -> Dict[str, List[Tuple[str, float]]]:
+    """
+    일별 수익률 상관관계 기반 ETF별 유사 이웃 계산
+
+    최근 lookback_days 거래일의 수익률을 종목별로 표준화한 뒤 (거래일 × 종목) 행렬 곱 한 번으로
+    상관계수를 구합니다. 결측일은 0으로 두고 겹치는 거래일 수로 나누므로, 상장 시점이 달라도
+    겹치는 구간이 min_periods일 이상이면 비교합니다. (평균/표준편차는 종목별 전체 구간 기준이라
+    겹치는 구간만으로 계산한 쌍별 상관계수와는 조금 다를 수 있음)
+
+    Args:
+        prices: 시세 데이터 (basDt, srtnCd, clpr)
+        lookback_days: 사용할 최근 거래일 수
+        min_periods: 상관계수를 계산할 최소 겹치는 거래일 수
+        neighbours: 종목별 저장할 최대 이웃 수
+        min_correlation: 이웃으로 저장할 최소 상관계수
+
+    Returns:
+        종목코드 → [(이웃 종목코드, 상관계수), ...] (상관계수 내림차순)
+    """
+    frame = prices[['basDt', 'srtnCd', 'clpr']].dropna()
+    frame = frame.assign(srtnCd=frame['srtnCd'].astype(str), basDt=frame['basDt'].astype(str))
+    frame = frame.drop_duplicates(['basDt', 'srtnCd'], keep='last')
+    closes = frame.pivot(index='basDt', columns='srtnCd', values='clpr').sort_index()
+    closes = closes.iloc[-(lookback_days + 1):]
+
+    returns = closes.pct_change(fill_method=None).iloc[1:].to_numpy(dtype=float)
+    codes = closes.columns.to_numpy()
+    valid = np.isfinite(returns)
+
+    # 종목별 표준화 (결측은 0 → 곱에 기여하지 않음)
+    counts = valid.sum(axis=0)
+    filled = np.where(valid, returns, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = filled.sum(axis=0) / counts
+        centered = np.where(valid, returns - mean, 0.0)
+        std = np.sqrt((centered ** 2).sum(axis=0) / counts)
+        z = np.where(valid, centered / std, 0.0)
+    z[:, ~(std > 0)] = 0.0
+
+    overlap = valid.T.astype(float) @ valid.astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = (z.T @ z) / overlap
+    corr[(overlap < min_periods) | ~np.isfinite(corr)] = -np.inf
+    np.fill_diagonal(corr, -np.inf)
+    corr = np.minimum(corr, 1.0)
+
+    result = {}
+    k = min(neighbours, len(codes) - 1)
+    if k <= 0:
+        return result
+    for i, code in enumerate(codes):
+        row = corr[i]
+        top = np.argpartition(-row, k - 1)[:k]
+        top = top[np.argsort(-row[top], kind='stable')]
+        top = top[row[top] >= min_correlation]
+        if len(top):
+            result[str(code)] = [(str(codes[j]), round(float(row[j]), 4)) for j in top]
+    return result
+
+
+class SimilarityIndex:
+    """
+    ETF 유사 이웃 인덱스 및 MMR 재정렬기
+
+    캐시 빌더가 build()로 계산해 save()로 저장하고, 서비스는 load()로 읽어
+    fast_recommend_etfs(similarity=...)에 전달합니다.
+    """
+
+    def __init__(self, payload: Dict[str, Any]):
+        """
+        Args:
+            payload: build()/to_dict() 형식의 딕셔너리 (JSON에서 로드한 값)
+        """
+        self.settings = payload.get('settings', {})
+        self.built_at = payload.get('built_at')
+        self.neighbours: Dict[str, Dict[str, float]] = {
+            code: {neighbour: float(value) for neighbour, value in items}
+            for code, items in payload.get('neighbours', {}).items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.neighbours)
+
+    @classmethod
+    def build(cls, prices: pd.DataFrame, settings: Dict[str, Any]) -> 'SimilarityIndex':
+        """
+        시세 데이터로 유사 이웃 계산
+
+        Args:
+            prices: 시세 데이터 (basDt, srtnCd, clpr)
+            settings: Config.SIMILARITY_SETTINGS
+
+        Returns:
+            SimilarityIndex
+        """
+        neighbours = return_correlation_neighbours(
+            prices,
+            lookback_days=settings['lookback_days'],
+            min_periods=settings['min_periods'],
+            neighbours=settings['neighbours'],
+            min_correlation=settings['min_correlation']
+        )
+        return cls({
+            'settings': dict(settings),
+            'built_at': datetime.now().isoformat(timespec='seconds'),
+            'neighbours': neighbours
+        })
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON 저장용 딕셔너리"""
+        return {
+            'version': SIMILARITY_VERSION,
+            'settings': self.settings,
+            'built_at': self.built_at,
+            'neighbours': {
+                code: [[neighbour, value] for neighbour, value in items.items()]
+                for code, items in self.neighbours.items()
+            }
+        }
+
+    def save(self, path: str):
+        """원자적으로 저장"""
+        atomic_write_json(self.to_dict(), path, indent=None)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['SimilarityIndex']:
+        """
+        저장된 유사 이웃 로드
+
+        Returns:
+            SimilarityIndex 또는 None (없거나 형식 버전이 다름)
+        """
+        payload = load_manifest(path)
+        if payload is None:
+            return None
+        if payload.get('version') != SIMILARITY_VERSION:
+            logger.warning(f"유사 이웃 파일 형식 버전이 달라 사용하지 않습니다: {path}")
+            return None
+        return cls(payload)
+
+    def similarity_matrix(self, codes: List[str], benchmarks: List[Any]) -> np.ndarray:
+        """
+        후보 ETF 간 유사도 행렬
+
+        Args:
+            codes: 후보 종목코드
+            benchmarks: 후보 기초지수 (codes와 같은 순서)
+
+        Returns:
+            (후보 수 × 후보 수) 유사도 행렬 (대각은 1.0)
+        """
+        n = len(codes)
+        sim = np.zeros((n, n))
+        position = {code: i for i, code in enumerate(codes)}
+        for i, code in enumerate(codes):
+            for neighbour, value in self.neighbours.get(code, {}).items():
+                j = position.get(neighbour)
+                if j is not None:
+                    sim[i, j] = max(sim[i, j], value)
+        sim = np.maximum(sim, sim.T)
+
+        # 같은 기초지수 = 같은 베팅
+        groups: Dict[str, List[int]] = {}
+        for i, benchmark in enumerate(benchmarks):
+            key = _benchmark_key(benchmark)
+            if key:
+                groups.setdefault(key, []).append(i)
+        for members in groups.values():
+            if len(members) > 1:
+                sim[np.ix_(members, members)] = 1.0
+        np.fill_diagonal(sim, 1.0)
+        return sim
+
+    def rerank(self, records: List[Dict[str, Any]], top_n: int, diversity: float = 0.3) -> List[Dict[str, Any]]:
+        """
+        MMR 재정렬: 점수가 높으면서 이미 고른 ETF와 덜 비슷한 ETF를 차례로 선택
+
+        선택 기준 = (1 - diversity) × 정규화 점수 - diversity × 이미 고른 ETF와의 최대 유사도
+
+        Args:
+            records: 점수 내림차순 후보 레코드 (종목코드, 기초지수, final_score)
+            top_n: 선택 개수
+            diversity: 다양성 비중 (0이면 점수 순서 그대로)
+
+        Returns:
+            재정렬된 상위 top_n개 레코드
+        """
+        n = len(records)
+        if n <= 1 or top_n <= 0:
+            return records[:max(top_n, 0)]
+
+        codes = [str(record.get('종목코드', '')) for record in records]
+        scores = np.array([record.get('final_score', np.nan) for record in records], dtype=float)
+        scores = np.where(np.isnan(scores), np.nanmin(scores) if np.isfinite(scores).any() else 0.0, scores)
+        spread = scores.max() - scores.min()
+        relevance = (scores - scores.min()) / spread if spread > 0 else np.ones(n)
+
+        sim = self.similarity_matrix(codes, [record.get('기초지수') for record in records])
+
+        selected = []
+        available = np.ones(n, dtype=bool)
+        max_sim = np.zeros(n)
+        for _ in range(min(top_n, n)):
+            mmr = np.where(available, (1 - diversity) * relevance - diversity * max_sim, -np.inf)
+            pick = int(np.argmax(mmr))
+            selected.append(pick)
+            available[pick] = False
+            max_sim = np.maximum(max_sim, sim[pick])
+        return [records[i] for i in selected]
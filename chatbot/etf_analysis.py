@@ -4,13 +4,14 @@ ETF 분석 모듈
 - 시세 데이터 기반 수익률, 변동성, 최대낙폭 계산
 - 공식 데이터(보수, 자산규모, 거래량) 통합 분석
 - 사용자 레벨별 맞춤 분석 및 시각화
+- 여러 ETF 일괄 분석 (공유 인덱스 + 종목코드별 시세 구간, 캐시 빌드용)
 """
 
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import logging
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 # 공통 유틸리티 임포트
 from .utils import (
@@ -285,6 +286,312 @@ def _is_market_analysis_insufficient(market_analysis: Dict[str, Any]) -> bool:
     key_metrics = ['3개월 수익률', '1년 수익률', '변동성', '최대낙폭']
     return all(market_analysis.get(metric) is None for metric in key_metrics)
 
+# =============================================================================
+# 일괄 분석 (캐시 빌드 / 대량 내보내기용)
+# =============================================================================
+
+# 시세 분석 수익률 기간 (기간명, 거래일 수)
+RETURN_PERIODS = [('3개월', 63), ('1년', 252)]
+
+class ETFAnalysisIndex:
+    """
+    여러 ETF를 한 번에 분석하기 위한 공유 인덱스
+
+    analyze_etf는 ETF마다 종목명 조회(iterrows), 시세 전체 스캔, 공식 데이터 5회 스캔을
+    수행합니다. 이 인덱스는 같은 조회 규칙을 딕셔너리와 종목코드별 시세 구간으로
+    한 번만 만들어 두고, analyze_etfs_batch가 ETF 수와 무관하게 재사용합니다.
+
+    조회 규칙은 analyze_etf와 동일합니다.
+    - 종목명: 정규화된 종목명이 같은 첫 행 (없으면 부분 매칭 첫 행)
+    - 공식 데이터: find_etf_row와 같이 '종목명' 컬럼 우선, 없으면 'ETF명' 컬럼의 첫 행
+    - 시세: 종목코드별 날짜 중복 제거(먼저 나온 행 유지) 후 날짜순 정렬
+    """
+
+    def __init__(
+        self,
+        price_df: pd.DataFrame,
+        info_df: pd.DataFrame,
+        perf_df: pd.DataFrame,
+        aum_df: pd.DataFrame,
+        ref_idx_df: pd.DataFrame,
+        risk_df: pd.DataFrame
+    ):
+        """
+        인덱스 생성
+
+        Args:
+            price_df: 가격 데이터
+            info_df: 기본 정보
+            perf_df, aum_df, ref_idx_df, risk_df: 공식 데이터
+        """
+        self.info_df = info_df
+        self.official = {
+            'basic': info_df,
+            'performance': perf_df,
+            'aum': aum_df,
+            'reference': ref_idx_df,
+            'risk': risk_df
+        }
+        self._official_index = {key: self._name_index(df) for key, df in self.official.items()}
+
+        # 종목명 → (종목명, 종목코드), 종목코드 → 종목명 (모두 첫 행 기준)
+        self._names = []
+        self._exact = {}
+        self._name_by_code = {}
+        if not info_df.empty:
+            for name, code in zip(info_df['종목명'], info_df['종목코드']):
+                norm = normalize_etf_name(name)
+                self._names.append((norm, name, str(code)))
+                self._exact.setdefault(norm, (name, str(code)))
+                self._name_by_code.setdefault(str(code), name)
+
+        self._prepare_prices(price_df)
+
+    @staticmethod
+    def _name_index(df: pd.DataFrame) -> Dict[str, Dict[str, int]]:
+        """컬럼('종목명', 'ETF명')별 정규화된 이름 → 첫 행 위치"""
+        index = {}
+        if df is None or df.empty:
+            return index
+        for column in ('종목명', 'ETF명'):
+            if column in df.columns:
+                positions = {}
+                for position, name in enumerate(df[column]):
+                    positions.setdefault(normalize_etf_name(name), position)
+                index[column] = positions
+        return index
+
+    def _prepare_prices(self, price_df: pd.DataFrame):
+        """시세를 (종목코드, 날짜) 순으로 정리하고 종목코드별 구간 계산"""
+        if price_df is None or price_df.empty:
+            self.clpr = np.zeros(0)
+            self.dates = np.zeros(0, dtype='datetime64[ns]')
+            self._spans = {}
+            return
+
+        prices = pd.DataFrame({
+            'code': price_df['srtnCd'].astype(str).to_numpy(),
+            'date': pd.to_datetime(price_df['basDt'], format='%Y%m%d', errors='coerce').to_numpy(),
+            'clpr': pd.to_numeric(price_df['clpr'], errors='coerce').to_numpy(dtype=float),
+        })
+        prices = prices.dropna(subset=['date', 'clpr'])
+        prices = prices.drop_duplicates(subset=['code', 'date'])
+        prices = prices.sort_values(['code', 'date'], kind='stable')
+
+        codes = prices['code'].to_numpy()
+        self.clpr = prices['clpr'].to_numpy(dtype=float)
+        self.dates = prices['date'].to_numpy()
+        if len(codes):
+            starts = np.r_[0, np.flatnonzero(codes[1:] != codes[:-1]) + 1]
+        else:
+            starts = np.zeros(0, dtype=np.int64)
+        ends = np.r_[starts[1:], len(codes)]
+        self._spans = {str(codes[s]): (int(s), int(e)) for s, e in zip(starts, ends)}
+
+    def resolve(self, etf_name: str) -> Tuple[Optional[str], Optional[str]]:
+        """get_exact_etf_info와 같은 규칙의 (ETF명, 종목코드) 조회"""
+        norm_input = normalize_etf_name(etf_name)
+        if norm_input in self._exact:
+            return self._exact[norm_input]
+        for norm, name, code in self._names:
+            if norm_input in norm:
+                return name, code
+        return None, None
+
+    def price_history(self, etf_codes: List[str]) -> pd.DataFrame:
+        """
+        여러 종목의 종가를 날짜 기준으로 맞춘 표
+
+        Args:
+            etf_codes: 종목코드 리스트
+
+        Returns:
+            날짜 × 종목코드 종가 DataFrame (종목별 첫 거래일~마지막 거래일 사이의 빈 날짜는 직전 종가,
+            그 밖은 NaN, 시세가 없는 종목은 제외)
+        """
+        spans = {}
+        for code in dict.fromkeys(str(c) for c in etf_codes):
+            start, end = self._spans.get(code, (0, 0))
+            if end > start:
+                spans[code] = (start, end)
+        if not spans:
+            return pd.DataFrame()
+
+        # 공통 날짜축(종목별 날짜의 합집합)에 종목별 구간을 위치로 채움
+        dates = np.unique(np.concatenate([self.dates[start:end] for start, end in spans.values()]))
+        matrix = np.full((len(dates), len(spans)), np.nan)
+        for column, (start, end) in enumerate(spans.values()):
+            matrix[np.searchsorted(dates, self.dates[start:end]), column] = self.clpr[start:end]
+        prices = pd.DataFrame(matrix, index=pd.DatetimeIndex(dates), columns=list(spans))
+        return prices.ffill().where(prices.bfill().notna())
+
+    def exact_name(self, etf_name: str) -> Optional[str]:
+        """정규화된 이름이 같은 첫 종목명 (extract_etf_name_from_input의 정확한 매칭 단계와 동일)"""
+        match = self._exact.get(normalize_etf_name(etf_name))
+        return match[0] if match else None
+
+    def name_of(self, etf_code: str) -> Optional[str]:
+        """종목코드의 종목명 (기본 정보 첫 행 기준)"""
+        return self._name_by_code.get(str(etf_code))
+
+    def official_row(self, key: str, etf_name: str) -> Dict[str, Any]:
+        """find_etf_row와 같은 규칙의 공식 데이터 행 (딕셔너리)"""
+        df = self.official[key]
+        norm_target = normalize_etf_name(etf_name)
+        for positions in self._official_index[key].values():
+            if norm_target in positions:
+                return dict(df.iloc[positions[norm_target]])
+        return {}
+
+    def market_metrics(self, etf_codes: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        여러 종목의 시세 분석 (_analyze_market_data와 같은 값)
+
+        수익률은 종목별 구간 끝 위치 기준으로 한 번에 계산하고,
+        변동성/최대낙폭은 종목별 연속 구간(복사 없는 슬라이스)에서 계산합니다.
+
+        Args:
+            etf_codes: 종목코드 리스트
+
+        Returns:
+            종목코드 → 시세 분석 결과 (시세가 없거나 2일 미만이면 None)
+        """
+        codes = [code for code in dict.fromkeys(str(c) for c in etf_codes)]
+        spans = np.array([self._spans.get(code, (0, 0)) for code in codes], dtype=np.int64).reshape(-1, 2)
+        starts, ends = spans[:, 0], spans[:, 1]
+        lengths = ends - starts
+        clpr = self.clpr
+
+        # 기간 수익률 (구간 끝 가격 / days+1 거래일 전 가격)
+        last = np.where(lengths > 0, clpr[np.maximum(ends - 1, 0)] if len(clpr) else 0.0, np.nan)
+        period_returns = {}
+        for period, days in RETURN_PERIODS:
+            enough = lengths >= days + 1
+            start_price = np.full(len(codes), np.nan)
+            if len(clpr):
+                start_price[enough] = clpr[ends[enough] - (days + 1)]
+            period_returns[f'{period} 수익률'] = (enough, start_price)
+
+        results = {}
+        for i, code in enumerate(codes):
+            if lengths[i] < 2:
+                results[code] = None
+                continue
+
+            analysis = {}
+            for column, (enough, start_price) in period_returns.items():
+                if enough[i] and start_price[i] > 0:
+                    analysis[column] = ((last[i] / start_price[i]) - 1) * 100
+                else:
+                    analysis[column] = None
+
+            window = clpr[starts[i]:ends[i]]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                changes = window[1:] / window[:-1] - 1
+            changes = changes[~np.isnan(changes)]
+            if len(changes) > 1:
+                deviations = changes - changes.sum() / len(changes)
+                volatility = np.sqrt((deviations ** 2).sum() / (len(changes) - 1)) * 100 * np.sqrt(252)
+            else:
+                volatility = None
+
+            rolling_max = np.maximum.accumulate(window)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                drawdown = (window - rolling_max) / rolling_max
+            # pandas min()과 같이 NaN(0/0)은 건너뜀
+            valid = drawdown[~np.isnan(drawdown)]
+            max_drawdown = valid.min() * 100 if len(valid) else np.nan
+
+            analysis['변동성'] = volatility
+            analysis['최대낙폭'] = max_drawdown
+            results[code] = analysis
+        return results
+
+
+def analyze_etfs_batch(
+    etf_codes: List[str],
+    price_df: Optional[pd.DataFrame] = None,
+    info_df: Optional[pd.DataFrame] = None,
+    perf_df: Optional[pd.DataFrame] = None,
+    aum_df: Optional[pd.DataFrame] = None,
+    ref_idx_df: Optional[pd.DataFrame] = None,
+    risk_df: Optional[pd.DataFrame] = None,
+    analysis_index: Optional[ETFAnalysisIndex] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    여러 ETF 일괄 분석 (analyze_etf와 같은 결과 구조)
+
+    각 종목코드의 종목명(기본 정보 첫 행)으로 analyze_etf를 호출한 것과 같은 결과를
+    공유 인덱스와 일괄 시세 계산으로 만듭니다. 여러 번 호출할 때는 analysis_index를
+    한 번 만들어 넘기면 인덱스 생성 비용도 공유됩니다.
+
+    Args:
+        etf_codes: 종목코드 리스트
+        price_df, info_df, perf_df, aum_df, ref_idx_df, risk_df: analyze_etf와 동일
+        analysis_index: 미리 만든 ETFAnalysisIndex (있으면 DataFrame 인자는 무시)
+
+    Returns:
+        종목코드 → ETF 분석 결과 딕셔너리 (실패한 ETF는 analyze_etf와 같은 에러 결과)
+    """
+    try:
+        index = analysis_index or ETFAnalysisIndex(
+            price_df, info_df, perf_df, aum_df, ref_idx_df, risk_df
+        )
+    except Exception as e:
+        logger.error(f"ETF 일괄 분석 인덱스 생성 오류: {e}")
+        return {
+            str(code): _create_error_result(str(code), f"분석 중 오류가 발생했습니다: {str(e)}")
+            for code in etf_codes
+        }
+
+    # 1단계: 종목코드 → 종목명 → 정확한 (ETF명, 조회 종목코드)
+    resolved = {}
+    for code in dict.fromkeys(str(c) for c in etf_codes):
+        name = index.name_of(code)
+        exact_name, etf_code = index.resolve(name) if name is not None else (None, None)
+        resolved[code] = (name, exact_name, etf_code)
+
+    # 2단계: 시세 분석 (필요한 종목코드만 한 번에)
+    market = index.market_metrics([etf_code for _, _, etf_code in resolved.values() if etf_code])
+
+    # 3단계: 공식 데이터 통합
+    results = {}
+    for code, (name, exact_name, etf_code) in resolved.items():
+        try:
+            if not exact_name or not etf_code:
+                results[code] = _create_error_result(
+                    name or code, "ETF를 찾을 수 없습니다. ETF명을 다시 확인해 주세요."
+                )
+                continue
+
+            market_analysis = market.get(etf_code)
+            if market_analysis is None:
+                results[code] = _create_error_result(
+                    exact_name, "시세 데이터가 없습니다. ETF 시세 파일을 확인해 주세요."
+                )
+                continue
+
+            result = {
+                'ETF명': exact_name,
+                '기본정보': index.official_row('basic', exact_name),
+                '수익률/보수': index.official_row('performance', exact_name),
+                '자산규모/유동성': index.official_row('aum', exact_name),
+                '참고지수': index.official_row('reference', exact_name),
+                '위험': index.official_row('risk', exact_name),
+                '시세분석': market_analysis
+            }
+            if _is_market_analysis_insufficient(market_analysis):
+                result['시세분석_안내'] = "시세 데이터가 부족하거나, 수익률/변동성/최대낙폭을 계산할 수 없습니다."
+            results[code] = result
+
+        except Exception as e:
+            logger.error(f"ETF 일괄 분석 중 오류 발생 ({code}): {e}")
+            results[code] = _create_error_result(name or code, f"분석 중 오류가 발생했습니다: {str(e)}")
+
+    n_ok = sum(1 for result in results.values() if not result.get('설명'))
+    logger.debug(f"ETF 일괄 분석 완료: {n_ok}/{len(results)}개")
+    return results
+
 # =============================================================================
 # 시각화 함수들
 # =============================================================================
@@ -1,10 +1,17 @@
 """
 ETF 비교 분석 모듈
-- 다중 ETF 비교 분석 (최대 6개)
+- 다중 ETF 비교 분석 (최대 6개, 7개 이상은 대량 비교 모드로 최대 100개)
 - 사용자 레벨/투자 유형별 맞춤 비교
 - 캐시 기반 고속 점수 계산 + 실시간 데이터 조회
+- 캐시 조회는 (ETF명/종목코드, 레벨, 투자자 유형) → 행 위치 인덱스로, 시세 분석은 종목코드별 구간
+  인덱스(ETFAnalysisIndex)로 비교 대상 전체를 한 번에 처리
 - 종합 점수, 위험-수익률, 비용 효율성 등 분석
 - 인터랙티브 시각화 (바차트, 산점도, 레이더차트, 히트맵)
+- 차트는 표시할 때 생성(지연 생성)하고, 직렬화된 차트 JSON을 (데이터 버전, ETF 조합, 프로필)별로 캐시
+- 대량 비교 모드: 지표 테이블 일괄 생성, WebGL 산점도, 지표 히트맵(레이더 차트 대체), 상위 K개 + 나머지 요약 프롬프트
+- 누적 수익률 차트: 날짜 기준으로 맞춘 종가에서 기간별 누적 수익률(기준 100)을 계산하고 정해진 점 개수로 줄여 표시
+- 캐시에 없는 ETF(신규 상장, 기존 형식 캐시의 레벨 제한 조합 등)는 캐시 빌더와 같은 식으로 실시간 점수 계산,
+  레벨 위험도 제한을 넘는 ETF도 제외하지 않고 표시해 비교 대상이 조용히 빠지지 않음
 """
 
 import pandas as pd
@@ -13,18 +20,23 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import plotly.figure_factory as ff
+import json
 import logging
 import os
-from typing import List, Dict, Any, Optional, Tuple
+from collections.abc import Mapping
+from typing import List, Dict, Any, Optional, Tuple, Callable
 
 # 공통 유틸리티 임포트
-from .etf_analysis import analyze_etf, LEVEL_PROMPTS
-from .recommendation_engine import ETFRecommendationEngine
+from .etf_analysis import analyze_etfs_batch, LEVEL_PROMPTS, ETFAnalysisIndex
+from .recommendation_engine import ETFRecommendationEngine, ETFScoreIndex, DIMENSION_COLUMNS, is_factorized_cache
 from .config import Config
+from .cache_store import CacheStore
+from .risk import RiskTierIndex
+from .result_cache import ResultCache, result_key
 from .utils import (
     normalize_etf_name, safe_float, format_percentage, 
     format_aum, format_volume, validate_user_profile,
-    create_error_result, extract_etf_name_from_input
+    create_error_result, extract_etf_name_from_input, calculate_etf_base_score
 )
 
 # 로깅 설정
@@ -36,6 +48,21 @@ logger = logging.getLogger(__name__)
 MAX_COMPARISON_ETFS = 6
 MIN_COMPARISON_ETFS = 2
 
+# 대량 비교 모드 (MAX_COMPARISON_ETFS 초과 시, 카테고리 전체 비교 등)
+MAX_LARGE_COMPARISON_ETFS = 100
+LARGE_COMPARISON_PROMPT_TOP_K = 10
+
+# 레이더 차트/지표 히트맵 지표
+RADAR_CATEGORIES = ['수익률', '비용효율성', '유동성', '안정성', '규모']
+
+# 누적 수익률 차트 기간 (최근 거래일 수, None이면 전체)
+CUMULATIVE_RETURN_WINDOWS = {'3개월': 63, '6개월': 126, '1년': 252, '전체': None}
+DEFAULT_CUMULATIVE_RETURN_WINDOW = '1년'
+
+# 누적 수익률 차트 점 개수 (차트 전체 예산을 ETF 수로 나누되 ETF당 최소 개수 보장)
+CUMULATIVE_RETURN_POINT_BUDGET = 2000
+CUMULATIVE_RETURN_MIN_POINTS = 60
+
 # 변동성 등급 점수 매핑
 VOLATILITY_SCORE_MAP = {
     '매우낮음': 1, '낮음': 2, '보통': 3, '높음': 4, '매우높음': 5
@@ -49,37 +76,441 @@ STABILITY_SCORE_MAP = {
 # 차트 색상 팔레트
 CHART_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
 
+# 비교에 사용하는 캐시 컬럼 (점수 + 캐시에 저장된 공식 데이터)
+COMPARISON_CACHE_COLUMNS = [
+    'base_score', 'type_weight', 'final_score', 'risk_tier',
+    '종목코드', '분류체계', '기초지수', '자산규모', '거래량', '변동성', '총보수'
+]
+
+
+class ComparisonCacheIndex:
+    """
+    비교용 캐시 조회 인덱스
+
+    캐시를 읽을 때 한 번 ETF명/종목코드(기존 형식 캐시는 + 레벨, 투자자 유형) → 행 위치
+    딕셔너리를 만들어 두고, 비교 대상 N개는 딕셔너리 조회 N번 + 위치 배열 take 한 번으로
+    가져옵니다. (요청마다 캐시 전체에 불리언 마스크를 적용하지 않음)
+
+    같은 키가 여러 행이면 기존 마스크 조회의 첫 행(iloc[0])과 같이 캐시 순서상 첫 행을 사용합니다.
+    """
+
+    def __init__(self, cache_df: pd.DataFrame, score_index: Optional[ETFScoreIndex] = None):
+        """
+        인덱스 생성
+
+        Args:
+            cache_df: 캐시 DataFrame
+            score_index: 팩터화된 캐시의 점수 인덱스 (팩터화된 캐시면 필수)
+        """
+        self.score_index = score_index
+        if score_index is not None:
+            # 팩터화된 캐시: ETF별 1행 → 키별 후보 위치 목록 (레벨 제한은 조회 시 적용)
+            df = score_index.df
+            self._positions: Dict[Any, List[int]] = {}
+            for position, (name, code) in enumerate(zip(df['ETF명'], df['종목코드'])):
+                self._positions.setdefault(name, []).append(position)
+                self._positions.setdefault(str(code), []).append(position)
+        else:
+            # 기존 형식 캐시: (키, 레벨, 투자자 유형) → 첫 행 위치
+            levels = pd.to_numeric(cache_df['level'], errors='coerce').to_numpy()
+            types = cache_df['investor_type'].astype(str).to_numpy()
+            self._rows: Dict[Tuple[Any, int, str], int] = {}
+            for position, (name, code, level, investor_type) in enumerate(
+                zip(cache_df['ETF명'], cache_df['종목코드'], levels, types)
+            ):
+                if np.isnan(level):
+                    continue
+                self._rows.setdefault((name, int(level), investor_type), position)
+                self._rows.setdefault((str(code), int(level), investor_type), position)
+            self._columns = {
+                column: cache_df[column].to_numpy()
+                for column in COMPARISON_CACHE_COLUMNS if column in cache_df.columns
+            }
+
+    def lookup(self, keys: List[str], level: int, investor_type: str) -> Dict[str, Dict[str, Any]]:
+        """
+        여러 ETF의 점수 및 캐시 공식 데이터 조회
+
+        Args:
+            keys: ETF명 또는 종목코드 리스트
+            level: 사용자 레벨
+            investor_type: 투자자 유형
+
+        Returns:
+            키 → 캐시 데이터 딕셔너리 (COMPARISON_CACHE_COLUMNS + level_restricted, 캐시에 없으면 제외)
+            팩터화된 캐시는 레벨 제한 초과 ETF도 점수를 계산해 level_restricted=True로 반환하고,
+            기존 형식 캐시는 빌더가 제한 조합을 저장하지 않으므로 제외됩니다.
+        """
+        keys = list(dict.fromkeys(keys))
+        if self.score_index is not None:
+            # 레벨 제한을 통과한 첫 위치(없으면 첫 위치) 선택 후 점수 레코드 한 번에 계산
+            mask, _ = self.score_index.level_mask(level)
+            found, positions = [], []
+            for key in keys:
+                candidates = self._positions.get(key, [])
+                if candidates:
+                    found.append(key)
+                    positions.append(next((p for p in candidates if mask[p]), candidates[0]))
+            records = self.score_index.records_at(
+                np.array(positions, dtype=int), level, investor_type, apply_level_limit=False
+            )
+            if len(records) != len(found):  # 알 수 없는 투자자 유형
+                return {}
+            return {
+                key: {**{column: record.get(column) for column in COMPARISON_CACHE_COLUMNS},
+                      'level_restricted': not mask[position]}
+                for key, position, record in zip(found, positions, records)
+            }
+
+        found, positions = [], []
+        for key in keys:
+            position = self._rows.get((key, level, investor_type))
+            if position is not None:
+                found.append(key)
+                positions.append(position)
+        taken = np.array(positions, dtype=int)
+        values = {column: array[taken].tolist() for column, array in self._columns.items()}
+        return {
+            key: {**{column: values[column][i] if column in values else None for column in COMPARISON_CACHE_COLUMNS},
+                  'level_restricted': False}
+            for i, key in enumerate(found)
+        }
+
+
+class RealtimeScorer:
+    """
+    캐시에 없는 ETF의 실시간 점수 계산기
+
+    캐시 빌더와 같은 식을 공유 인덱스 위에서 계산합니다.
+    - 기본 점수: analyze_etfs_batch 분석 결과 → calculate_etf_base_score (빌더의 _calculate_base_score와 같은 식)
+    - risk_tier: RiskTierIndex 최신 위험등급 (없으면 -1 측정불가)
+    - 차원 점수: calculate_dimension_matrix(기본 정보 행)
+    - 최종 점수: 위 값으로 만든 팩터화 레코드를 ETFScoreIndex로 계산
+      (유효 기본 점수 × max(차원 점수 · 유형 가중치, 0.1), 측정불가 기본 점수 × 0.5)
+
+    ETF별 기본 레코드는 종목코드별로, 점수 결과는 (종목코드, 레벨, 투자자 유형)별로 메모이즈합니다.
+    인덱스/위험등급이 바뀌면 ETFComparison이 새 인스턴스를 만듭니다.
+    """
+
+    def __init__(
+        self,
+        engine: ETFRecommendationEngine,
+        analysis_index: ETFAnalysisIndex,
+        risk_tiers: Optional[RiskTierIndex] = None,
+        config: Optional[Config] = None
+    ):
+        """
+        계산기 생성
+
+        Args:
+            engine: 추천 엔진 (차원 점수 계산)
+            analysis_index: 공식 데이터를 포함한 시세 분석 인덱스
+            risk_tiers: 최신 위험등급 인덱스 (None이면 모두 측정불가)
+            config: 설정 (유형 가중치, 레벨별 risk tier 제한)
+        """
+        self.engine = engine
+        self.analysis_index = analysis_index
+        self.risk_tiers = risk_tiers
+        self.config = config or Config()
+        self._records: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._scores: Dict[Tuple[str, int, str], Dict[str, Any]] = {}
+
+    def score(self, etf_codes: List[str], level: int, investor_type: str) -> Dict[str, Dict[str, Any]]:
+        """
+        여러 ETF의 프로필별 점수 (캐시 조회 결과와 같은 형식)
+
+        Args:
+            etf_codes: 종목코드 리스트
+            level: 사용자 레벨
+            investor_type: 투자자 유형
+
+        Returns:
+            종목코드 → 점수 및 공식 데이터 딕셔너리 (COMPARISON_CACHE_COLUMNS + level_restricted,
+            분석 실패 또는 알 수 없는 투자자 유형이면 제외)
+        """
+        codes = list(dict.fromkeys(str(code) for code in etf_codes))
+        pending = [code for code in codes if (code, level, investor_type) not in self._scores]
+        if pending:
+            self._build_records([code for code in pending if code not in self._records])
+            records = [self._records[code] for code in pending if self._records.get(code) is not None]
+            if records:
+                score_index = ETFScoreIndex(pd.DataFrame(records), self.config)
+                mask, _ = score_index.level_mask(level)
+                scored = score_index.records_at(
+                    np.arange(len(records)), level, investor_type, apply_level_limit=False
+                )
+                for position, record in enumerate(scored):
+                    self._scores[(str(record['종목코드']), level, investor_type)] = {
+                        **{column: record.get(column) for column in COMPARISON_CACHE_COLUMNS},
+                        'level_restricted': not mask[position]
+                    }
+        return {
+            code: self._scores[(code, level, investor_type)]
+            for code in codes if (code, level, investor_type) in self._scores
+        }
+
+    def _build_records(self, etf_codes: List[str]):
+        """ETF별 기본 레코드 + 차원 점수 생성 (빌더의 기본 레코드와 같은 필드)"""
+        if not etf_codes:
+            return
+        info_df = self.analysis_index.info_df
+        rows = info_df[info_df['종목코드'].astype(str).isin(etf_codes)]
+        rows = rows.drop_duplicates(subset=['종목코드']).reset_index(drop=True)
+        analyses = analyze_etfs_batch(list(rows['종목코드'].astype(str)), analysis_index=self.analysis_index)
+        dimension_scores = self.engine.calculate_dimension_matrix(rows) if not rows.empty else np.zeros((0, 0))
+
+        for code in etf_codes:
+            self._records[code] = None
+        for i, etf_row in rows.iterrows():
+            code = str(etf_row['종목코드'])
+            etf_info = analyses.get(code)
+            if etf_info is None or (isinstance(etf_info, dict) and etf_info.get('설명')):
+                logger.warning(f"실시간 점수 계산 실패 (분석 결과 없음): {etf_row['종목명']}")
+                continue
+            record = {
+                'ETF명': etf_row['종목명'],
+                '종목코드': code,
+                '분류체계': etf_row.get('분류체계', ''),
+                '기초지수': etf_row.get('기초지수', ''),
+                'base_score': calculate_etf_base_score(etf_info),
+                'risk_tier': self.risk_tiers.get_tier(code) if self.risk_tiers is not None else -1,
+                '자산규모': etf_info.get('자산규모/유동성', {}).get('평균 순자산총액'),  # 백만원
+                '거래량': etf_info.get('자산규모/유동성', {}).get('평균 거래량'),
+                '변동성': etf_info.get('위험', {}).get('변동성'),
+                '총보수': etf_info.get('수익률/보수', {}).get('총 보수'),
+            }
+            for j, column in enumerate(DIMENSION_COLUMNS):
+                record[column] = dimension_scores[i, j]
+            self._records[code] = record
+
+
+def cumulative_return_chart_name(window: str) -> str:
+    """누적 수익률 차트의 시각화 이름 (기간별로 따로 생성/캐시)"""
+    return f"cumulative_return_{window}"
+
+
+def downsample_positions(length: int, max_points: int) -> np.ndarray:
+    """
+    공통 날짜축에서 남길 행 위치 (균등 간격, 처음과 마지막 행 포함)
+
+    Args:
+        length: 전체 행 수
+        max_points: 최대 점 개수
+
+    Returns:
+        오름차순 행 위치 배열
+    """
+    if length <= max_points:
+        return np.arange(length)
+    return np.unique(np.linspace(0, length - 1, max_points).round().astype(int))
+
+
+class ComparisonCharts(Mapping):
+    """
+    지연 생성 비교 차트 모음
+
+    차트 이름 → 생성 함수만 보관하고, 차트를 꺼낼 때(표시할 때) 처음 생성합니다.
+    기존 시각화 딕셔너리와 같이 `'score_bar' in charts`, `charts['score_bar']`로 사용합니다.
+
+    결과 캐시와 키가 주어지면 직렬화된 차트 JSON을 (키, 차트 이름)별로 저장해
+    같은 비교에서는 차트를 다시 만들지 않고, JSON에서 검증 없이 Figure를 복원합니다.
+    (캐시된 JSON은 검증된 Figure를 직렬화한 것이므로 다시 검증하지 않음)
+    """
+
+    def __init__(
+        self,
+        builders: Dict[str, Callable[[], go.Figure]],
+        error_chart: Callable[[str], go.Figure],
+        cache: Optional[ResultCache] = None,
+        cache_key_parts: Optional[List[Any]] = None
+    ):
+        """
+        차트 모음 생성
+
+        Args:
+            builders: 차트 이름 → 생성 함수 (표시 순서)
+            error_chart: 생성 실패 시 대체 차트 함수 (메시지 → Figure)
+            cache: 차트 JSON 결과 캐시 (None이면 이 객체 안에서만 재사용)
+            cache_key_parts: 캐시 키 구성 요소 (데이터 버전, ETF 조합, 프로필, None이면 캐시 미사용)
+        """
+        self._builders = builders
+        self._error_chart = error_chart
+        self._cache = cache if cache_key_parts is not None else None
+        self._cache_key_parts = cache_key_parts
+        self._figures: Dict[str, go.Figure] = {}
+
+    def __getitem__(self, name: str) -> go.Figure:
+        if name not in self._builders:
+            raise KeyError(name)
+        if name not in self._figures:
+            self._figures[name] = self._build(name)
+        return self._figures[name]
+
+    def __iter__(self):
+        return iter(self._builders)
+
+    def __len__(self) -> int:
+        return len(self._builders)
+
+    def _build(self, name: str) -> go.Figure:
+        """차트 생성 (캐시가 있으면 JSON 조회, 없으면 계산 후 저장)"""
+        try:
+            if self._cache is None:
+                return self._builders[name]()
+            figure_json = self._cache.get_or_compute(
+                result_key('compare_chart', name, *self._cache_key_parts),
+                lambda: self._builders[name]().to_json()
+            )
+            return go.Figure(json.loads(figure_json), _validate=False)
+        except Exception as e:
+            logger.error(f"차트 생성 오류 ({name}): {e}")
+            return self._error_chart("차트 생성 중 오류")
+
+
 class ETFComparison:
     """ETF 비교 분석 클래스"""
     
-    def __init__(self):
-        """초기화"""
+    def __init__(self, cache_store: Optional[CacheStore] = None, chart_cache: Optional[ResultCache] = None):
+        """
+        초기화
+        
+        Args:
+            cache_store: 캐시 조회기 (None이면 설정 경로로 생성, 앱과 공유 가능)
+            chart_cache: 비교 차트 JSON 캐시 (None이면 차트를 비교 결과 안에서만 재사용)
+        """
         self.engine = ETFRecommendationEngine()
         self.config = Config()
-        self.cache_df = None
+        self.cache_store = cache_store or CacheStore(
+            self.config.get_data_path('cache'),
+            self.config.get_data_path('cache_manifest')
+        )
+        self.chart_cache = chart_cache
+        self._cache_index: Optional[ComparisonCacheIndex] = None
+        self._cache_index_source = None
+        self._analysis_index: Optional[ETFAnalysisIndex] = None
+        self._analysis_index_source = None
+        self._risk_tiers: Optional[RiskTierIndex] = None
+        self._risk_tiers_source = None
+        self._realtime_scorer: Optional[RealtimeScorer] = None
+        self._realtime_scorer_source = None
         self._load_cache()
         logger.info("ETF 비교 분석 엔진 초기화 완료")
     
     def _load_cache(self):
-        """캐시 데이터 로드"""
+        """캐시 데이터 로드 (+ 비교용 조회 인덱스 생성)"""
         try:
-            cache_path = self.config.get_data_path('cache')
-            if os.path.exists(cache_path):
-                self.cache_df = pd.read_csv(cache_path, encoding='utf-8-sig')
-                logger.info(f"캐시 데이터 로드 완료: {len(self.cache_df)}개 레코드")
-            else:
+            cache_df = self.cache_store.get()
+            if cache_df is None:
                 logger.warning("캐시 데이터 파일을 찾을 수 없습니다.")
-                self.cache_df = None
+            else:
+                self.get_cache_index(cache_df)
         except Exception as e:
             logger.error(f"캐시 데이터 로드 중 오류: {e}")
-            self.cache_df = None
+    
+    def get_cache_index(self, cache_df: pd.DataFrame) -> ComparisonCacheIndex:
+        """
+        비교용 캐시 조회 인덱스 (같은 캐시 객체에 대해서는 재사용, 새 버전이 게시되면 다시 생성)
+        
+        Args:
+            cache_df: 캐시 DataFrame
+        
+        Returns:
+            ComparisonCacheIndex
+        """
+        if self._cache_index is None or self._cache_index_source is not cache_df:
+            score_index = self.engine.get_score_index(cache_df) if is_factorized_cache(cache_df) else None
+            self._cache_index = ComparisonCacheIndex(cache_df, score_index)
+            self._cache_index_source = cache_df
+        return self._cache_index
+    
+    def get_analysis_index(
+        self,
+        price_df: pd.DataFrame,
+        info_df: pd.DataFrame,
+        perf_df: Optional[pd.DataFrame] = None,
+        aum_df: Optional[pd.DataFrame] = None,
+        ref_idx_df: Optional[pd.DataFrame] = None,
+        risk_df: Optional[pd.DataFrame] = None
+    ) -> ETFAnalysisIndex:
+        """
+        시세 분석 인덱스 (같은 데이터 객체들에 대해서는 재사용)
+        
+        Args:
+            price_df: 시세 데이터 DataFrame
+            info_df: ETF 기본 정보 DataFrame
+            perf_df, aum_df, ref_idx_df, risk_df: 공식 데이터 (실시간 점수 계산용, None이면 빈 데이터)
+        
+        Returns:
+            ETFAnalysisIndex (종목명 → 종목코드 조회표 + 종목코드별 시세 구간 + 공식 데이터)
+        """
+        frames = (price_df, info_df, perf_df, aum_df, ref_idx_df, risk_df)
+        source = self._analysis_index_source
+        if self._analysis_index is None or source is None or any(a is not b for a, b in zip(source, frames)):
+            official = [frame if frame is not None else pd.DataFrame() for frame in frames[2:]]
+            self._analysis_index = ETFAnalysisIndex(price_df, info_df, *official)
+            self._analysis_index_source = frames
+        return self._analysis_index
+    
+    def get_risk_tiers(self) -> Optional[RiskTierIndex]:
+        """
+        최신 위험등급 인덱스 (캐시 빌더와 같은 파일, 파일이 바뀌지 않으면 재사용)
+        
+        Returns:
+            RiskTierIndex 또는 None (위험등급 파일이 없거나 읽을 수 없음)
+        """
+        try:
+            snapshot_path = self.config.get_data_path('risk_tier_latest')
+            history_path = self.config.get_risk_tier_history_path()
+            path = snapshot_path if os.path.exists(snapshot_path) else history_path
+            if not os.path.exists(path):
+                logger.warning(f"Risk tier 파일을 찾을 수 없어 측정불가로 계산합니다: {snapshot_path}")
+                return None
+            source = (path, os.path.getmtime(path))
+            if self._risk_tiers is None or self._risk_tiers_source != source:
+                if path == snapshot_path:
+                    self._risk_tiers = RiskTierIndex.from_file(path)
+                else:
+                    history = pd.read_csv(path, encoding='utf-8-sig', dtype={'srtnCd': str})
+                    self._risk_tiers = RiskTierIndex.from_history(history)
+                self._risk_tiers_source = source
+            return self._risk_tiers
+        except Exception as e:
+            logger.error(f"Risk tier 로드 중 오류: {e}")
+            return None
+    
+    def get_realtime_scorer(self, analysis_index: ETFAnalysisIndex) -> RealtimeScorer:
+        """
+        실시간 점수 계산기 (같은 분석 인덱스/위험등급에 대해서는 재사용)
+        
+        Args:
+            analysis_index: 시세 분석 인덱스
+        
+        Returns:
+            RealtimeScorer
+        """
+        risk_tiers = self.get_risk_tiers()
+        source = self._realtime_scorer_source
+        if self._realtime_scorer is None or source is None or source[0] is not analysis_index or source[1] is not risk_tiers:
+            self._realtime_scorer = RealtimeScorer(self.engine, analysis_index, risk_tiers, self.config)
+            self._realtime_scorer_source = (analysis_index, risk_tiers)
+        return self._realtime_scorer
+    
+    @property
+    def cache_df(self) -> Optional[pd.DataFrame]:
+        """현재 캐시 (새 버전이 게시되었으면 교체된 사본)"""
+        return self.cache_store.get()
     
     def compare_etfs(
         self, 
         etf_names: List[str], 
         user_profile: Dict[str, Any], 
         price_df: pd.DataFrame, 
-        info_df: pd.DataFrame
+        info_df: pd.DataFrame,
+        snapshot: Optional[str] = None,
+        perf_df: Optional[pd.DataFrame] = None,
+        aum_df: Optional[pd.DataFrame] = None,
+        ref_idx_df: Optional[pd.DataFrame] = None,
+        risk_df: Optional[pd.DataFrame] = None
     ) -> Dict[str, Any]:
         """
         여러 ETF를 사용자 프로필에 맞게 비교 분석 (멀티레이어 최적화)
@@ -89,9 +520,11 @@ class ETFComparison:
             user_profile: 사용자 프로필 (level, investor_type)
             price_df: 시세 데이터 DataFrame
             info_df: ETF 기본 정보 DataFrame
+            snapshot: 데이터 버전 식별자 (차트 캐시 키, None이면 차트를 캐시하지 않음)
+            perf_df, aum_df, ref_idx_df, risk_df: 공식 데이터 (캐시에 없는 ETF의 실시간 점수 계산용)
         
         Returns:
-            비교 분석 결과 딕셔너리
+            비교 분석 결과 딕셔너리 (visualizations는 표시할 때 생성되는 ComparisonCharts)
         """
         try:
             # 1단계: 입력 검증
@@ -100,8 +533,9 @@ class ETFComparison:
                 return {'error': validation_error}
             
             # 2단계: 멀티레이어 분석 (캐시 + 실시간)
+            analysis_index = self.get_analysis_index(price_df, info_df, perf_df, aum_df, ref_idx_df, risk_df)
             scored_etfs, valid_etfs = self._analyze_etfs_hybrid(
-                etf_names, user_profile, price_df, info_df
+                etf_names, user_profile, analysis_index
             )
             
             if len(valid_etfs) < MIN_COMPARISON_ETFS:
@@ -110,7 +544,9 @@ class ETFComparison:
                 }
             
             # 3단계: 비교 분석 결과 생성
-            comparison_result = self._generate_comparison_result(scored_etfs, user_profile)
+            comparison_result = self._generate_comparison_result(
+                scored_etfs, user_profile, snapshot, analysis_index
+            )
             
             logger.info(f"ETF 비교 분석 완료: {len(scored_etfs)}개 ETF")
             return comparison_result
@@ -124,8 +560,8 @@ class ETFComparison:
         if len(etf_names) < MIN_COMPARISON_ETFS:
             return f'ETF 비교를 위해서는 최소 {MIN_COMPARISON_ETFS}개 이상의 ETF가 필요합니다.'
         
-        if len(etf_names) > MAX_COMPARISON_ETFS:
-            return f'ETF 비교는 최대 {MAX_COMPARISON_ETFS}개까지만 가능합니다.'
+        if len(etf_names) > MAX_LARGE_COMPARISON_ETFS:
+            return f'ETF 비교는 최대 {MAX_LARGE_COMPARISON_ETFS}개까지만 가능합니다.'
         
         return None
     
@@ -133,10 +569,9 @@ class ETFComparison:
         self, 
         etf_names: List[str], 
         user_profile: Dict[str, Any],
-        price_df: pd.DataFrame, 
-        info_df: pd.DataFrame
+        analysis_index: ETFAnalysisIndex
     ) -> Tuple[List[Dict], List[str]]:
-        """ETF 분석"""
+        """ETF 분석 (캐시 점수 우선, 캐시에 없는 ETF는 실시간 점수 계산)"""
         scored_etfs = []
         valid_etfs = []
         
@@ -144,28 +579,43 @@ class ETFComparison:
         level = self._normalize_user_level(user_profile.get('level', 2))
         investor_type = user_profile.get('investor_type', 'ARSB')
         
+        # ETF명 정규화 (정확한 종목명은 조회표로, 나머지는 부분/유사 매칭)
+        info_df = analysis_index.info_df
+        clean_names = []
         for etf_name in etf_names:
             try:
-                # ETF명 정규화
-                clean_name = extract_etf_name_from_input(etf_name, info_df)
-                
-                if not clean_name:
-                    logger.warning(f"ETF명을 찾을 수 없음: {etf_name}")
-                    continue
-                
-                # 1. 캐시에서 기본 점수 및 공식 데이터 조회
-                cache_data = self._get_cache_data(clean_name, level, investor_type)
-                
-                # 2. 실시간 시세 데이터 조회
-                realtime_data = self._get_realtime_data(clean_name, price_df, info_df)
+                clean_name = analysis_index.exact_name(etf_name) or extract_etf_name_from_input(etf_name, info_df)
+            except Exception as e:
+                logger.error(f"ETF {etf_name} 분석 중 오류: {e}")
+                continue
+            if not clean_name:
+                logger.warning(f"ETF명을 찾을 수 없음: {etf_name}")
+                continue
+            clean_names.append(clean_name)
+        
+        # 1. 캐시에서 기본 점수 및 공식 데이터 일괄 조회
+        cache_data_by_name = self._get_cache_data(clean_names, level, investor_type)
+        
+        # 2. 캐시에 없는 ETF는 빌더와 같은 식으로 실시간 점수 계산
+        missing = [name for name in clean_names if name not in cache_data_by_name]
+        if missing:
+            cache_data_by_name.update(self._get_realtime_scores(missing, level, investor_type, analysis_index))
+        
+        # 3. 실시간 시세 데이터 일괄 조회
+        realtime_data_by_name = self._get_realtime_data(clean_names, analysis_index)
+        
+        for clean_name in clean_names:
+            try:
+                cache_data = cache_data_by_name.get(clean_name)
+                realtime_data = realtime_data_by_name.get(clean_name)
                 
-                # 3. 데이터 통합
+                # 4. 데이터 통합
                 if cache_data and realtime_data:
                     # 캐시에서 공식 데이터 추출
                     official_data = {
                         '수익률/보수': {'총 보수': cache_data.get('총보수')},
                         '자산규모/유동성': {
-                            '자산규모': cache_data.get('자산규모'),
+                            '평균 순자산총액': cache_data.get('자산규모'),
                             '평균 거래량': cache_data.get('거래량')
                         },
                         '위험': {'변동성': cache_data.get('변동성')},
@@ -191,6 +641,8 @@ class ETFComparison:
                         'type_weight': cache_data['type_weight'],
                         'final_score': cache_data['final_score'],
                         'risk_tier': cache_data['risk_tier'],
+                        'score_source': 'realtime' if clean_name in missing else 'cache',
+                        'level_restricted': bool(cache_data.get('level_restricted', False)),
                         'rank': 0
                     })
                     valid_etfs.append(clean_name)
@@ -198,7 +650,7 @@ class ETFComparison:
                     logger.warning(f"ETF 데이터 수집 실패: {clean_name}")
                     
             except Exception as e:
-                logger.error(f"ETF {etf_name} 분석 중 오류: {e}")
+                logger.error(f"ETF {clean_name} 분석 중 오류: {e}")
                 continue
         
         # 점수순 정렬 및 순위 부여
@@ -209,146 +661,91 @@ class ETFComparison:
         logger.info(f"ETF 분석 완료: {len(valid_etfs)}개 성공")
         return scored_etfs, valid_etfs
 
-    def _get_cache_data(self, etf_name: str, level: int, investor_type: str) -> Optional[Dict]:
-        """캐시에서 ETF 점수 및 공식 데이터 조회"""
-        if self.cache_df is None:
+    def _get_cache_data(self, etf_names: List[str], level: int, investor_type: str) -> Dict[str, Dict]:
+        """
+        캐시에서 여러 ETF의 점수 및 공식 데이터 조회 (인덱스 조회 N번 + take 한 번)
+        
+        Args:
+            etf_names: 정규화된 ETF명 리스트
+            level: 사용자 레벨
+            investor_type: 투자자 유형
+        
+        Returns:
+            ETF명 → 캐시 데이터 (캐시에 없으면 제외, 레벨 제한 초과는 level_restricted로 표시)
+        """
+        # 조회 도중 새 버전으로 교체되어도 한 번의 조회는 같은 사본을 사용
+        cache_df = self.cache_df
+        if cache_df is None:
             logger.warning("캐시 데이터가 없어 실시간 계산으로 대체합니다.")
-            return None
+            return {}
         
         try:
-            # 캐시에서 해당 ETF의 점수 조회
-            etf_cache = self.cache_df[
-                (self.cache_df['ETF명'] == etf_name) &
-                (self.cache_df['level'] == level) &
-                (self.cache_df['investor_type'] == investor_type)
-            ]
-            
-            if not etf_cache.empty:
-                cache_row = etf_cache.iloc[0]
-                return {
-                    # 점수 정보
-                    'base_score': cache_row['base_score'],
-                    'type_weight': cache_row['type_weight'],
-                    'final_score': cache_row['final_score'],
-                    'risk_tier': cache_row['risk_tier'],
-                    
-                    # 공식 데이터 (캐시에 저장된)
-                    '종목코드': cache_row['종목코드'],
-                    '분류체계': cache_row['분류체계'],
-                    '기초지수': cache_row['기초지수'],
-                    '자산규모': cache_row['자산규모'],
-                    '거래량': cache_row['거래량'],
-                    '변동성': cache_row['변동성'],
-                    '총보수': cache_row['총보수']
-                }
-            else:
-                return None
-                
+            return self.get_cache_index(cache_df).lookup(etf_names, level, investor_type)
         except Exception as e:
             logger.error(f"캐시 데이터 조회 중 오류: {e}")
-            return None
+            return {}
 
-    def _calculate_fallback_scores(self, etf_data: Dict, user_profile: Dict) -> Dict:
-        """캐시가 없을 때 실시간 점수 계산 (fallback)"""
-        try:
-            # 기본 점수 계산
-            base_score = self.engine.calculate_base_score(etf_data)
-            
-            # 투자자 유형 가중치 계산 (기본값 사용)
-            investor_type = user_profile.get('investor_type', 'ARSB')
-            type_weight = 1.0  # 기본 가중치
-            
-            # 최종 점수 계산
-            final_score = base_score * type_weight
-            
-            return {
-                'base_score': base_score,
-                'type_weight': type_weight,
-                'final_score': final_score,
-                'risk_tier': 2  # 기본 risk tier
-            }
-            
-        except Exception as e:
-            logger.error(f"Fallback 점수 계산 중 오류: {e}")
-            return {
-                'base_score': 0.5,
-                'type_weight': 1.0,
-                'final_score': 0.5,
-                'risk_tier': 2
-            }
-
-    def _get_realtime_data(self, etf_name: str, price_df: pd.DataFrame, info_df: pd.DataFrame) -> Optional[Dict]:
-        """실시간 시세 데이터 조회"""
+    def _get_realtime_scores(
+        self, etf_names: List[str], level: int, investor_type: str, analysis_index: ETFAnalysisIndex
+    ) -> Dict[str, Dict]:
+        """
+        캐시에 없는 ETF의 실시간 점수 계산 (캐시 조회 결과와 같은 형식)
+        
+        Args:
+            etf_names: 정규화된 ETF명 리스트
+            level: 사용자 레벨
+            investor_type: 투자자 유형
+            analysis_index: 시세 분석 인덱스
+        
+        Returns:
+            ETF명 → 점수 및 공식 데이터 (종목코드가 없거나 분석 실패면 제외)
+        """
         try:
-            # ETF 코드 찾기
-            etf_info = info_df[info_df['종목명'] == etf_name]
-            if etf_info.empty:
-                return None
-            
-            etf_code = etf_info.iloc[0].get('단축코드', etf_info.iloc[0].get('종목코드', ''))
-            if not etf_code:
-                return None
+            codes = {}
+            for etf_name in etf_names:
+                _, etf_code = analysis_index.resolve(etf_name)
+                if etf_code:
+                    codes[etf_name] = str(etf_code)
             
-            # 시세 데이터 분석 (내부 함수로 구현)
-            market_data = self._analyze_market_data_internal(price_df, etf_code)
-            return market_data
+            scores = self.get_realtime_scorer(analysis_index).score(list(codes.values()), level, investor_type)
+            result = {name: scores[code] for name, code in codes.items() if code in scores}
+            if result:
+                logger.info(f"캐시에 없는 ETF 실시간 점수 계산: {', '.join(result)}")
+            return result
             
         except Exception as e:
-            logger.error(f"실시간 데이터 조회 중 오류: {e}")
-            return None
+            logger.error(f"실시간 점수 계산 중 오류: {e}")
+            return {}
 
-    def _analyze_market_data_internal(self, price_df: pd.DataFrame, etf_code: str) -> Optional[Dict[str, Any]]:
-        """시세 데이터 분석"""
+    def _get_realtime_data(self, etf_names: List[str], analysis_index: ETFAnalysisIndex) -> Dict[str, Dict]:
+        """
+        여러 ETF의 실시간 시세 데이터 일괄 조회
+        
+        Args:
+            etf_names: 정규화된 ETF명 리스트
+            analysis_index: 시세 분석 인덱스
+        
+        Returns:
+            ETF명 → 시세 분석 결과 (종목코드나 시세가 없으면 제외)
+        """
         try:
-            # ETF 시세 데이터 추출
-            etf_prices = price_df[price_df['srtnCd'].astype(str) == str(etf_code)].copy()
-            
-            if etf_prices.empty:
-                return None
-            
-            # 데이터 전처리
-            etf_prices['date'] = pd.to_datetime(etf_prices['basDt'], format='%Y%m%d', errors='coerce')
-            etf_prices['clpr'] = pd.to_numeric(etf_prices['clpr'], errors='coerce')
-            
-            # 결측치 및 중복 제거
-            etf_prices = etf_prices.dropna(subset=['date', 'clpr'])
-            etf_prices = etf_prices.drop_duplicates(subset=['date'])
-            etf_prices = etf_prices.sort_values('date').reset_index(drop=True)
-            
-            if len(etf_prices) < 2:
-                return None
-            
-            # 수익률 계산
-            returns = {}
-            for period, days in [('3개월', 63), ('1년', 252)]:
-                if len(etf_prices) >= days + 1:
-                    start_price = etf_prices.iloc[-(days+1)]['clpr']
-                    end_price = etf_prices.iloc[-1]['clpr']
-                    if start_price > 0:
-                        returns[f'{period} 수익률'] = ((end_price / start_price) - 1) * 100
-                    else:
-                        returns[f'{period} 수익률'] = None
-                else:
-                    returns[f'{period} 수익률'] = None
-            
-            # 변동성 계산 (일간 수익률의 표준편차)
-            price_changes = etf_prices['clpr'].pct_change().dropna()
-            volatility = price_changes.std() * 100 * np.sqrt(252) if len(price_changes) > 1 else None  # 연환산
-            
-            # 최대낙폭 계산
-            rolling_max = etf_prices['clpr'].cummax()
-            drawdown = (etf_prices['clpr'] - rolling_max) / rolling_max
-            max_drawdown = drawdown.min() * 100 if not drawdown.empty else None
+            # ETF 코드 찾기 (종목명 조회표)
+            codes = {}
+            for etf_name in etf_names:
+                _, etf_code = analysis_index.resolve(etf_name)
+                if etf_code:
+                    codes[etf_name] = etf_code
             
+            # 시세 데이터 분석 (종목코드별 구간에서 한 번에 계산)
+            metrics = analysis_index.market_metrics(list(codes.values()))
             return {
-                **returns,
-                '변동성': volatility,
-                '최대낙폭': max_drawdown
+                etf_name: metrics[str(etf_code)]
+                for etf_name, etf_code in codes.items() if metrics.get(str(etf_code))
             }
             
         except Exception as e:
-            logger.error(f"시세 데이터 분석 오류: {e}")
-            return None
+            logger.error(f"실시간 데이터 조회 중 오류: {e}")
+            return {}
 
     # _get_official_data 메서드는 캐시에서 공식 데이터를 조회하므로 제거됨
 
@@ -367,7 +764,13 @@ class ETFComparison:
     
 
     
-    def _generate_comparison_result(self, scored_etfs: List[Dict], user_profile: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_comparison_result(
+        self,
+        scored_etfs: List[Dict],
+        user_profile: Dict[str, Any],
+        snapshot: Optional[str] = None,
+        analysis_index: Optional[ETFAnalysisIndex] = None
+    ) -> Dict[str, Any]:
         """비교 분석 결과 생성"""
         if not scored_etfs:
             return {
@@ -379,12 +782,29 @@ class ETFComparison:
                 'summary': '비교 가능한 ETF가 없습니다. ETF명을 다시 확인해 주세요.',
                 'recommendations': '비교 가능한 ETF가 없습니다. ETF명을 다시 확인해 주세요.'
             }
+        if len(scored_etfs) > MAX_COMPARISON_ETFS:
+            # 대량 비교: 지표를 한 번에 모아 테이블/차트/프롬프트 요약에 공유
+            metrics = self._create_metrics_frame(scored_etfs)
+            summary = self._create_large_summary(scored_etfs, metrics, user_profile)
+            return {
+                'user_profile': user_profile,
+                'mode': 'large',
+                'etf_count': len(scored_etfs),
+                'etfs': scored_etfs,
+                'comparison_table': self._create_large_comparison_table(metrics),
+                'visualizations': self._create_large_visualizations(
+                    scored_etfs, metrics, user_profile, snapshot, analysis_index
+                ),
+                'summary': summary,
+                'recommendations': self._create_recommendations(scored_etfs, user_profile, summary)
+            }
         return {
             'user_profile': user_profile,
+            'mode': 'standard',
             'etf_count': len(scored_etfs),
             'etfs': scored_etfs,
             'comparison_table': self._create_comparison_table(scored_etfs),
-            'visualizations': self._create_visualizations(scored_etfs, user_profile),
+            'visualizations': self._create_visualizations(scored_etfs, user_profile, snapshot, analysis_index),
             'summary': self._create_summary(scored_etfs, user_profile),
             'recommendations': self._create_recommendations(scored_etfs, user_profile)
         }
@@ -474,42 +894,77 @@ class ETFComparison:
     # 시각화 생성
     # =============================================================================
     
-    def _create_visualizations(self, scored_etfs: List[Dict], user_profile: Dict) -> Dict[str, go.Figure]:
+    def _create_visualizations(
+        self,
+        scored_etfs: List[Dict],
+        user_profile: Dict,
+        snapshot: Optional[str] = None,
+        analysis_index: Optional[ETFAnalysisIndex] = None
+    ) -> ComparisonCharts:
         """
-        시각화 생성
+        시각화 생성 함수 등록 (차트는 표시할 때 생성)
         
         Args:
             scored_etfs: 점수 계산된 ETF 리스트
             user_profile: 사용자 프로필
+            snapshot: 데이터 버전 식별자 (None이면 차트 JSON을 캐시하지 않음)
+            analysis_index: 시세 분석 인덱스 (있으면 기간별 누적 수익률 차트 추가)
         
         Returns:
-            시각화 딕셔너리
+            차트 이름 → Figure 지연 생성 모음
         """
-        visualizations = {}
-        
-        try:
+        builders = {
             # 1. 종합 점수 바 차트
-            visualizations['score_bar'] = self._create_score_bar_chart(scored_etfs)
+            'score_bar': lambda: self._create_score_bar_chart(scored_etfs),
             
             # 2. 수익률 vs 위험 산점도
-            visualizations['risk_return_scatter'] = self._create_risk_return_scatter(scored_etfs)
+            'risk_return_scatter': lambda: self._create_risk_return_scatter(scored_etfs),
             
             # 3. 레이더 차트 (다차원 비교)
-            visualizations['radar_chart'] = self._create_radar_chart(scored_etfs)
+            'radar_chart': lambda: self._create_radar_chart(scored_etfs),
             
             # 4. 히트맵 (상관관계)
-            visualizations['heatmap'] = self._create_correlation_heatmap(scored_etfs)
+            'heatmap': lambda: self._create_correlation_heatmap(scored_etfs),
             
             # 5. 수익률 시계열 비교 
-            visualizations['returns_comparison'] = self._create_returns_comparison(scored_etfs)
+            'returns_comparison': lambda: self._create_returns_comparison(scored_etfs),
             
             # 6. 비용 vs 성과 분석
-            visualizations['cost_performance'] = self._create_cost_performance_chart(scored_etfs)
-            
-        except Exception as e:
-            logger.error(f"시각화 생성 중 오류: {e}")
+            'cost_performance': lambda: self._create_cost_performance_chart(scored_etfs)
+        }
         
-        return visualizations
+        # 7. 기간별 누적 수익률 (선택한 기간만 생성)
+        builders.update(self._cumulative_return_builders(scored_etfs, analysis_index))
+        return ComparisonCharts(
+            builders, self._create_error_chart, self.chart_cache,
+            self._chart_cache_key_parts(scored_etfs, user_profile, snapshot)
+        )
+    
+    def _cumulative_return_builders(
+        self, scored_etfs: List[Dict], analysis_index: Optional[ETFAnalysisIndex], webgl: bool = False
+    ) -> Dict[str, Callable[[], go.Figure]]:
+        """기간별 누적 수익률 차트 생성 함수 (시세 분석 인덱스가 없으면 빈 딕셔너리)"""
+        if analysis_index is None:
+            return {}
+        return {
+            cumulative_return_chart_name(window): (
+                lambda window=window: self._create_cumulative_return_chart(scored_etfs, analysis_index, window, webgl)
+            )
+            for window in CUMULATIVE_RETURN_WINDOWS
+        }
+    
+    def _chart_cache_key_parts(
+        self, scored_etfs: List[Dict], user_profile: Dict, snapshot: Optional[str]
+    ) -> Optional[List[Any]]:
+        """차트 캐시 키: 데이터 버전 + ETF 조합(순서 무관) + 프로필 (데이터 버전이 없으면 None)"""
+        if snapshot is None:
+            return None
+        return [
+            snapshot,
+            sorted(etf['etf_data']['ETF명'] for etf in scored_etfs),
+            self._normalize_user_level(user_profile.get('level', 2)),
+            user_profile.get('investor_type', 'ARSB')
+        ]
     
     def _create_score_bar_chart(self, scored_etfs: List[Dict]) -> go.Figure:
         """종합 점수 바 차트"""
@@ -601,7 +1056,7 @@ class ETFComparison:
         """레이더 차트 (다차원 비교)"""
         try:
             fig = go.Figure()
-            categories = ['수익률', '비용효율성', '유동성', '안정성', '규모']
+            categories = RADAR_CATEGORIES
             
             for etf in scored_etfs:
                 values = self._calculate_radar_values(etf['etf_data'])
@@ -761,6 +1216,96 @@ class ETFComparison:
             logger.error(f"수익률 비교 차트 생성 오류: {e}")
             return self._create_error_chart("수익률 비교 차트 생성 중 오류")
     
+    def _create_cumulative_return_chart(
+        self,
+        scored_etfs: List[Dict],
+        analysis_index: ETFAnalysisIndex,
+        window: str = DEFAULT_CUMULATIVE_RETURN_WINDOW,
+        webgl: bool = False
+    ) -> go.Figure:
+        """
+        누적 수익률 비교 차트 (기준 100)
+        
+        날짜 기준으로 맞춘 종가의 최근 기간 구간을 ETF별 구간 내 첫 종가로 나눠 100 기준으로 만들고,
+        공통 날짜축을 CUMULATIVE_RETURN_POINT_BUDGET / ETF 수(최소 CUMULATIVE_RETURN_MIN_POINTS)개
+        점으로 줄여 그립니다. (기간 중 상장한 ETF는 상장일부터 100으로 시작)
+        
+        Args:
+            scored_etfs: 점수 계산된 ETF 리스트
+            analysis_index: 시세 분석 인덱스
+            window: CUMULATIVE_RETURN_WINDOWS의 기간 이름
+            webgl: 대량 비교 여부 (ETF별 선을 WebGL 트레이스 1개로 그림)
+        
+        Returns:
+            누적 수익률 차트
+        """
+        try:
+            names = {}
+            for etf in scored_etfs:
+                code = etf['etf_data'].get('기본정보', {}).get('종목코드')
+                if code:
+                    names.setdefault(str(code), etf['etf_data']['ETF명'])
+            
+            prices = analysis_index.price_history(list(names))
+            days = CUMULATIVE_RETURN_WINDOWS.get(window)
+            if days is not None:
+                prices = prices.iloc[-(days + 1):]
+            if len(prices) < 2:
+                return self._create_error_chart("누적 수익률을 계산할 시세 데이터가 없습니다")
+            
+            # 기준 100 정규화 (ETF별 구간 내 첫 종가 기준) 후 공통 날짜축 축소
+            cumulative = prices / prices.bfill().iloc[0] * 100
+            max_points = max(CUMULATIVE_RETURN_MIN_POINTS, CUMULATIVE_RETURN_POINT_BUDGET // len(cumulative.columns))
+            cumulative = cumulative.iloc[downsample_positions(len(cumulative), max_points)]
+            dates = cumulative.index.strftime('%Y-%m-%d')
+            
+            if webgl:
+                # 대량 비교: ETF별 선을 빈 점으로 이어 붙인 WebGL 트레이스 1개
+                values = cumulative.round(2).to_numpy()
+                count, width = values.shape
+                x = np.append(np.asarray(dates, dtype=object), None)
+                fig = go.Figure(go.Scattergl(
+                    x=np.tile(x, width),
+                    y=np.vstack([values, np.full((1, width), np.nan)]).T.ravel(),
+                    text=np.repeat([names[code] for code in cumulative.columns], count + 1),
+                    mode='lines',
+                    line=dict(width=1),
+                    opacity=0.6,
+                    connectgaps=False,
+                    hovertemplate="<b>%{text}</b><br>%{x}<br>누적: %{y:.1f}<extra></extra>"
+                ))
+            else:
+                fig = go.Figure(data=[
+                    go.Scatter(
+                        x=dates,
+                        y=cumulative[code].round(2).to_numpy(),
+                        mode='lines',
+                        name=names[code],
+                        line=dict(width=2, color=CHART_COLORS[i % len(CHART_COLORS)]),
+                        hovertemplate=f"<b>{names[code]}</b><br>%{{x}}<br>누적: %{{y:.1f}}<extra></extra>"
+                    )
+                    for i, code in enumerate(cumulative.columns)
+                ])
+            fig.add_hline(y=100, line_dash='dot', line_color='gray')
+            
+            period = f"최근 {window}" if days is not None else "전체 기간"
+            fig.update_layout(
+                title=f"📈 누적 수익률 비교 (기준 100, {period})",
+                xaxis_title="날짜",
+                yaxis_title="누적 수익률 (기준 100)",
+                template="plotly_white",
+                font=dict(size=12, family="Pretendard, NanumGothic"),
+                showlegend=not webgl,
+                height=450,
+                margin=dict(l=50, r=50, t=80, b=50)
+            )
+            
+            return fig
+            
+        except Exception as e:
+            logger.error(f"누적 수익률 차트 생성 오류: {e}")
+            return self._create_error_chart("누적 수익률 차트 생성 중 오류")
+    
     def _create_cost_performance_chart(self, scored_etfs: List[Dict]) -> go.Figure:
         """비용 vs 성과 분석"""
         try:
@@ -835,6 +1380,266 @@ class ETFComparison:
         )
         return fig
     
+    # =============================================================================
+    # 대량 비교 (MAX_COMPARISON_ETFS 초과)
+    # =============================================================================
+    
+    def _create_metrics_frame(self, scored_etfs: List[Dict]) -> pd.DataFrame:
+        """
+        대량 비교용 지표 테이블 (ETF당 1행, 순위순)
+        
+        테이블, 차트, 프롬프트 요약이 이 DataFrame 하나를 공유하며,
+        레이더 지표(0-100)는 _calculate_radar_values와 같은 식을 컬럼 단위로 계산합니다.
+        
+        Args:
+            scored_etfs: 점수 계산된 ETF 리스트 (순위순)
+        
+        Returns:
+            지표 DataFrame (수치 컬럼은 float, 없는 값은 NaN)
+        """
+        etf_data = [etf['etf_data'] for etf in scored_etfs]
+        market = [data.get('시세분석') or {} for data in etf_data]
+        performance = [data.get('수익률/보수') or {} for data in etf_data]
+        aum = [data.get('자산규모/유동성') or {} for data in etf_data]
+        risk = [data.get('위험') or {} for data in etf_data]
+        
+        def numeric(values) -> np.ndarray:
+            return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+        
+        frame = pd.DataFrame({
+            'ETF명': [data['ETF명'] for data in etf_data],
+            '순위': [etf['rank'] for etf in scored_etfs],
+            '종합점수': numeric([etf['final_score'] for etf in scored_etfs]),
+            '1년수익률': numeric([m.get('1년 수익률') for m in market]),
+            '3개월수익률': numeric([m.get('3개월 수익률') for m in market]),
+            '실현변동성': numeric([m.get('변동성') for m in market]),
+            '최대낙폭': numeric([m.get('최대낙폭') for m in market]),
+            '총보수': numeric([p.get('총 보수') for p in performance]),
+            '자산규모': numeric([a.get('평균 순자산총액') for a in aum]),
+            '거래량': numeric([a.get('평균 거래량') for a in aum]),
+            '변동성등급': [r.get('변동성') for r in risk]
+        })
+        
+        # 레이더 지표 (0-100 스케일, 값이 없으면 _calculate_radar_values와 같은 기본값)
+        returns = frame['1년수익률'].where(frame['1년수익률'].fillna(0) != 0, frame['3개월수익률']).fillna(0)
+        fee = frame['총보수'].where(frame['총보수'].fillna(0) != 0, 1.0)
+        frame['수익률'] = ((returns + 50) * 2).clip(0, 100)
+        frame['비용효율성'] = ((2 - fee) * 50).clip(0, 100)
+        frame['유동성'] = (frame['거래량'].fillna(0) / 10000).clip(0, 100)
+        frame['안정성'] = frame['변동성등급'].map(STABILITY_SCORE_MAP).fillna(60).astype(float)
+        frame['규모'] = (frame['자산규모'].fillna(0) / 10000).clip(0, 100)
+        return frame
+    
+    def _create_large_comparison_table(self, metrics: pd.DataFrame) -> pd.DataFrame:
+        """
+        대량 비교 테이블 (컬럼 단위 생성, 화면에서 정렬할 수 있도록 수치 유지)
+        
+        Args:
+            metrics: _create_metrics_frame 결과
+        
+        Returns:
+            비교 테이블 DataFrame
+        """
+        return pd.DataFrame({
+            'ETF명': metrics['ETF명'],
+            '순위': metrics['순위'],
+            '종합점수': metrics['종합점수'].round(3),
+            '1년수익률(%)': metrics['1년수익률'].round(2),
+            '3개월수익률(%)': metrics['3개월수익률'].round(2),
+            '총보수(%)': metrics['총보수'].round(3),
+            '자산규모(억원)': (metrics['자산규모'] / 100).round(0),  # 캐시 자산규모 단위: 백만원
+            '거래량': metrics['거래량'],
+            '변동성': metrics['변동성등급'].fillna('N/A'),
+            '최대낙폭(%)': metrics['최대낙폭'].round(2)
+        })
+    
+    def _create_large_visualizations(
+        self,
+        scored_etfs: List[Dict],
+        metrics: pd.DataFrame,
+        user_profile: Dict,
+        snapshot: Optional[str] = None,
+        analysis_index: Optional[ETFAnalysisIndex] = None
+    ) -> ComparisonCharts:
+        """
+        대량 비교 시각화 생성 함수 등록 (ETF마다 트레이스를 추가하지 않는 차트만 사용)
+        
+        Args:
+            scored_etfs: 점수 계산된 ETF 리스트
+            metrics: _create_metrics_frame 결과
+            user_profile: 사용자 프로필
+            snapshot: 데이터 버전 식별자 (None이면 차트 JSON을 캐시하지 않음)
+            analysis_index: 시세 분석 인덱스 (있으면 기간별 누적 수익률 차트 추가)
+        
+        Returns:
+            차트 이름 → Figure 지연 생성 모음
+        """
+        builders = {
+            # 1. 종합 점수 가로 바 차트 (단일 트레이스)
+            'score_bar': lambda: self._create_large_score_bar_chart(metrics),
+            
+            # 2. 수익률 vs 실현 변동성 산점도 (WebGL 단일 트레이스)
+            'risk_return_scatter': lambda: self._create_large_risk_return_scatter(metrics),
+            
+            # 3. 지표 히트맵 (레이더 차트 대체)
+            'metric_heatmap': lambda: self._create_metric_heatmap(metrics),
+            
+            # 4. 히트맵 (지표 간 상관관계)
+            'heatmap': lambda: self._create_correlation_heatmap(scored_etfs)
+        }
+        
+        # 5. 기간별 누적 수익률 (WebGL, ETF 수에 맞춰 점 개수 축소)
+        builders.update(self._cumulative_return_builders(scored_etfs, analysis_index, webgl=True))
+        return ComparisonCharts(
+            builders, self._create_error_chart, self.chart_cache,
+            self._chart_cache_key_parts(scored_etfs, user_profile, snapshot)
+        )
+    
+    def _create_large_score_bar_chart(self, metrics: pd.DataFrame) -> go.Figure:
+        """종합 점수 가로 바 차트 (순위순, ETF 수에 맞춰 높이 조정)"""
+        try:
+            fig = go.Figure(go.Bar(
+                x=metrics['종합점수'],
+                y=metrics['ETF명'],
+                orientation='h',
+                marker=dict(color=metrics['종합점수'], colorscale='Blues'),
+                hovertemplate='%{y}<br>종합점수: <b>%{x:.3f}</b><extra></extra>'
+            ))
+            
+            fig.update_layout(
+                title=f"🏆 ETF 종합 점수 비교 ({len(metrics)}개)",
+                xaxis_title="종합 점수",
+                yaxis=dict(autorange='reversed'),
+                template="plotly_white",
+                font=dict(size=12, family="Pretendard, NanumGothic"),
+                showlegend=False,
+                height=max(400, 18 * len(metrics) + 120),
+                margin=dict(l=50, r=50, t=80, b=50)
+            )
+            
+            return fig
+            
+        except Exception as e:
+            logger.error(f"점수 바차트 생성 오류: {e}")
+            return self._create_error_chart("점수 바차트 생성 중 오류")
+    
+    def _create_large_risk_return_scatter(self, metrics: pd.DataFrame) -> go.Figure:
+        """수익률 vs 실현 변동성 산점도 (WebGL, 색상: 종합점수)"""
+        try:
+            returns = metrics['1년수익률'].fillna(metrics['3개월수익률'])
+            points = metrics.assign(수익률_표시=returns).dropna(subset=['실현변동성', '수익률_표시'])
+            
+            fig = go.Figure(go.Scattergl(
+                x=points['실현변동성'],
+                y=points['수익률_표시'],
+                mode='markers',
+                marker=dict(
+                    size=10,
+                    opacity=0.8,
+                    color=points['종합점수'],
+                    colorscale='Viridis',
+                    colorbar=dict(title='종합점수')
+                ),
+                customdata=np.column_stack([
+                    points['ETF명'], points['순위'], points['변동성등급'].fillna('N/A'), points['종합점수']
+                ]),
+                hovertemplate="<b>%{customdata[0]}</b> (%{customdata[1]}위)<br>" +
+                              "수익률: %{y:.2f}%<br>" +
+                              "변동성: %{x:.1f}% (%{customdata[2]})<br>" +
+                              "점수: %{customdata[3]:.3f}<extra></extra>"
+            ))
+            
+            fig.update_layout(
+                title=f"수익률 vs 위험도 분석 ({len(points)}개)",
+                xaxis_title="연환산 변동성 (%)",
+                yaxis_title="수익률 (%)",
+                template="plotly_white",
+                font=dict(size=12, family="Pretendard, NanumGothic"),
+                showlegend=False,
+                height=500,
+                margin=dict(l=50, r=50, t=80, b=50)
+            )
+            
+            return fig
+            
+        except Exception as e:
+            logger.error(f"위험-수익률 산점도 생성 오류: {e}")
+            return self._create_error_chart("위험-수익률 산점도 생성 중 오류")
+    
+    def _create_metric_heatmap(self, metrics: pd.DataFrame) -> go.Figure:
+        """ETF × 레이더 지표 히트맵 (0-100, 순위순)"""
+        try:
+            labels = [f"{rank}. {name[:20]}" for rank, name in zip(metrics['순위'], metrics['ETF명'])]
+            values = metrics[RADAR_CATEGORIES].to_numpy()
+            
+            fig = go.Figure(go.Heatmap(
+                z=values,
+                x=RADAR_CATEGORIES,
+                y=labels,
+                zmin=0,
+                zmax=100,
+                colorscale='RdYlGn',
+                text=np.round(values, 0),
+                texttemplate="%{text}",
+                textfont={"size": 9},
+                hovertemplate='%{y}<br>%{x}: <b>%{z:.0f}</b><extra></extra>'
+            ))
+            
+            fig.update_layout(
+                title="🕸️ ETF 다차원 비교 (지표 히트맵)",
+                yaxis=dict(autorange='reversed'),
+                font=dict(size=12, family="Pretendard, NanumGothic"),
+                height=max(400, 18 * len(metrics) + 120),
+                margin=dict(l=50, r=50, t=80, b=50)
+            )
+            
+            return fig
+            
+        except Exception as e:
+            logger.error(f"지표 히트맵 생성 오류: {e}")
+            return self._create_error_chart("지표 히트맵 생성 중 오류")
+    
+    def _create_large_summary(self, scored_etfs: List[Dict], metrics: pd.DataFrame, user_profile: Dict) -> str:
+        """
+        대량 비교 프롬프트 요약 (상위 K개 상세 + 나머지 통계)
+        
+        Args:
+            scored_etfs: 점수 계산된 ETF 리스트 (순위순)
+            metrics: _create_metrics_frame 결과
+            user_profile: 사용자 프로필
+        
+        Returns:
+            요약 문자열
+        """
+        top_k = LARGE_COMPARISON_PROMPT_TOP_K
+        top_summary = self._create_summary(scored_etfs[:top_k], user_profile)
+        rest = metrics.iloc[top_k:]
+        if rest.empty:
+            return top_summary
+        
+        try:
+            def fmt(value: float, suffix: str = '', decimals: int = 2) -> str:
+                return f"{value:.{decimals}f}{suffix}" if pd.notna(value) else 'N/A'
+            
+            grade_counts = rest['변동성등급'].value_counts()
+            grades = ', '.join(
+                f"{grade} {int(grade_counts[grade])}개" for grade in VOLATILITY_SCORE_MAP if grade in grade_counts
+            )
+            best_rest = rest.iloc[0]
+            worst_rest = rest.iloc[-1]
+            rest_summary = f"""
+{top_k + 1}위~{len(metrics)}위 ({len(rest)}개) 요약:
+- 종합점수: {fmt(best_rest['종합점수'], decimals=3)} ({best_rest['ETF명']}) ~ {fmt(worst_rest['종합점수'], decimals=3)} ({worst_rest['ETF명']}), 중앙값 {fmt(rest['종합점수'].median(), decimals=3)}
+- 1년 수익률: 중앙값 {fmt(rest['1년수익률'].median(), '%')} (범위 {fmt(rest['1년수익률'].min(), '%')} ~ {fmt(rest['1년수익률'].max(), '%')})
+- 총보수: 중앙값 {fmt(rest['총보수'].median(), '%', 3)} (최저 {fmt(rest['총보수'].min(), '%', 3)})
+- 변동성 분포: {grades or 'N/A'}
+            """.strip()
+            return f"전체 {len(metrics)}개 중 상위 {top_k}개:\n\n{top_summary}\n\n{rest_summary}"
+            
+        except Exception as e:
+            logger.error(f"대량 비교 요약 생성 오류: {e}")
+            return f"전체 {len(metrics)}개 중 상위 {top_k}개:\n\n{top_summary}"
+    
     # =============================================================================
     # 요약 및 권장사항 생성
     # =============================================================================
@@ -858,8 +1663,15 @@ class ETFComparison:
                 aum_data = etf_data.get('자산규모/유동성', {})
                 risk_data = etf_data.get('위험', {})
                 
+                notes = []
+                if etf.get('score_source') == 'realtime':
+                    notes.append('캐시에 없어 실시간 계산')
+                if etf.get('level_restricted'):
+                    notes.append('사용자 레벨 위험도 제한 초과')
+                note_text = f" [{', '.join(notes)}]" if notes else ""
+                
                 summary_text = f"""
-{i+1}위: {etf_data['ETF명']} (점수: {etf['final_score']:.3f})
+{i+1}위: {etf_data['ETF명']} (점수: {etf['final_score']:.3f}){note_text}
 - 1년 수익률: {market_data.get('1년 수익률', 'N/A')}%
 - 총보수: {performance_data.get('총 보수', 'N/A')}%
 - 자산규모: {aum_data.get('평균 순자산총액', 'N/A')}백만원
@@ -874,8 +1686,8 @@ class ETFComparison:
             logger.error(f"요약 생성 오류: {e}")
             return "요약 생성 중 오류가 발생했습니다."
     
-    def _create_recommendations(self, scored_etfs: List[Dict], user_profile: Dict) -> str:
-        """프롬프트용 데이터 정리"""
+    def _create_recommendations(self, scored_etfs: List[Dict], user_profile: Dict, summary: Optional[str] = None) -> str:
+        """프롬프트용 데이터 정리 (summary가 없으면 전체 ETF 요약 사용)"""
         if not scored_etfs:
             return '비교 가능한 ETF가 없습니다. ETF명을 다시 확인해 주세요.'
         try:
@@ -891,7 +1703,7 @@ class ETFComparison:
 - 투자자 유형: {investor_type} ({', '.join(type_characteristics)})
 
 비교 결과:
-{self._create_summary(scored_etfs, user_profile)}
+{summary or self._create_summary(scored_etfs, user_profile)}
             """.strip()
             
         except Exception as e:
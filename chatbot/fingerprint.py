@@ -0,0 +1,106 @@
+"""
+데이터 지문(fingerprint) 모듈
+- 입력 데이터가 바뀌었는지 빠르게 판별하기 위한 해시 값 계산
+- 행 단위 해시: pandas.util.hash_pandas_object (벡터 연산)
+- 그룹(ETF) 단위 지문: 그룹 내 순번을 섞은 행 해시의 합 (행 순서 변경도 감지)
+
+주요 기능:
+1. 키(종목코드/종목명)별 그룹 지문 계산
+2. 여러 지문 조각을 하나의 지문으로 결합
+3. 설정 객체(딕셔너리 등)의 지문 계산
+"""
+
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, Optional
+
+# 지문이 없는 그룹(데이터 없음)을 나타내는 값
+EMPTY_FINGERPRINT = '0' * 16
+
+
+def row_hashes(df: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> np.ndarray:
+    """
+    행 단위 64비트 해시
+
+    Args:
+        df: 대상 DataFrame
+        columns: 해시에 포함할 컬럼 (None이면 전체)
+
+    Returns:
+        uint64 해시 배열 (행 순서)
+    """
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+
+
+def group_fingerprints(
+    df: pd.DataFrame,
+    keys: pd.Series,
+    columns: Optional[Iterable[str]] = None
+) -> Dict[str, str]:
+    """
+    키별 그룹 지문 계산
+
+    같은 키를 가진 행들의 내용과 순서가 모두 같을 때만 같은 지문을 반환합니다.
+
+    Args:
+        df: 대상 DataFrame
+        keys: 행별 그룹 키 (df와 같은 길이, 문자열로 변환하여 사용)
+        columns: 해시에 포함할 컬럼 (None이면 전체)
+
+    Returns:
+        키 → 16자리 16진수 지문
+    """
+    if df.empty:
+        return {}
+
+    keys = pd.Series(keys, index=df.index).astype(str)
+    hashes = row_hashes(df, columns)
+
+    # 그룹 내 순번을 섞어 순서에 민감한 해시로 변환
+    position = keys.groupby(keys, sort=False).cumcount().to_numpy(dtype=np.uint64)
+    mixed = pd.util.hash_pandas_object(
+        pd.DataFrame({'h': hashes, 'pos': position}), index=False
+    ).to_numpy(dtype=np.uint64)
+
+    # 키별 합계 (uint64 오버플로는 2^64 나머지로 처리됨)
+    codes, uniques = pd.factorize(keys)
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    starts = np.r_[0, np.flatnonzero(sorted_codes[1:] != sorted_codes[:-1]) + 1]
+    sums = np.add.reduceat(mixed[order], starts)
+
+    return {
+        str(uniques[code]): f"{int(value):016x}"
+        for code, value in zip(sorted_codes[starts], sums)
+    }
+
+
+def combine_fingerprints(*parts: Any) -> str:
+    """
+    여러 지문 조각을 하나의 지문으로 결합
+
+    Args:
+        *parts: 문자열로 변환 가능한 지문 조각
+
+    Returns:
+        16자리 16진수 지문
+    """
+    digest = hashlib.sha1('|'.join('' if p is None else str(p) for p in parts).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def object_fingerprint(obj: Any) -> str:
+    """
+    설정 객체(딕셔너리/리스트 등)의 지문
+
+    Args:
+        obj: JSON 직렬화 가능한 객체 (키 순서 무관)
+
+    Returns:
+        16자리 16진수 지문
+    """
+    return combine_fingerprints(json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str))
@@ -0,0 +1,206 @@
+"""
+멀티코어 병렬 처리 모듈
+- multiprocessing.shared_memory 기반 numpy 배열 공유 (워커로 데이터를 pickle 전송하지 않음)
+- ETF 단위 샤드 분할: (종목코드, 날짜) 정렬 배열을 행 수 기준으로 균등 분할하되
+  하나의 ETF가 두 샤드로 나뉘지 않도록 그룹 경계에서만 자름
+
+주요 기능:
+1. SharedArrays: 이름 → numpy 배열 묶음을 공유 메모리에 생성 / 다른 프로세스에서 연결
+2. shard_groups: 정렬된 종목코드 배열을 ETF 경계 기준 (시작, 끝) 구간으로 분할
+3. resolve_workers: 워커 수 설정값 해석 (None/0 → CPU 코어 수)
+"""
+
+import os
+import logging
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 공유 배열 명세: 이름 → (공유 메모리 이름, shape, dtype 문자열)
+ArraySpec = Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+
+# =============================================================================
+# 공유 메모리 배열
+# =============================================================================
+
+class SharedArrays:
+    """
+    공유 메모리에 올린 numpy 배열 묶음
+
+    부모 프로세스에서 `create`로 생성한 뒤 `spec`(작은 튜플 딕셔너리)만 워커에 넘기고,
+    워커는 `attach`로 같은 메모리를 복사 없이 numpy 배열로 사용합니다.
+    생성한 쪽(owner)만 `unlink`로 메모리를 해제합니다.
+    """
+
+    def __init__(self, blocks: Dict[str, shared_memory.SharedMemory],
+                 arrays: Dict[str, np.ndarray], owner: bool):
+        self._blocks = blocks
+        self._arrays = arrays
+        self.owner = owner
+
+    @classmethod
+    def create(cls, arrays: Dict[str, np.ndarray]) -> 'SharedArrays':
+        """
+        배열을 공유 메모리로 복사하여 생성
+
+        Args:
+            arrays: 이름 → numpy 배열 (숫자형 dtype만 지원)
+
+        Returns:
+            SharedArrays (owner)
+        """
+        blocks, views = {}, {}
+        try:
+            for name, values in arrays.items():
+                values = np.ascontiguousarray(values)
+                if values.dtype == object:
+                    raise TypeError(f"공유 메모리에 올릴 수 없는 dtype입니다: {name} ({values.dtype})")
+
+                # 크기 0인 공유 메모리는 만들 수 없으므로 최소 1바이트 확보
+                block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                blocks[name] = block
+                view = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)
+                view[...] = values
+                views[name] = view
+        except Exception:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+            raise
+
+        return cls(blocks, views, owner=True)
+
+    @classmethod
+    def empty(cls, shapes: Dict[str, Tuple[Tuple[int, ...], str]]) -> 'SharedArrays':
+        """
+        결과를 받을 빈(NaN/0) 공유 배열 생성
+
+        Args:
+            shapes: 이름 → (shape, dtype 문자열)
+
+        Returns:
+            SharedArrays (owner)
+        """
+        arrays = {}
+        for name, (shape, dtype) in shapes.items():
+            dtype = np.dtype(dtype)
+            fill = np.nan if dtype.kind == 'f' else 0
+            arrays[name] = np.full(shape, fill, dtype=dtype)
+        return cls.create(arrays)
+
+    @classmethod
+    def attach(cls, spec: ArraySpec) -> 'SharedArrays':
+        """
+        다른 프로세스에서 생성된 공유 배열에 연결
+
+        Args:
+            spec: 생성 측의 `spec` 값
+
+        Returns:
+            SharedArrays (non-owner)
+        """
+        blocks, views = {}, {}
+        for name, (shm_name, shape, dtype) in spec.items():
+            block = shared_memory.SharedMemory(name=shm_name)
+            blocks[name] = block
+            views[name] = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=block.buf)
+        return cls(blocks, views, owner=False)
+
+    @property
+    def spec(self) -> ArraySpec:
+        """워커에 전달할 명세 (공유 메모리 이름, shape, dtype)"""
+        return {
+            name: (self._blocks[name].name, view.shape, view.dtype.str)
+            for name, view in self._arrays.items()
+        }
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._arrays[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._arrays
+
+    def copy(self, name: str) -> np.ndarray:
+        """공유 메모리 해제 후에도 쓸 수 있도록 배열 복사본 반환"""
+        return self._arrays[name].copy()
+
+    def close(self):
+        """현재 프로세스의 매핑 해제 (배열 뷰는 더 이상 사용할 수 없음)"""
+        self._arrays = {}
+        for block in self._blocks.values():
+            try:
+                block.close()
+            except Exception as e:
+                logger.debug(f"공유 메모리 close 실패: {e}")
+
+    def unlink(self):
+        """공유 메모리 삭제 (생성한 프로세스에서만 호출)"""
+        if not self.owner:
+            return
+        for block in self._blocks.values():
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = {}
+
+    def __enter__(self) -> 'SharedArrays':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        self.unlink()
+
+
+# =============================================================================
+# 샤드 분할 / 워커 수
+# =============================================================================
+
+def shard_groups(codes: np.ndarray, n_shards: int) -> List[Tuple[int, int]]:
+    """
+    정렬된 종목코드 배열을 ETF 경계 기준으로 분할
+
+    각 샤드의 행 수가 비슷해지도록 누적 행 수 기준으로 자르며,
+    같은 ETF의 행은 항상 하나의 샤드에 들어갑니다.
+
+    Args:
+        codes: 종목코드 배열 (같은 종목이 연속으로 나열되어 있어야 함)
+        n_shards: 목표 샤드 수
+
+    Returns:
+        (시작 행, 끝 행) 구간 리스트 (끝 행 미포함, 빈 샤드 없음)
+    """
+    codes = np.asarray(codes)
+    n = len(codes)
+    if n == 0:
+        return []
+
+    starts = np.r_[0, np.flatnonzero(codes[1:] != codes[:-1]) + 1]
+    n_shards = max(1, min(int(n_shards), len(starts)))
+
+    # 목표 경계(행 번호)에 가장 가까운 그룹 시작점을 선택
+    targets = np.arange(1, n_shards) * (n / n_shards)
+    cut_idx = np.clip(np.searchsorted(starts, targets), 1, len(starts) - 1) if len(starts) > 1 \
+        else np.zeros(0, dtype=np.int64)
+    cuts = np.unique(np.r_[0, starts[cut_idx], n])
+
+    return [(int(a), int(b)) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+
+
+def resolve_workers(n_workers: Optional[int]) -> int:
+    """
+    워커 수 설정값 해석
+
+    Args:
+        n_workers: 워커 수 (None 또는 0 이하면 CPU 코어 수)
+
+    Returns:
+        1 이상의 워커 수
+    """
+    if n_workers is None or n_workers <= 0:
+        return max(1, os.cpu_count() or 1)
+    return int(n_workers)
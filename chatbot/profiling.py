@@ -0,0 +1,297 @@
+"""
+빌드 단계별 성능 측정 모듈
+- 단계별 벽시계 시간, CPU 시간(자식 프로세스 포함), 처리 행 수, 메모리(RSS) 기록
+- 선택적 함수 단위 프로파일링 (cProfile 또는 pyinstrument)
+- JSON 보고서 + 빌드 이력(JSON Lines) 저장으로 릴리스 간 빌드 성능 회귀 추적
+
+주요 기능:
+1. StageProfiler.stage: with 문으로 감싼 구간의 자원 사용량 측정
+2. StageProfiler.start_capture / stop_capture: 전체 빌드 함수 단위 프로파일
+3. StageProfiler.write_report: 보고서 저장 및 이력 추가
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import logging
+import platform
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .cache_store import atomic_write_json
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 지원하는 함수 단위 프로파일러
+PROFILERS = ('cprofile', 'pyinstrument')
+
+# 보고서에 포함할 cProfile 상위 함수 수
+TOP_FUNCTIONS = 25
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """프로세스 최대 RSS (MB, 시작 이후 최댓값)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _current_rss_mb() -> Optional[float]:
+    """현재 RSS (MB, /proc 가 없는 플랫폼은 None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _children_cpu() -> float:
+    """종료된 자식 프로세스(프로세스 풀 워커)의 CPU 시간 합계 (초)"""
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+class Stage:
+    """측정 중인 단계 (with 블록 안에서 rows를 채울 수 있음)"""
+
+    def __init__(self, name: str, rows: Optional[int] = None):
+        self.name = name
+        self.rows = rows
+        self.result: Dict[str, Any] = {}
+
+
+class StageProfiler:
+    """
+    빌드 단계별 측정기
+
+    사용 예:
+        profiler = StageProfiler(capture='cprofile')
+        profiler.start_capture()
+        with profiler.stage('load_data') as stage:
+            ...
+            stage.rows = len(df)
+        profiler.stop_capture()
+        profiler.write_report('data/etf_scores_cache.build.json')
+
+    최대 RSS(peak_rss_mb)는 프로세스 시작 이후의 최댓값이므로, 단계 안에서 값이 커졌다면
+    그 단계가 최댓값을 만든 것입니다 (peak_rss_growth_mb > 0).
+    """
+
+    def __init__(self, capture: Optional[str] = None):
+        """
+        Args:
+            capture: 함수 단위 프로파일러 ('cprofile', 'pyinstrument', None)
+        """
+        if capture is not None and capture not in PROFILERS:
+            raise ValueError(f"지원하지 않는 프로파일러입니다: {capture} (지원: {', '.join(PROFILERS)})")
+        self.capture = capture
+        self.stages: List[Dict[str, Any]] = []
+        self.metadata: Dict[str, Any] = {}
+        self._started_at = datetime.now()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._children_start = _children_cpu()
+        self._profiler = None
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[Stage]:
+        """
+        단계 측정
+
+        Args:
+            name: 단계 이름
+            rows: 처리 행 수 (블록 안에서 stage.rows로 나중에 채워도 됨)
+
+        Yields:
+            Stage
+        """
+        current = Stage(name, rows)
+        rss_start = _current_rss_mb()
+        peak_start = _peak_rss_mb()
+        children_start = _children_cpu()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield current
+        finally:
+            wall = time.perf_counter() - wall_start
+            peak_end = _peak_rss_mb()
+            record = {
+                'name': name,
+                'wall_s': round(wall, 4),
+                'cpu_s': round(time.process_time() - cpu_start, 4),
+                'cpu_children_s': round(_children_cpu() - children_start, 4),
+                'rows': current.rows,
+                'rows_per_s': round(current.rows / wall, 1) if current.rows and wall > 0 else None,
+                'rss_start_mb': _round(rss_start),
+                'rss_end_mb': _round(_current_rss_mb()),
+                'peak_rss_mb': _round(peak_end),
+                'peak_rss_growth_mb': _round(peak_end - peak_start) if peak_end is not None else None,
+                **current.result
+            }
+            self.stages.append(record)
+            logger.info(
+                f"[단계] {name}: {record['wall_s']:.3f}초 (CPU {record['cpu_s']:.3f}초"
+                + (f", {current.rows}행" if current.rows is not None else "")
+                + (f", 최대 RSS {record['peak_rss_mb']:.0f}MB" if record['peak_rss_mb'] is not None else "")
+                + ")"
+            )
+
+    # -------------------------------------------------------------------------
+    # 함수 단위 프로파일
+    # -------------------------------------------------------------------------
+
+    def start_capture(self):
+        """함수 단위 프로파일 시작 (capture가 None이거나 패키지가 없으면 아무것도 하지 않음)"""
+        if self.capture == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.capture == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("pyinstrument가 설치되어 있지 않아 함수 단위 프로파일을 건너뜁니다. "
+                               "(pip install pyinstrument)")
+                self.capture = None
+                return
+            self._profiler = Profiler()
+            self._profiler.start()
+
+    def stop_capture(self, output_base: str) -> Dict[str, Any]:
+        """
+        함수 단위 프로파일 종료 및 저장
+
+        프로세스 풀 워커 내부는 포함되지 않습니다 (부모 프로세스만 측정).
+
+        Args:
+            output_base: 출력 파일 경로 (확장자 제외, .prof / .html 이 붙음)
+
+        Returns:
+            보고서에 넣을 프로파일 요약
+        """
+        if self._profiler is None:
+            return {}
+
+        summary: Dict[str, Any] = {'profiler': self.capture}
+        try:
+            if self.capture == 'cprofile':
+                import pstats
+                self._profiler.disable()
+                path = output_base + '.prof'
+                self._profiler.dump_stats(path)
+                summary['output'] = path
+                summary['top_functions'] = self._top_functions(pstats.Stats(self._profiler))
+            else:
+                self._profiler.stop()
+                path = output_base + '.html'
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(self._profiler.output_html())
+                summary['output'] = path
+            logger.info(f"함수 단위 프로파일 저장: {path}")
+        except Exception as e:
+            logger.warning(f"함수 단위 프로파일 저장 실패: {e}")
+        finally:
+            self._profiler = None
+
+        self.metadata['profile'] = summary
+        return summary
+
+    @staticmethod
+    def _top_functions(stats) -> List[Dict[str, Any]]:
+        """cProfile 누적 시간 상위 함수"""
+        stats.stream = io.StringIO()
+        stats.sort_stats('cumulative')
+        rows = []
+        for func in stats.fcn_list[:TOP_FUNCTIONS]:
+            calls, _, total, cumulative, _ = stats.stats[func]
+            filename, line, name = func
+            rows.append({
+                'function': f"{os.path.basename(filename)}:{line}({name})",
+                'calls': calls,
+                'tottime_s': round(total, 4),
+                'cumtime_s': round(cumulative, 4)
+            })
+        return rows
+
+    # -------------------------------------------------------------------------
+    # 보고서
+    # -------------------------------------------------------------------------
+
+    def report(self) -> Dict[str, Any]:
+        """
+        보고서 딕셔너리
+
+        Returns:
+            {'started_at', 'total', 'stages', 'environment', ...metadata}
+        """
+        return {
+            'started_at': self._started_at.isoformat(timespec='seconds'),
+            'total': {
+                'wall_s': round(time.perf_counter() - self._wall_start, 4),
+                'cpu_s': round(time.process_time() - self._cpu_start, 4),
+                'cpu_children_s': round(_children_cpu() - self._children_start, 4),
+                'peak_rss_mb': _round(_peak_rss_mb())
+            },
+            'stages': self.stages,
+            'environment': _environment(),
+            **self.metadata
+        }
+
+    def write_report(self, path: str, history_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        보고서 저장 (+ 빌드 이력에 요약 1줄 추가)
+
+        Args:
+            path: 보고서 JSON 경로
+            history_path: 빌드 이력 JSON Lines 경로 (None이면 추가하지 않음)
+
+        Returns:
+            저장한 보고서
+        """
+        report = self.report()
+        atomic_write_json(report, path)
+        logger.info(f"빌드 성능 보고서 저장: {path} (총 {report['total']['wall_s']:.2f}초)")
+
+        if history_path:
+            summary = {
+                'started_at': report['started_at'],
+                **{k: v for k, v in self.metadata.items() if k != 'profile'},
+                'total_wall_s': report['total']['wall_s'],
+                'peak_rss_mb': report['total']['peak_rss_mb'],
+                'stages': {stage['name']: stage['wall_s'] for stage in self.stages}
+            }
+            with open(history_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(summary, ensure_ascii=False, default=str) + '\n')
+        return report
+
+
+def _round(value: Optional[float], digits: int = 1) -> Optional[float]:
+    """None 허용 반올림"""
+    return None if value is None else round(value, digits)
+
+
+def _environment() -> Dict[str, Any]:
+    """측정 환경 (회귀 비교 시 환경 차이 확인용)"""
+    environment = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+    for module in ('pandas', 'numpy'):
+        imported = sys.modules.get(module)
+        if imported is not None:
+            environment[module] = getattr(imported, '__version__', None)
+    return environment
@@ -4,37 +4,787 @@ ETF 추천 엔진
 - 캐시 기반 고속 추천 시스템
 - 투자자 유형별 가중치 적용
 - 투자자 유형별 맞춤 점수 계산
+- 팩터화된 캐시(ETF별 1행): 조회 시점에 차원 점수 · 유형 가중치 내적으로 최종 점수 계산
+- 카테고리 × 레벨 × 투자자 유형별 사전 계산 상위 K개 목록(TopKViews) 우선 사용
+- 상위 N개 선택은 argpartition(팩터화된 캐시) 또는 점수순 정렬된 프로필 구간 스캔(기존 캐시)으로
+  전체 정렬/캐시 복사 없이 수행
+- 사용자 지정 차원 가중치(custom_weights): 차원 점수 행렬 · 가중치 벡터 한 번으로 조회 시점 점수화
+- (선택) 다양성 재정렬: 후보 풀에서 수익률 상관/기초지수 유사도 기반 MMR로 상위 N개 선택
+- (선택) 조건 검색: 총보수/자산규모/운용사/레버리지 등 조건 비트맵을 카테고리 마스크와 AND한 뒤 순위 계산
 """
 
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 # 공통 유틸리티 임포트
 from .config import Config
+from .fingerprint import object_fingerprint
+from .diversity import SimilarityIndex
+from .screener import ETFScreener, describe_conditions
 from .utils import (
-    safe_float, filter_dataframe_by_keyword, 
+    safe_float, filter_dataframe_by_keyword, keyword_mask,
     validate_user_profile, create_error_result
 )
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+# 투자 차원 순서 (차원 점수 행렬의 열 / 유형 가중치 행렬의 행 순서)
+DIMENSIONS = ['A', 'I', 'R', 'E', 'S', 'T', 'B', 'P']
+
+# 팩터화된 캐시의 차원 점수 컬럼
+DIMENSION_COLUMNS = [f'dim_{d}' for d in DIMENSIONS]
+
+# 프로필별 점수 레코드 컬럼 (레벨 × 투자자 유형 1행 형식의 기존 캐시와 동일)
+PROFILE_SCORE_COLUMNS = [
+    'ETF명', '종목코드', '분류체계', '기초지수',
+    'level', 'investor_type',
+    'base_score', 'type_weight', 'final_score', 'risk_tier',
+    '자산규모', '거래량', '변동성', '총보수'
+]
+
+# 일괄 추천 결과 컬럼 (요청 번호, 카테고리, 요청 내 순위 + 프로필별 점수 레코드)
+BATCH_RESULT_COLUMNS = ['request', 'category', 'rank', *PROFILE_SCORE_COLUMNS]
+
+# 이 행 수 이하는 argpartition 대신 바로 정렬 (작은 배열은 정렬이 더 빠름)
+PARTITION_MIN_ROWS = 128
+
+
+def custom_weight_vector(custom_weights: Any) -> np.ndarray:
+    """
+    사용자 지정 차원 가중치를 (8,) 벡터로 변환 (합이 1이 되도록 정규화)
+
+    고정 투자자 유형 가중치(INVESTOR_TYPE_WEIGHTS)와 같은 척도로 맞추기 위해 합계로 나눕니다.
+
+    Args:
+        custom_weights: {'A': 0.4, 'R': 0.3, ...} (빠진 차원은 0) 또는 DIMENSIONS 순서의 길이 8 시퀀스
+
+    Returns:
+        (8,) 가중치 벡터
+
+    Raises:
+        ValueError: 알 수 없는 차원, 음수/숫자가 아닌 값, 길이 불일치, 모든 가중치가 0인 경우
+    """
+    if isinstance(custom_weights, dict):
+        unknown = set(custom_weights) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"알 수 없는 투자 차원: {sorted(unknown)} (사용 가능: {', '.join(DIMENSIONS)})")
+        vector = np.array([custom_weights.get(d, 0.0) for d in DIMENSIONS], dtype=float)
+    else:
+        vector = np.asarray(custom_weights, dtype=float).ravel()
+        if len(vector) != len(DIMENSIONS):
+            raise ValueError(f"차원 가중치는 {len(DIMENSIONS)}개여야 합니다: {len(vector)}개")
+
+    if not np.isfinite(vector).all() or (vector < 0).any():
+        raise ValueError("차원 가중치는 0 이상의 숫자여야 합니다.")
+    total = vector.sum()
+    if total <= 0:
+        raise ValueError("차원 가중치가 모두 0입니다.")
+    return vector / total
+
+
+def is_factorized_cache(cache_df: pd.DataFrame) -> bool:
+    """
+    팩터화된 캐시(ETF별 1행 + 차원 점수) 여부 확인
+
+    Args:
+        cache_df: 캐시 DataFrame
+
+    Returns:
+        팩터화된 캐시면 True, 레벨 × 투자자 유형 1행 형식이면 False
+    """
+    return 'level' not in cache_df.columns and all(c in cache_df.columns for c in DIMENSION_COLUMNS)
+
+
+def top_n_order(scores: np.ndarray, top_n: int) -> np.ndarray:
+    """
+    점수 내림차순 상위 N개의 위치 (전체 정렬 없이 argpartition으로 후보만 정렬)
+
+    결과는 np.argsort(-scores, kind='stable')[:top_n]과 같습니다
+    (동점은 입력 순서 유지, NaN은 맨 뒤).
+
+    Args:
+        scores: 점수 배열
+        top_n: 선택 개수
+
+    Returns:
+        scores 내 위치 배열 (점수 내림차순)
+    """
+    n = len(scores)
+    if top_n <= 0:
+        return np.zeros(0, dtype=int)
+    keys = -np.asarray(scores, dtype=float)
+    if top_n >= n or n <= PARTITION_MIN_ROWS:
+        return np.argsort(keys, kind='stable')[:top_n]
+
+    # N번째 키 이하인 후보만 안정 정렬 (동점 후보를 모두 포함하므로 전체 정렬과 같은 결과)
+    kth = np.partition(keys, top_n - 1)[top_n - 1]
+    if np.isnan(kth):
+        return np.argsort(keys, kind='stable')[:top_n]
+    candidates = np.flatnonzero(keys <= kth)
+    return candidates[np.argsort(keys[candidates], kind='stable')][:top_n]
+
+
+class ETFScoreIndex:
+    """
+    팩터화된 캐시의 점수 조회 인덱스
+
+    캐시에는 ETF별 기본 점수, risk tier, 8개 차원 점수만 저장하고,
+    요청 프로필의 유형 가중치와 최종 점수는 (ETF 수 × 8) · (8,) 내적 한 번으로 계산합니다.
+    가중치와 레벨별 risk tier 제한은 조회 시점의 Config 값을 사용하므로,
+    새 투자자 유형이나 가중치 변경이 캐시 재생성 없이 바로 반영됩니다.
+    """
+
+    # 키워드별 카테고리 필터 결과 보관 개수
+    MAX_KEYWORD_CACHE = 256
+
+    def __init__(self, cache_df: pd.DataFrame, config: Optional[Config] = None):
+        """
+        인덱스 초기화
+
+        Args:
+            cache_df: 팩터화된 캐시 DataFrame
+            config: 설정 (None이면 기본 Config)
+        """
+        self.config = config or Config()
+        self.df = cache_df.reset_index(drop=True)
+        self.dims = self.df[DIMENSION_COLUMNS].to_numpy(dtype=float)
+        self.base = pd.to_numeric(self.df['base_score'], errors='coerce').fillna(0.5).to_numpy(dtype=float)
+        self.tiers = pd.to_numeric(self.df['risk_tier'], errors='coerce').fillna(-1).to_numpy(dtype=int)
+        self._columns = {column: self.df[column].to_numpy() for column in self.df.columns}
+        self._category_cache: Dict[str, pd.DataFrame] = {}
+        self._level_masks: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def weight_vector(self, investor_type: str) -> Optional[np.ndarray]:
+        """
+        투자자 유형의 차원 가중치 벡터
+
+        Returns:
+            (8,) 가중치 벡터 (알 수 없는 유형이면 None)
+        """
+        type_weights = self.config.INVESTOR_TYPE_WEIGHTS.get(investor_type)
+        if type_weights is None:
+            return None
+        vector = np.zeros(len(DIMENSIONS))
+        for dimension, weight in type_weights.items():
+            vector[DIMENSIONS.index(dimension)] = weight
+        return vector
+
+    def level_mask(self, level: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        레벨별 risk tier 마스크와 유효 기본 점수
+
+        - 측정불가(-1): Level 1 제외, Level 2,3은 기본 점수 × 0.5
+        - 레벨 제한 초과: 제외
+
+        Returns:
+            (포함 여부 마스크, 유효 기본 점수)
+        """
+        cached = self._level_masks.get(level)
+        if cached is not None:
+            return cached
+
+        unmeasured = self.tiers == -1
+        mask = self.tiers <= self.config.get_risk_tier_limit(level)
+        if level == 1:
+            mask = mask & ~unmeasured
+        effective = np.where(unmeasured, self.base * 0.5, self.base)
+        self._level_masks[level] = (mask, effective)
+        return mask, effective
+
+    def filter_by_category(self, category_keyword: str) -> pd.DataFrame:
+        """
+        카테고리 키워드 필터링 (키워드별 결과 재사용)
+
+        Args:
+            category_keyword: 카테고리 키워드 (빈 문자열이면 전체)
+
+        Returns:
+            필터링된 ETF 행 (인덱스는 인덱스 내 위치)
+        """
+        keyword = category_keyword.strip()
+        if not keyword:
+            return self.df
+
+        cached = self._category_cache.get(keyword)
+        if cached is None:
+            cached = filter_dataframe_by_keyword(self.df, keyword, ['ETF명', '분류체계', '기초지수'])
+            if len(self._category_cache) >= self.MAX_KEYWORD_CACHE:
+                self._category_cache.pop(next(iter(self._category_cache)))
+            self._category_cache[keyword] = cached
+        return cached
+
+    def rank(
+        self,
+        positions: np.ndarray,
+        level: int,
+        investor_type: str,
+        top_n: Optional[int] = None,
+        weights: Optional[np.ndarray] = None,
+        apply_level_limit: bool = True
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        레벨 제한 적용 후 프로필 점수 계산 및 (선택) 상위 N개 선택
+
+        Args:
+            positions: 대상 ETF의 인덱스 내 위치 배열 (이 순서가 동점 처리 순서)
+            level: 사용자 레벨
+            investor_type: 투자자 유형
+            top_n: 지정하면 final_score 내림차순 상위 N개만 반환
+            weights: 사용자 지정 (8,) 차원 가중치 (custom_weight_vector 결과, None이면 유형 가중치)
+            apply_level_limit: False면 레벨 제한 초과 ETF도 제외하지 않고 점수 계산 (비교 분석용)
+
+        Returns:
+            (위치, type_weight, final_score) 배열 또는 None (알 수 없는 유형)
+        """
+        if weights is None:
+            weights = self.weight_vector(investor_type)
+        if weights is None:
+            logger.warning(f"알 수 없는 투자자 유형: {investor_type}")
+            return None
+
+        positions = np.asarray(positions, dtype=int)
+        mask, effective = self.level_mask(level)
+        if apply_level_limit:
+            positions = positions[mask[positions]]
+
+        type_weight = np.maximum(self.dims[positions] @ weights, 0.1)
+        final_score = np.round(effective[positions] * type_weight, 4)
+
+        # 상위 N개만 필요한 경우 레코드 구성 전에 선택 (동점은 입력 순서 유지)
+        if top_n is not None:
+            order = top_n_order(final_score, top_n)
+            positions, type_weight, final_score = positions[order], type_weight[order], final_score[order]
+        return positions, type_weight, final_score
+
+    def _profile_columns(
+        self,
+        positions: np.ndarray,
+        level: int,
+        investor_type: str,
+        top_n: Optional[int],
+        weights: Optional[np.ndarray] = None,
+        apply_level_limit: bool = True
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        프로필별 점수 컬럼 계산 (profile_scores / records_at 공용)
+
+        Returns:
+            (인덱스 내 위치 배열, 컬럼명 → 값 배열)
+        """
+        ranked = self.rank(positions, level, investor_type, top_n, weights, apply_level_limit)
+        if ranked is None:
+            return np.zeros(0, dtype=int), {}
+        positions, type_weight, final_score = ranked
+        return positions, self._score_columns(positions, level, investor_type, type_weight, final_score)
+
+    def _score_columns(
+        self,
+        positions: np.ndarray,
+        level: Any,
+        investor_type: Any,
+        type_weight: np.ndarray,
+        final_score: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        점수 레코드 컬럼 구성
+
+        Args:
+            positions: 인덱스 내 위치 배열
+            level, investor_type: 값 하나 또는 행별 배열
+            type_weight, final_score: 행별 점수 배열
+
+        Returns:
+            컬럼명 → 값 배열 (PROFILE_SCORE_COLUMNS 순서)
+        """
+        columns = {}
+        for column in PROFILE_SCORE_COLUMNS:
+            if column == 'level':
+                columns[column] = np.asarray(level) if np.ndim(level) else np.full(len(positions), level)
+            elif column == 'investor_type':
+                columns[column] = (np.asarray(investor_type, dtype=object) if np.ndim(investor_type)
+                                   else np.full(len(positions), investor_type, dtype=object))
+            elif column == 'base_score':
+                columns[column] = np.round(self.base[positions], 4)
+            elif column == 'type_weight':
+                columns[column] = np.round(type_weight, 4)
+            elif column == 'final_score':
+                columns[column] = final_score
+            elif column == 'risk_tier':
+                columns[column] = self.tiers[positions]
+            elif column in self._columns:
+                columns[column] = self._columns[column][positions]
+        return columns
+
+    def batch_scores(
+        self,
+        queries: List[Tuple[int, str, str, int, Optional[np.ndarray]]]
+    ) -> pd.DataFrame:
+        """
+        여러 (레벨, 투자자 유형, 카테고리, 상위 N개, 가중치) 요청을 한 번에 계산
+
+        - 요청에 나온 프로필(레벨 + 가중치)을 모아 차원 점수 행렬과 한 번 곱해 (ETF × 프로필) 점수 행렬 생성
+        - 카테고리 필터는 키워드별로 한 번만 계산 (filter_by_category 결과 재사용)
+        - 카테고리별 (ETF × 프로필) 점수 블록을 열 방향으로 한 번에 정렬해 프로필별 상위 N개 선택
+
+        결과는 요청마다 rank()와 같은 순서·점수입니다 (동점은 캐시 순서, NaN은 맨 뒤).
+
+        Args:
+            queries: (level, investor_type, category_keyword, top_n, weights) 리스트.
+                     weights가 None이면 투자자 유형 가중치 사용
+
+        Returns:
+            요청 순서 → 순위 순으로 쌓은 DataFrame (BATCH_RESULT_COLUMNS).
+            결과가 없는 요청(알 수 없는 유형, 해당 ETF 없음)은 행이 없음
+        """
+        # 1. 프로필별 가중치 벡터 → 열 번호 (같은 레벨 + 가중치는 한 열 공유)
+        profile_columns: Dict[Tuple[int, bytes], int] = {}
+        vectors, profile_levels, query_columns = [], [], []
+        for level, investor_type, _, _, weights in queries:
+            vector = weights if weights is not None else self.weight_vector(investor_type)
+            if vector is None:
+                logger.warning(f"알 수 없는 투자자 유형: {investor_type}")
+                query_columns.append(-1)
+                continue
+            key = (level, np.asarray(vector, dtype=float).tobytes())
+            if key not in profile_columns:
+                profile_columns[key] = len(vectors)
+                vectors.append(vector)
+                profile_levels.append(level)
+            query_columns.append(profile_columns[key])
+
+        if not vectors:
+            return pd.DataFrame(columns=BATCH_RESULT_COLUMNS)
+
+        # 2. (ETF × 프로필) 점수 행렬 (레벨 마스크 밖은 NaN 키, 점수 NaN은 +inf 키로 맨 뒤)
+        type_weight = np.maximum(self.dims @ np.stack(vectors, axis=1), 0.1)
+        masks, effective = zip(*(self.level_mask(level) for level in profile_levels))
+        mask = np.stack(masks, axis=1)
+        final_score = np.round(np.stack(effective, axis=1) * type_weight, 4)
+        keys = np.where(mask, np.where(np.isnan(final_score), np.inf, -final_score), np.nan)
+
+        # 3. 카테고리별로 필요한 프로필 열만 한 번에 정렬
+        by_category: Dict[str, List[int]] = {}
+        for query_id, (_, _, category_keyword, _, _) in enumerate(queries):
+            if query_columns[query_id] >= 0:
+                by_category.setdefault(category_keyword.strip(), []).append(query_id)
+
+        selected: Dict[int, Tuple[np.ndarray, int]] = {}
+        for category_keyword, query_ids in by_category.items():
+            positions = self.filter_by_category(category_keyword).index.to_numpy()
+            if not len(positions):
+                continue
+            columns = sorted({query_columns[q] for q in query_ids})
+            depth = max(queries[q][3] for q in query_ids)
+            block = keys[np.ix_(positions, columns)]
+            order = np.argsort(block, axis=0, kind='stable')[:depth]
+            valid = mask[np.ix_(positions, columns)].sum(axis=0)
+            for query_id in query_ids:
+                j = columns.index(query_columns[query_id])
+                take = min(queries[query_id][3], int(valid[j]))
+                selected[query_id] = (positions[order[:take, j]], query_columns[query_id])
+
+        # 4. 컬럼 형식으로 결과 구성
+        query_ids = [q for q in range(len(queries)) if q in selected and len(selected[q][0])]
+        if not query_ids:
+            return pd.DataFrame(columns=BATCH_RESULT_COLUMNS)
+        positions = np.concatenate([selected[q][0] for q in query_ids])
+        profile = np.concatenate([np.full(len(selected[q][0]), selected[q][1]) for q in query_ids])
+        counts = [len(selected[q][0]) for q in query_ids]
+        request = np.repeat(query_ids, counts)
+
+        columns = {
+            'request': request,
+            'category': np.array([queries[q][2] for q in request], dtype=object),
+            'rank': np.concatenate([np.arange(1, n + 1) for n in counts]),
+            **self._score_columns(
+                positions,
+                np.array([queries[q][0] for q in request]),
+                np.array([queries[q][1] for q in request], dtype=object),
+                type_weight[positions, profile],
+                final_score[positions, profile]
+            )
+        }
+        return pd.DataFrame(columns, columns=BATCH_RESULT_COLUMNS)
+
+    def profile_scores(
+        self,
+        rows: pd.DataFrame,
+        level: int,
+        investor_type: str,
+        top_n: Optional[int] = None,
+        weights: Optional[np.ndarray] = None
+    ) -> pd.DataFrame:
+        """
+        프로필별 점수 레코드 계산
+
+        Args:
+            rows: 대상 ETF 행 (filter_by_category 결과 등, 인덱스는 인덱스 내 위치)
+            level: 사용자 레벨
+            investor_type: 투자자 유형
+            top_n: 지정하면 final_score 내림차순 상위 N개만 반환 (정렬된 상태)
+            weights: 사용자 지정 차원 가중치 (None이면 유형 가중치)
+
+        Returns:
+            레벨 제한을 통과한 ETF의 점수 레코드 DataFrame (PROFILE_SCORE_COLUMNS)
+        """
+        positions, columns = self._profile_columns(rows.index.to_numpy(), level, investor_type, top_n, weights)
+        if not columns:
+            return pd.DataFrame(columns=PROFILE_SCORE_COLUMNS)
+        return pd.DataFrame(columns, index=positions)
+
+    def profile_records(
+        self,
+        rows: pd.DataFrame,
+        level: int,
+        investor_type: str,
+        top_n: Optional[int] = None,
+        weights: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        프로필별 점수 레코드를 딕셔너리 리스트로 계산 (DataFrame 생성 없이)
+
+        Args:
+            rows, level, investor_type, top_n, weights: profile_scores와 동일
+
+        Returns:
+            레코드 딕셔너리 리스트 (to_dict('records')와 같은 형식)
+        """
+        return self.records_at(rows.index.to_numpy(), level, investor_type, top_n, weights)
+
+    def records_at(
+        self,
+        positions: np.ndarray,
+        level: int,
+        investor_type: str,
+        top_n: Optional[int] = None,
+        weights: Optional[np.ndarray] = None,
+        apply_level_limit: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        인덱스 내 위치로 지정한 ETF의 프로필별 점수 레코드 (TopKViews 조회 결과 등)
+
+        Args:
+            positions: 대상 ETF의 인덱스 내 위치 배열
+            level, investor_type, top_n, weights: profile_scores와 동일
+            apply_level_limit: False면 레벨 제한 초과 ETF도 포함 (rank와 동일)
+
+        Returns:
+            레코드 딕셔너리 리스트
+        """
+        _, columns = self._profile_columns(positions, level, investor_type, top_n, weights, apply_level_limit)
+        if not columns:
+            return []
+        names = list(columns)
+        values = [columns[name].tolist() for name in names]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def profile_settings_fingerprint(config: Config) -> str:
+    """점수 계산 설정(유형 가중치, 레벨별 risk tier 제한)의 지문"""
+    return object_fingerprint({
+        'weights': config.INVESTOR_TYPE_WEIGHTS,
+        'limits': config.LEVEL_RISK_TIER_LIMITS
+    })
+
+
+class TopKViews:
+    """
+    (카테고리 키워드, 레벨, 투자자 유형)별 사전 계산 상위 K개 목록
+
+    캐시 빌더가 Config.CATEGORY_KEYWORDS(+ 전체)에 대해 ETFScoreIndex로 계산한 상위 K개의
+    캐시 행 위치를 저장합니다. 조회 시에는 이 K개만 다시 점수화하므로 카테고리 필터와
+    전체 정렬을 건너뜁니다. 목록은 특정 캐시 내용(cache_sha256)과 점수 설정 지문에 묶여 있어,
+    캐시나 가중치가 바뀌면 사용하지 않고 일반 경로로 계산합니다.
+    """
+
+    def __init__(self, payload: Dict[str, Any]):
+        """
+        Args:
+            payload: build()/to_dict() 형식의 딕셔너리 (JSON에서 로드한 값)
+        """
+        self.k = int(payload.get('k', 0))
+        self.settings = payload.get('settings')
+        self.cache_sha256 = payload.get('cache_sha256')
+        self.views: Dict[str, Dict[str, List[int]]] = payload.get('views', {})
+        self._arrays: Dict[Tuple[str, str], np.ndarray] = {}
+        self._compatible: Dict[int, bool] = {}
+
+    @classmethod
+    def build(cls, score_index: ETFScoreIndex, keywords: List[str], k: int) -> 'TopKViews':
+        """
+        상위 K개 목록 계산
+
+        Args:
+            score_index: 팩터화된 캐시의 점수 인덱스
+            keywords: 카테고리 키워드 (빈 문자열 = 전체는 항상 포함)
+            k: 목록 크기
+
+        Returns:
+            TopKViews
+        """
+        config = score_index.config
+        investor_types = list(config.INVESTOR_TYPE_WEIGHTS)
+        views = {}
+        for keyword in dict.fromkeys([''] + list(keywords)):
+            rows = score_index.filter_by_category(keyword)
+            # 해당 ETF가 없는 키워드는 저장하지 않음 (일반 경로에서 안내 메시지 처리)
+            if rows.empty:
+                continue
+            positions = rows.index.to_numpy()
+            views[keyword] = {
+                f"{level}:{investor_type}": score_index.rank(positions, level, investor_type, k)[0].tolist()
+                for level in config.LEVEL_RISK_TIER_LIMITS
+                for investor_type in investor_types
+            }
+        return cls({'k': k, 'settings': profile_settings_fingerprint(config), 'views': views})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON 저장용 딕셔너리"""
+        return {
+            'k': self.k,
+            'settings': self.settings,
+            'cache_sha256': self.cache_sha256,
+            'views': self.views
+        }
+
+    def is_compatible(self, config: Config) -> bool:
+        """현재 점수 설정으로 만든 목록인지 확인 (설정 객체별로 한 번만 계산)"""
+        key = id(config)
+        if key not in self._compatible:
+            self._compatible[key] = self.settings == profile_settings_fingerprint(config)
+        return self._compatible[key]
+
+    def lookup(self, keyword: str, level: int, investor_type: str, top_n: int) -> Optional[np.ndarray]:
+        """
+        사전 계산 목록 조회
+
+        Returns:
+            상위 top_n개의 캐시 행 위치 배열 (점수 내림차순)
+            또는 None (목록 없음/요청 개수가 K 초과)
+        """
+        if top_n > self.k:
+            return None
+        key = (keyword.strip(), f"{level}:{investor_type}")
+        positions = self._arrays.get(key)
+        if positions is None:
+            listed = self.views.get(key[0], {}).get(key[1])
+            if listed is None:
+                return None
+            positions = np.asarray(listed, dtype=int)
+            self._arrays[key] = positions
+        return positions[:top_n]
+
+
+class ProfileSegmentIndex:
+    """
+    레벨 × 투자자 유형 1행 형식(기존) 캐시의 프로필 구간 인덱스
+
+    캐시 행 위치를 (level, investor_type) 구간별로 final_score 내림차순(동점은 캐시 순서,
+    NaN은 맨 뒤)으로 한 번 정렬해 두고 구간 오프셋을 기록합니다. 조회 시에는 요청 프로필의
+    구간을 앞에서부터 스캔해 카테고리 조건을 만족하는 행이 N개 모이면 멈추므로,
+    요청마다 캐시를 복사하거나 전체를 정렬하지 않습니다.
+    """
+
+    # 키워드별 카테고리 마스크 보관 개수
+    MAX_KEYWORD_CACHE = 256
+
+    # 구간 스캔 단위 (최소 행 수)
+    SCAN_CHUNK = 64
+
+    def __init__(self, cache_df: pd.DataFrame):
+        """
+        인덱스 초기화
+
+        Args:
+            cache_df: 레벨 × 투자자 유형 1행 형식의 캐시 DataFrame (final_score 포함)
+        """
+        self.df = cache_df
+        levels = pd.to_numeric(cache_df['level'], errors='coerce')
+        types = cache_df['investor_type'].astype(str)
+        segment = pd.DataFrame({'level': levels, 'type': types}).groupby(
+            ['level', 'type'], sort=False, dropna=True
+        ).ngroup().to_numpy()
+
+        scores = pd.to_numeric(cache_df['final_score'], errors='coerce').to_numpy(dtype=float)
+        keys = np.where(np.isnan(scores), np.inf, -scores)
+        positions = np.arange(len(cache_df))
+        order = np.lexsort((positions, keys, segment))
+        self.order = order[segment[order] >= 0]
+
+        # 구간 오프셋: (level, investor_type) → (시작, 끝)
+        starts = np.flatnonzero(np.diff(segment[self.order], prepend=-1) != 0)
+        ends = np.r_[starts[1:], len(self.order)]
+        self.offsets: Dict[Tuple[int, str], Tuple[int, int]] = {
+            (int(levels.iat[self.order[start]]), types.iat[self.order[start]]): (int(start), int(end))
+            for start, end in zip(starts, ends)
+        }
+        self._columns = {column: cache_df[column].to_numpy() for column in cache_df.columns}
+        self._category_masks: Dict[str, np.ndarray] = {}
+
+    def category_mask(self, category_keyword: str) -> Optional[np.ndarray]:
+        """
+        카테고리 키워드 마스크 (키워드별 결과 재사용)
+
+        Returns:
+            (캐시 행 수,) 불리언 배열 또는 None (빈 키워드 = 전체)
+        """
+        keyword = category_keyword.strip()
+        if not keyword:
+            return None
+
+        mask = self._category_masks.get(keyword)
+        if mask is None:
+            mask = keyword_mask(self.df, keyword, ['ETF명', '분류체계', '기초지수'])
+            if len(self._category_masks) >= self.MAX_KEYWORD_CACHE:
+                self._category_masks.pop(next(iter(self._category_masks)))
+            self._category_masks[keyword] = mask
+        return mask
+
+    def top(
+        self,
+        level: int,
+        investor_type: str,
+        top_n: int,
+        mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        프로필 구간에서 점수 상위 N개 선택
+
+        Args:
+            level: 사용자 레벨
+            investor_type: 투자자 유형
+            top_n: 선택 개수
+            mask: 카테고리 마스크 (None이면 조건 없음)
+
+        Returns:
+            캐시 행 위치 배열 (final_score 내림차순)
+        """
+        start, end = self.offsets.get((level, investor_type), (0, 0))
+        segment = self.order[start:end]
+        if mask is None or top_n <= 0:
+            return segment[:max(top_n, 0)]
+
+        # 점수순으로 스캔하다가 조건을 만족하는 행이 N개 모이면 중단
+        chunk = max(self.SCAN_CHUNK, top_n * 4)
+        hits, found = [], 0
+        for offset in range(0, len(segment), chunk):
+            part = segment[offset:offset + chunk]
+            part = part[mask[part]]
+            hits.append(part)
+            found += len(part)
+            if found >= top_n:
+                break
+        return np.concatenate(hits)[:top_n] if hits else segment[:0]
+
+    def records_at(self, positions: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        캐시 행 위치의 레코드 (to_dict('records')와 같은 형식, DataFrame 생성 없이)
+
+        Args:
+            positions: 캐시 행 위치 배열
+
+        Returns:
+            레코드 딕셔너리 리스트
+        """
+        names = list(self._columns)
+        values = [self._columns[name][positions].tolist() for name in names]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+
 class ETFRecommendationEngine:
     """ETF 추천 엔진 클래스"""
     
     def __init__(self):
         """추천 엔진 초기화"""
         self.config = Config()
+        self._score_index: Optional[ETFScoreIndex] = None
+        self._score_index_source = None
+        self._topk_views: Optional[TopKViews] = None
+        self._topk_views_source = None
+        self._segment_index: Optional[ProfileSegmentIndex] = None
+        self._segment_index_source = None
+        self._screener: Optional[ETFScreener] = None
+        self._screener_source = None
         logger.info("ETF 추천 엔진 초기화 완료")
 
+    def get_score_index(self, cache_df: pd.DataFrame) -> ETFScoreIndex:
+        """
+        팩터화된 캐시의 점수 인덱스 (같은 캐시 객체에 대해서는 재사용)
+
+        Args:
+            cache_df: 팩터화된 캐시 DataFrame
+
+        Returns:
+            ETFScoreIndex
+        """
+        if self._score_index is None or self._score_index_source is not cache_df:
+            self._score_index = ETFScoreIndex(cache_df, self.config)
+            self._score_index_source = cache_df
+        return self._score_index
+
+    def get_segment_index(self, cache_df: pd.DataFrame) -> ProfileSegmentIndex:
+        """
+        기존 형식 캐시의 프로필 구간 인덱스 (같은 캐시 객체에 대해서는 재사용)
+
+        Args:
+            cache_df: 레벨 × 투자자 유형 1행 형식의 캐시 DataFrame
+
+        Returns:
+            ProfileSegmentIndex
+        """
+        if self._segment_index is None or self._segment_index_source is not cache_df:
+            self._segment_index = ProfileSegmentIndex(cache_df)
+            self._segment_index_source = cache_df
+        return self._segment_index
+
+    def get_screener(self, cache_df: pd.DataFrame) -> ETFScreener:
+        """
+        캐시 조건 검색 인덱스 (같은 캐시 객체에 대해서는 재사용)
+
+        Args:
+            cache_df: 캐시 DataFrame (팩터화된 캐시 또는 기존 형식)
+
+        Returns:
+            ETFScreener
+        """
+        if self._screener is None or self._screener_source is not cache_df:
+            self._screener = ETFScreener(cache_df, self.config)
+            self._screener_source = cache_df
+        return self._screener
+
+    def get_topk_views(self, payload: Optional[Dict[str, Any]]) -> Optional[TopKViews]:
+        """
+        사전 계산 상위 K개 목록 (같은 payload 객체에 대해서는 재사용)
+
+        Args:
+            payload: 캐시 빌더가 저장한 목록 딕셔너리 (None이면 사용하지 않음)
+
+        Returns:
+            현재 점수 설정과 호환되는 TopKViews 또는 None
+        """
+        if payload is None:
+            return None
+        if self._topk_views_source is not payload:
+            self._topk_views = TopKViews(payload)
+            self._topk_views_source = payload
+        return self._topk_views if self._topk_views.is_compatible(self.config) else None
+
     def fast_recommend_etfs(
         self,
         user_profile: Dict[str, Any],
         cache_df: pd.DataFrame,
         category_keyword: str = "",
-        top_n: int = 5
+        top_n: int = 5,
+        topk_views: Optional[Dict[str, Any]] = None,
+        custom_weights: Optional[Any] = None,
+        similarity: Optional[SimilarityIndex] = None,
+        screen_conditions: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         캐시 기반 고속 ETF 추천
@@ -42,24 +792,102 @@ class ETFRecommendationEngine:
         Args:
             user_profile: 사용자 프로필 {'level': int, 'investor_type': str}
             cache_df: 사전 계산된 ETF 캐시 데이터
+                      (팩터화된 캐시 또는 레벨 × 투자자 유형 1행 형식)
             category_keyword: 카테고리 키워드 (예: "반도체")
             top_n: 추천할 ETF 개수
+            topk_views: 캐시와 함께 게시된 상위 K개 목록 (CacheStore.topk_views).
+                        목록에 있는 키워드/프로필이면 카테고리 필터와 정렬을 건너뜀
+            custom_weights: 사용자 지정 차원 가중치 ({'A': 0.5, 'R': 0.5, ...} 또는 길이 8 시퀀스).
+                            Level 3(Config.CUSTOM_WEIGHTS_MIN_LEVEL) 이상이면 투자자 유형 가중치 대신 사용
+                            (팩터화된 캐시만 지원, 사전 계산 목록 없이 차원 점수 행렬 · 가중치 벡터로 계산)
+            similarity: 유사 이웃 인덱스. 지정하면 상위 DIVERSITY_CANDIDATE_POOL개 후보에서
+                        같은 기초지수/고상관 ETF가 겹치지 않도록 MMR로 재정렬해 top_n개 선택
+            screen_conditions: 조건 검색 조건 (screener 모듈 형식, parse_screen_query 결과).
+                               지정하면 사전 계산 목록 없이 조건 마스크를 적용한 ETF만 순위 계산
         
         Returns:
             추천 ETF 리스트 (Dict 형태)
         """
+        if similarity is not None:
+            return self._diversified_recommend(
+                user_profile, cache_df, category_keyword, top_n, topk_views, custom_weights, similarity,
+                screen_conditions
+            )
+        
         try:
-            # 1단계: 카테고리 필터링
-            filtered = self._filter_by_category(cache_df, category_keyword)
-            if filtered.empty:
+            factorized = is_factorized_cache(cache_df)
+            score_index = self.get_score_index(cache_df) if factorized else None
+            level = self._normalize_user_level(user_profile.get('level'))
+            investor_type = user_profile.get('investor_type', 'ARSB')
+            
+            weights = None
+            if custom_weights is not None:
+                if level < self.config.CUSTOM_WEIGHTS_MIN_LEVEL:
+                    logger.warning(f"사용자 지정 가중치는 Level {self.config.CUSTOM_WEIGHTS_MIN_LEVEL} 이상만 "
+                                   f"사용할 수 있어 무시합니다: Level {level}")
+                elif factorized:
+                    weights = custom_weight_vector(custom_weights)
+                else:
+                    logger.warning("기존 형식 캐시에는 차원 점수가 없어 사용자 지정 가중치를 무시합니다.")
+            
+            # 조건 검색 마스크 (캐시 행 위치 기준, 조건이 없으면 None)
+            screen = self.get_screener(cache_df).mask(screen_conditions) if screen_conditions else None
+            
+            # 0단계: 사전 계산 목록 (팩터화된 캐시 + 목록에 있는 키워드/프로필만, 사용자 지정 가중치/조건 검색 제외)
+            views = self.get_topk_views(topk_views) if factorized and weights is None and screen is None else None
+            if views is not None:
+                positions = views.lookup(category_keyword, level, investor_type, top_n)
+                if positions is not None and len(positions):
+                    records = score_index.records_at(positions, level, investor_type, top_n=top_n)
+                    logger.info(f"추천 완료 (사전 계산 목록): {len(records)}개 ETF")
+                    return records
+            
+            # 1단계: 카테고리 필터링 (+ 조건 검색 마스크 AND)
+            segments = None
+            if factorized:
+                filtered = score_index.filter_by_category(category_keyword)
+                no_category = filtered.empty
+                positions = filtered.index.to_numpy()
+                if screen is not None:
+                    positions = positions[screen[positions]]
+                no_screen = not len(positions)
+            elif 'final_score' in cache_df.columns:
+                # 기존 형식 캐시: 카테고리 마스크만 계산 (캐시 행 복사 없음)
+                segments = self.get_segment_index(cache_df)
+                category = segments.category_mask(category_keyword)
+                no_category = cache_df.empty if category is None else not category.any()
+                if screen is not None:
+                    category = screen if category is None else category & screen
+                no_screen = cache_df.empty if category is None else not category.any()
+            else:
+                filtered = self._filter_by_category(cache_df, category_keyword)
+                no_category = filtered.empty
+                if screen is not None:
+                    filtered = self._filter_by_category(cache_df[screen], category_keyword)
+                no_screen = filtered.empty
+            if no_category:
                 logger.warning(f"카테고리 '{category_keyword}'에 해당하는 ETF가 없습니다.")
                 return [{
                     '안내': f"'{category_keyword}' 조건에 맞는 ETF를 찾을 수 없습니다. 다른 키워드로 다시 시도해보세요."
                 }]
+            if no_screen:
+                conditions_text = describe_conditions(screen_conditions, self.config)
+                logger.warning(f"검색 조건에 맞는 ETF가 없습니다: {conditions_text}")
+                return [{
+                    '안내': f"'{category_keyword or '전체'}' ETF 중 검색 조건({conditions_text})을 모두 만족하는 ETF가 없습니다. 조건을 완화해서 다시 시도해보세요."
+                }]
 
-            # 2단계: 사용자 프로필 필터링
-            filtered = self._filter_by_user_profile(filtered, user_profile)
-            if filtered.empty:
+            # 2단계: 사용자 프로필 필터링 (팩터화된 캐시/프로필 구간은 여기서 상위 N개까지 선택)
+            records = None
+            if factorized:
+                records = score_index.records_at(positions, level, investor_type, top_n=top_n, weights=weights)
+            elif segments is not None:
+                positions = segments.top(level, investor_type, top_n, category)
+                records = segments.records_at(positions)
+            else:
+                filtered = self._filter_by_user_profile(filtered, user_profile)
+            no_match = not records if records is not None else filtered.empty
+            if no_match:
                 logger.warning(f"사용자 프로필에 맞는 ETF가 없습니다: {user_profile}")
                 # 안내 메시지 반환
                 user_level = user_profile.get('level', '알 수 없음')
@@ -68,7 +896,11 @@ class ETFRecommendationEngine:
                     '안내': f"현재 선택하신 투자 레벨(Level {user_level})과 투자자 유형({investor_type})에 적합한 ETF가 없습니다.\n\n- 투자 레벨이나 유형을 변경해서 다시 시도해보시거나,\n- 카테고리 키워드를 바꿔서 검색해보세요.\n\n(일부 테마/섹터 ETF는 초보자에게 추천되지 않을 수 있습니다.)"
                 }]
 
-            # 3단계: 점수 기반 정렬 및 상위 N개 선택
+            # 3단계: 점수 기반 정렬 및 상위 N개 선택 (팩터화된 캐시/프로필 구간은 2단계에서 선택됨)
+            if records is not None:
+                logger.info(f"추천 완료: {len(records)}개 ETF")
+                return records
+            
             top_etfs = self._select_top_etfs(filtered, top_n)
             
             logger.info(f"추천 완료: {len(top_etfs)}개 ETF")
@@ -80,6 +912,132 @@ class ETFRecommendationEngine:
                 '안내': f"ETF 추천 중 오류가 발생했습니다: {e}"
             }]
 
+    def _diversified_recommend(
+        self,
+        user_profile: Dict[str, Any],
+        cache_df: pd.DataFrame,
+        category_keyword: str,
+        top_n: int,
+        topk_views: Optional[Dict[str, Any]],
+        custom_weights: Optional[Any],
+        similarity: SimilarityIndex,
+        screen_conditions: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        후보 풀 추천 후 다양성 재정렬 (재정렬 실패 시 점수 순서 그대로)
+        
+        Returns:
+            추천 ETF 리스트 (안내 메시지면 그대로 반환)
+        """
+        pool = self.fast_recommend_etfs(
+            user_profile, cache_df, category_keyword,
+            top_n=max(top_n, self.config.DIVERSITY_CANDIDATE_POOL),
+            topk_views=topk_views, custom_weights=custom_weights, screen_conditions=screen_conditions
+        )
+        if not pool or '안내' in pool[0]:
+            return pool
+        
+        try:
+            records = similarity.rerank(pool, top_n, self.config.DIVERSITY_WEIGHT)
+            logger.info(f"다양성 재정렬 완료: 후보 {len(pool)}개 → {len(records)}개 ETF")
+            return records
+        except Exception as e:
+            logger.warning(f"다양성 재정렬 실패, 점수 순서를 사용합니다: {e}")
+            return pool[:top_n]
+
+    def batch_recommend_etfs(
+        self,
+        requests: List[Tuple[Any, ...]],
+        cache_df: pd.DataFrame,
+        top_n: int = 5
+    ) -> pd.DataFrame:
+        """
+        여러 (사용자 프로필, 카테고리, 추천 개수) 요청을 한 번에 처리하는 일괄 추천
+        
+        마케팅/알림 작업처럼 "모든 프로필 × 모든 카테고리 상위 N개"가 필요할 때 사용합니다.
+        팩터화된 캐시는 카테고리 필터를 키워드별로 한 번만 계산하고, 모든 프로필의 점수를
+        행렬 곱 한 번으로 구한 뒤 카테고리별로 프로필 상위 N개를 한 번에 선택합니다
+        (ETFScoreIndex.batch_scores). 기존 형식 캐시는 요청별로 fast_recommend_etfs를 호출합니다.
+        
+        Args:
+            requests: (user_profile, category_keyword[, top_n]) 튜플 리스트
+                      (user_profile의 custom_weights는 fast_recommend_etfs와 같은 규칙으로 적용)
+            cache_df: 사전 계산된 ETF 캐시 데이터
+            top_n: 요청에 추천 개수가 없을 때의 기본값
+        
+        Returns:
+            컬럼 형식 결과 DataFrame (BATCH_RESULT_COLUMNS: 요청 번호, 카테고리, 순위 + 점수 레코드).
+            결과가 없는 요청은 행이 없으며, 개별 요청 결과는 result[result['request'] == i].
+            잘못된 요청(custom_weights/추천 개수 오류 등)은 건너뛰고 나머지 결과를 반환하며,
+            건너뛴 요청은 result.attrs['errors'] (요청 번호 → 오류 메시지)에 기록됩니다.
+        """
+        errors: Dict[int, str] = {}
+        try:
+            # 요청별 검증 (잘못된 요청 하나가 전체 일괄 결과를 비우지 않도록 개별 처리)
+            request_ids, valid_requests, queries = [], [], []
+            for request_id, request in enumerate(requests):
+                try:
+                    queries.append(self._batch_query(request, top_n))
+                except Exception as e:
+                    errors[request_id] = str(e)
+                    logger.warning(f"일괄 추천 요청 {request_id} 건너뜀: {e}")
+                    continue
+                request_ids.append(request_id)
+                valid_requests.append(request)
+            
+            if not queries:
+                result = pd.DataFrame(columns=BATCH_RESULT_COLUMNS)
+            elif is_factorized_cache(cache_df):
+                result = self.get_score_index(cache_df).batch_scores(queries)
+            else:
+                result = self._batch_recommend_legacy(valid_requests, queries, cache_df)
+            
+            # 유효한 요청 안의 번호 → 원래 요청 번호
+            if len(result):
+                result['request'] = np.asarray(request_ids)[result['request'].to_numpy(dtype=int)]
+            
+            logger.info(f"일괄 추천 완료: 요청 {len(requests)}건 (오류 {len(errors)}건), 결과 {len(result)}행")
+        
+        except Exception as e:
+            logger.error(f"일괄 추천 중 오류 발생: {e}")
+            result = pd.DataFrame(columns=BATCH_RESULT_COLUMNS)
+        
+        result.attrs['errors'] = errors
+        return result
+
+    def _batch_query(
+        self, request: Tuple[Any, ...], top_n: int
+    ) -> Tuple[int, str, str, int, Optional[np.ndarray]]:
+        """일괄 추천 요청 1건을 (레벨, 투자자 유형, 카테고리, 추천 개수, 가중치) 조회로 변환 (잘못된 요청은 예외)"""
+        user_profile, category_keyword = request[0], request[1]
+        request_top_n = max(0, int(request[2])) if len(request) > 2 else top_n
+        level = self._normalize_user_level(user_profile.get('level'))
+        investor_type = user_profile.get('investor_type', 'ARSB')
+        weights = None
+        custom_weights = user_profile.get('custom_weights')
+        if custom_weights is not None and level >= self.config.CUSTOM_WEIGHTS_MIN_LEVEL:
+            weights = custom_weight_vector(custom_weights)
+        return level, investor_type, category_keyword or '', request_top_n, weights
+
+    def _batch_recommend_legacy(
+        self,
+        requests: List[Tuple[Any, ...]],
+        queries: List[Tuple[int, str, str, int, Optional[np.ndarray]]],
+        cache_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        """기존 형식 캐시의 일괄 추천 (요청별 fast_recommend_etfs 결과를 컬럼 형식으로 합침)"""
+        rows = []
+        for request_id, (request, (_, _, category_keyword, request_top_n, _)) in enumerate(zip(requests, queries)):
+            records = self.fast_recommend_etfs(request[0], cache_df, category_keyword, request_top_n)
+            rows.extend(
+                {'request': request_id, 'category': category_keyword, 'rank': rank, **record}
+                for rank, record in enumerate(records, 1) if '안내' not in record
+            )
+        if not rows:
+            return pd.DataFrame(columns=BATCH_RESULT_COLUMNS)
+        result = pd.DataFrame(rows)
+        return result[[column for column in BATCH_RESULT_COLUMNS if column in result.columns]]
+
     def _filter_by_category(self, cache_df: pd.DataFrame, category_keyword: str) -> pd.DataFrame:
         """
         카테고리 키워드로 ETF 필터링
@@ -115,14 +1073,11 @@ class ETFRecommendationEngine:
         user_level = self._normalize_user_level(user_profile.get('level'))
         investor_type = user_profile.get('investor_type', 'ARSB')
 
-        # 타입 강제 변환
-        cache_df = cache_df.copy()
-        cache_df['level'] = cache_df['level'].astype(int)
-        cache_df['investor_type'] = cache_df['investor_type'].astype(str)
-
+        # 타입을 맞춰 비교 (캐시 복사 없이 조건 마스크만 생성)
+        levels = pd.to_numeric(cache_df['level'], errors='coerce')
         filtered = cache_df[
-            (cache_df['level'] == user_level) &
-            (cache_df['investor_type'] == investor_type)
+            (levels == user_level) &
+            (cache_df['investor_type'].astype(str) == investor_type)
         ]
         logger.info(f"사용자 프로필 필터링: Level {user_level}, {investor_type} → {len(filtered)}개")
         return filtered
@@ -155,12 +1110,9 @@ class ETFRecommendationEngine:
         if 'final_score' not in filtered_df.columns:
             filtered_df = self._generate_fallback_scores(filtered_df)
         
-        # 점수 기준 내림차순 정렬 후 상위 N개 선택
-        top_etfs = filtered_df.sort_values(
-            'final_score', 
-            ascending=False, 
-            na_position='last'  
-        ).head(top_n)
+        # 점수 기준 내림차순 상위 N개 선택 (전체 정렬 없이, NaN은 맨 뒤)
+        scores = pd.to_numeric(filtered_df['final_score'], errors='coerce').to_numpy(dtype=float)
+        top_etfs = filtered_df.iloc[top_n_order(scores, top_n)]
         
         logger.info(f"상위 {top_n}개 ETF 선택 완료")
         return top_etfs
@@ -212,7 +1164,8 @@ class ETFRecommendationEngine:
         recommendations: List[Dict[str, Any]],
         user_profile: Dict[str, Any],
         category_keyword: str,
-        context_docs: Optional[List[str]] = None
+        context_docs: Optional[List[str]] = None,
+        screen_conditions: Optional[Dict[str, Any]] = None
     ) -> str:
         """
         추천 결과에 대한 설명 프롬프트 생성
@@ -222,6 +1175,7 @@ class ETFRecommendationEngine:
             user_profile: 사용자 프로필
             category_keyword: 카테고리 키워드
             context_docs: 추가 참고 문서 (사용되지 않음)
+            screen_conditions: 적용한 조건 검색 조건 (설명에 반영)
         
         Returns:
             LLM용 설명 프롬프트
@@ -255,12 +1209,27 @@ class ETFRecommendationEngine:
         investor_type = user_profile.get('investor_type', 'ARSB')
         investor_description = self.config.get_investor_type_description(investor_type)
         
+        # 사용자가 직접 조정한 차원 가중치 (설명에 반영)
+        custom_weights = user_profile.get('custom_weights')
+        weights_line = ""
+        if custom_weights and user_level >= self.config.CUSTOM_WEIGHTS_MIN_LEVEL:
+            weights = custom_weight_vector(custom_weights)
+            weights_line = "\n- 직접 조정한 차원 가중치: " + ", ".join(
+                f"{self.config.INVESTOR_DIMENSION_LABELS.get(d, d)}({d}) {w:.0%}"
+                for d, w in zip(DIMENSIONS, weights) if w > 0
+            )
+        
+        # 조건 검색 조건 (설명에 반영)
+        conditions_text = describe_conditions(screen_conditions, self.config)
+        if conditions_text:
+            weights_line += f"\n- 검색 조건: {conditions_text}"
+        
         prompt = f"""{self.config.get_recommendation_prompt(user_profile)}
 
 사용자 정보:
 - 요청 카테고리: {category_keyword if category_keyword else "ETF 추천"}
 - 사용자 레벨: Level {user_level}
-- 투자자 유형: {investor_type} ({investor_description})
+- 투자자 유형: {investor_type} ({investor_description}){weights_line}
 
 추천 ETF 목록:
 {etf_info_text}
@@ -300,6 +1269,105 @@ class ETFRecommendationEngine:
         # 최소 0.1 보장
         return max(total_weight, 0.1)
 
+    def get_type_weight_matrix(self) -> Tuple[List[str], np.ndarray]:
+        """
+        투자자 유형별 가중치 행렬 생성
+
+        Returns:
+            (투자자 유형 리스트, (8 × 유형 수) 가중치 행렬 - 행 순서는 DIMENSIONS)
+        """
+        investor_types = list(self.config.INVESTOR_TYPE_WEIGHTS.keys())
+        weights = np.zeros((len(DIMENSIONS), len(investor_types)))
+        for j, investor_type in enumerate(investor_types):
+            for dimension, weight in self.config.INVESTOR_TYPE_WEIGHTS[investor_type].items():
+                weights[DIMENSIONS.index(dimension), j] = weight
+        return investor_types, weights
+
+    def calculate_dimension_matrix(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        ETF별 차원 점수 행렬 계산 (_calculate_dimension_score의 벡터 버전)
+
+        없는 컬럼은 단일 행 계산과 같은 기본값(자산규모/거래량 0, 변동성 '보통',
+        분류체계 '')을 사용합니다.
+
+        Args:
+            df: ETF 정보 DataFrame
+
+        Returns:
+            (ETF 수 × 8) 차원 점수 행렬 (열 순서는 DIMENSIONS)
+        """
+        n = len(df)
+
+        def numeric(column: str) -> np.ndarray:
+            if column not in df.columns:
+                return np.zeros(n)
+            values = df[column]
+            if values.dtype == object:
+                values = values.astype(str).str.replace(',', '').str.strip()
+            return pd.to_numeric(values, errors='coerce').fillna(0).to_numpy(dtype=float)
+
+        def text(column: str, default: str) -> pd.Series:
+            if column not in df.columns:
+                return pd.Series([default] * n, index=df.index)
+            return df[column].fillna(default).astype(str)
+
+        def contains_any(values: pd.Series, keywords: List[str]) -> np.ndarray:
+            mask = np.zeros(n, dtype=bool)
+            for keyword in keywords:
+                mask |= values.str.contains(keyword, regex=False).to_numpy()
+            return mask
+
+        aum = numeric('자산규모')
+        volume = numeric('거래량')
+        volatility = text('변동성', '보통')
+        classification = text('분류체계', '')
+
+        scores = np.empty((n, len(DIMENSIONS)))
+
+        # A: 자산규모 중시 / I: 중간 규모 선호
+        scores[:, 0] = np.select([aum >= 1000000, aum >= 500000, aum >= 100000], [1.0, 0.7, 0.4], 0.1)
+        scores[:, 1] = np.select([(aum >= 100000) & (aum <= 500000), aum >= 50000], [1.0, 0.6], 0.2)
+
+        # R: 낮은 변동성 선호 / E: 높은 변동성 선호
+        scores[:, 2] = volatility.map(
+            {'매우낮음': 1.0, '낮음': 0.8, '보통': 0.5, '높음': 0.2, '매우높음': 0.0}
+        ).fillna(0.5).to_numpy(dtype=float)
+        scores[:, 3] = volatility.map(
+            {'매우높음': 1.0, '높음': 0.8, '보통': 0.5, '낮음': 0.2, '매우낮음': 0.0}
+        ).fillna(0.5).to_numpy(dtype=float)
+
+        # S: 테마/섹터 선호 / T: 시장대표 선호
+        scores[:, 4] = np.select(
+            [contains_any(classification, ['업종테마', '전략테마', '섹터']),
+             contains_any(classification, ['업종', '테마'])],
+            [1.0, 0.6], 0.2
+        )
+        scores[:, 5] = np.select(
+            [contains_any(classification, ['시장대표']),
+             contains_any(classification, ['지수', '인덱스'])],
+            [1.0, 0.6], 0.3
+        )
+
+        # B: 낮은 거래량 선호 / P: 높은 거래량 선호
+        scores[:, 6] = np.select([volume <= 10000, volume <= 50000, volume <= 100000], [1.0, 0.7, 0.4], 0.1)
+        scores[:, 7] = np.select([volume >= 100000, volume >= 50000, volume >= 10000], [1.0, 0.7, 0.4], 0.1)
+
+        return scores
+
+    def calculate_type_weight_matrix(self, df: pd.DataFrame) -> Tuple[List[str], np.ndarray]:
+        """
+        모든 ETF × 모든 투자자 유형의 가중치를 한 번의 행렬곱으로 계산
+
+        Args:
+            df: ETF 정보 DataFrame
+
+        Returns:
+            (투자자 유형 리스트, (ETF 수 × 유형 수) 가중치 행렬, 최소 0.1 보장)
+        """
+        investor_types, weights = self.get_type_weight_matrix()
+        type_weights = self.calculate_dimension_matrix(df) @ weights
+        return investor_types, np.maximum(type_weights, 0.1)
+
     def _calculate_dimension_score(self, row: pd.Series, dimension: str) -> float:
         """
         개별 차원별 점수 계산
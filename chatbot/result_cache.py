@@ -0,0 +1,269 @@
+"""
+요청 결과 캐시 모듈
+- 같은 (요청, 사용자 프로필, 데이터 버전)의 추천/비교 결과와 최종 답변을 재사용
+- 메모리 LRU(최대 항목 수) + TTL(유효 시간) 제거
+- (선택) SQLite 디스크 계층: 프로세스 재시작/여러 프로세스 간 공유 (JSON 직렬화 가능한 값만)
+
+키 구성:
+- result_key(종류, 요청 내용...) → "종류:지문" (요청 내용은 JSON 정규화 후 해시, 딕셔너리 키 순서 무관)
+- 데이터 버전(캐시 빌드 식별자, 데이터 파일 수정 시각)을 키에 포함하므로
+  캐시가 다시 게시되면 이전 결과는 더 이상 조회되지 않고 TTL/LRU로 정리됨
+
+주요 기능:
+1. ResultCache.get / set: 조회 및 저장
+2. ResultCache.get_or_compute: 없으면 계산 후 저장 (저장 여부 조건 지정 가능)
+3. ResultCache.stats: 적중/미적중/제거 통계
+"""
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .fingerprint import object_fingerprint
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 디스크 계층에서 만료 항목을 정리하는 저장 간격
+DISK_PRUNE_INTERVAL = 100
+
+
+def result_key(kind: str, *parts: Any) -> str:
+    """
+    결과 캐시 키
+
+    Args:
+        kind: 결과 종류 ('recommend', 'compare', 'answer' 등)
+        *parts: 요청 내용 (JSON 직렬화 가능한 값, 정규화는 호출하는 쪽에서)
+
+    Returns:
+        "종류:16자리 지문"
+    """
+    return f"{kind}:{object_fingerprint(list(parts))}"
+
+
+class ResultCache:
+    """
+    LRU + TTL 결과 캐시
+
+    메모리 계층은 조회 시 반환하는 객체를 그대로 보관하므로, 호출하는 쪽에서
+    반환값을 수정하지 않아야 합니다. 디스크 계층은 JSON으로 저장되므로 튜플은 리스트로,
+    DataFrame/차트처럼 JSON으로 바꿀 수 없는 값은 메모리에만 저장됩니다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 6 * 60 * 60,
+        disk_path: Optional[str] = None,
+        max_disk_entries: int = 10000
+    ):
+        """
+        캐시 초기화
+
+        Args:
+            max_entries: 메모리 LRU 최대 항목 수
+            ttl_seconds: 항목 유효 시간 (초)
+            disk_path: SQLite 디스크 계층 파일 경로 (None이면 메모리만 사용)
+            max_disk_entries: 디스크 계층 최대 항목 수
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self._entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_writes = 0
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+        if disk_path:
+            self._open_disk(disk_path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -------------------------------------------------------------------------
+    # 조회 / 저장
+    # -------------------------------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        결과 조회 (메모리 → 디스크 순서, 만료 항목은 제거)
+
+        Args:
+            key: result_key 결과
+            default: 없을 때 반환값
+
+        Returns:
+            저장된 결과 또는 default
+        """
+        found, value = self._lookup(key)
+        return value if found else default
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """
+        결과 저장
+
+        Args:
+            key: result_key 결과
+            value: 저장할 결과
+            ttl_seconds: 항목별 유효 시간 (None이면 기본값)
+        """
+        expires_at = time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._store(key, expires_at, value)
+            if self._db is not None:
+                self._write_disk(key, expires_at, value)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+        ttl_seconds: Optional[float] = None
+    ) -> Any:
+        """
+        결과 조회, 없으면 계산 후 저장
+
+        Args:
+            key: result_key 결과
+            compute: 결과 계산 함수
+            cacheable: 계산 결과 저장 여부 판단 함수 (오류 응답 등은 False, None이면 항상 저장)
+            ttl_seconds: 항목별 유효 시간 (None이면 기본값)
+
+        Returns:
+            저장된 결과 또는 새로 계산한 결과
+        """
+        found, value = self._lookup(key)
+        if found:
+            return value
+        value = compute()
+        if cacheable is None or cacheable(value):
+            self.set(key, value, ttl_seconds)
+        return value
+
+    def clear(self):
+        """모든 항목 제거 (디스크 계층 포함)"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                try:
+                    with self._db:
+                        self._db.execute("DELETE FROM results")
+                except sqlite3.Error as e:
+                    logger.warning(f"결과 캐시 디스크 계층 비우기 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        적중/미적중 통계
+
+        Returns:
+            {'hits', 'disk_hits', 'misses', 'evictions', 'expired', 'entries', 'hit_rate'}
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        total = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['disk_hits']) / total, 4) if total else None
+        return stats
+
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        """(찾음 여부, 값) 조회"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return True, value
+                del self._entries[key]
+                self._stats['expired'] += 1
+
+            if self._db is not None:
+                found, expires_at, value = self._read_disk(key, now)
+                if found:
+                    self._store(key, expires_at, value)
+                    self._stats['disk_hits'] += 1
+                    return True, value
+
+            self._stats['misses'] += 1
+            return False, None
+
+    def _store(self, key: str, expires_at: float, value: Any):
+        """메모리 계층 저장 (잠금 안에서 호출, 최대 항목 수 초과 시 가장 오래 안 쓴 항목 제거)"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    # -------------------------------------------------------------------------
+    # 디스크 계층 (SQLite)
+    # -------------------------------------------------------------------------
+
+    def _open_disk(self, path: str):
+        """디스크 계층 열기 (실패 시 메모리만 사용)"""
+        try:
+            self._db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            with self._db:
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS results "
+                    "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS results_expires ON results (expires_at)")
+            logger.info(f"결과 캐시 디스크 계층 사용: {path}")
+        except sqlite3.Error as e:
+            logger.warning(f"결과 캐시 디스크 계층을 열 수 없어 메모리만 사용합니다: {e}")
+            self._db = None
+
+    def _read_disk(self, key: str, now: float) -> Tuple[bool, float, Any]:
+        """디스크 계층 조회 (잠금 안에서 호출)"""
+        try:
+            row = self._db.execute(
+                "SELECT expires_at, value FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False, 0.0, None
+            if row[0] <= now:
+                with self._db:
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._stats['expired'] += 1
+                return False, 0.0, None
+            return True, row[0], json.loads(row[1])
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"결과 캐시 디스크 조회 실패: {e}")
+            return False, 0.0, None
+
+    def _write_disk(self, key: str, expires_at: float, value: Any):
+        """디스크 계층 저장 (잠금 안에서 호출, JSON으로 바꿀 수 없는 값은 건너뜀)"""
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        try:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, expires_at, value) VALUES (?, ?, ?)",
+                    (key, expires_at, payload)
+                )
+            self._disk_writes += 1
+            if self._disk_writes % DISK_PRUNE_INTERVAL == 0:
+                self._prune_disk()
+        except sqlite3.Error as e:
+            logger.warning(f"결과 캐시 디스크 저장 실패: {e}")
+
+    def _prune_disk(self):
+        """디스크 계층 정리: 만료 항목 제거 + 최대 항목 수 초과분(만료가 빠른 순) 제거"""
+        with self._db:
+            self._db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+            self._db.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,)
+            )
@@ -0,0 +1,766 @@
+"""
+ETF 위험도 분류 모듈
+- ETF 시세 데이터를 기반으로 위험도 지표 계산
+- R/E (Risk-averse/Eager) 분류: 위험 회피형 vs 공격 투자형
+- B/P (Buy-and-hold/Portfolio) 분류: 장기 보유형 vs 포트폴리오 조정형
+- Risk Tier 계산: 5단계 위험 등급 (0~4)
+
+주요 기능:
+1. 변동성, 최대낙폭, VaR, 베타, 샤프비율, 소르티노비율 계산 (chatbot.rolling 벡터 연산)
+2. 위험도 지표 정규화 및 가중합으로 Risk Score 계산
+3. Risk Score 기반 R/E 분류, 최대낙폭 기반 B/P 분류
+4. 날짜별 Risk Tier 5단계 등급화 (0: 매우 안전 ~ 4: 매우 위험)
+5. 증분 갱신: ETF별 최근 WINDOW일 상태를 저장해 새로 수집된 날짜만 계산
+6. ETF별 최신 위험등급 스냅샷 및 딕셔너리 기반 조회 인덱스 (RiskTierIndex)
+7. 멀티코어 지표 계산: ETF 단위 샤드 + 공유 메모리 프로세스 풀 (chatbot.parallel)
+8. 결과/스냅샷/상태 파일은 임시 파일 + os.replace로 원자적 저장 (chatbot.cache_store)
+"""
+
+import os
+import json
+import shutil
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from .cache_store import atomic_write, atomic_write_csv, atomic_write_json
+from .parallel import SharedArrays, resolve_workers, shard_groups
+from .rolling import GroupedRolling
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# 기본 파라미터
+# =============================================================================
+
+# 롤링 윈도우 크기 (약 6개월, 126영업일 기준)
+DEFAULT_WINDOW = 126
+
+# 위험도 지표별 가중치 설정 (총합 = 1.0)
+DEFAULT_RISK_WEIGHTS = {
+    'vol':     0.25,  # 변동성 (25%)
+    'max_dd':  0.15,  # 최대낙폭 (15%)
+    'VaR':     0.20,  # Value at Risk (20%)
+    'beta':    0.10,  # 베타 (10%)
+    'sharpe':  0.15,  # 샤프비율 (15%)
+    'sortino': 0.10,  # 소르티노비율 (10%)
+    'down_dev':0.05   # 하방편차 (5%)
+}
+
+# B/P 분류 임계값 (최대낙폭 기준)
+DEFAULT_TH_MDD = 0.20  # MDD ≤ 20% → B (Buy-and-hold), 그 외 P (Portfolio)
+
+# R/E 분류 임계값 (Risk Score 기준)
+TH_RISK_SCORE = 0.4  # Risk_Score ≤ 0.4 → R (Risk-averse), 그 외 E (Eager)
+
+RISK_METRICS = ['vol', 'max_dd', 'VaR', 'beta', 'sharpe', 'sortino', 'down_dev']
+
+# 위험도 계산에 필요한 시세 컬럼 (증분 상태 파일에도 이 컬럼만 저장)
+PRICE_COLUMNS = ['basDt', 'srtnCd', 'itmsNm', 'clpr', 'bssIdxClpr']
+
+# 결과 파일 컬럼
+OUTPUT_COLUMNS = [
+    'basDt',      # 기준일자
+    'srtnCd',     # 종목코드
+    'itmsNm',     # 종목명
+    'Risk_Score', # 위험도 점수
+    'risk_bin',   # R/E 분류
+    'risk_tier',  # 위험 등급 (0~4)
+    'strat_bin'   # B/P 분류
+]
+
+TIER_DESCRIPTIONS = ['매우안전', '안전', '보통', '위험', '매우위험']
+
+# 워커당 샤드 수 (ETF별 길이 차이로 인한 부하 불균형 완화)
+SHARDS_PER_WORKER = 4
+
+# 병렬 계산을 시작할 최소 행 수 (이보다 작으면 프로세스 생성 비용이 더 큼)
+MIN_PARALLEL_ROWS = 50_000
+
+# =============================================================================
+# 데이터 로드
+# =============================================================================
+
+def parse_basdt(values: pd.Series) -> pd.Series:
+    """
+    기준일자 파싱 (YYYYMMDD, YYYY-MM-DD 모두 허용)
+
+    Args:
+        values: 기준일자 Series
+
+    Returns:
+        datetime Series
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    text = values.astype(str).str.strip().str.replace('-', '', regex=False).str[:8]
+    return pd.to_datetime(text, format='%Y%m%d', errors='coerce')
+
+
+def load_prices(file_path: str) -> pd.DataFrame:
+    """
+    시세 CSV 로드 및 (종목코드, 날짜) 정렬
+
+    Args:
+        file_path: 시세 데이터 CSV 경로
+
+    Returns:
+        정렬된 시세 DataFrame
+    """
+    df = pd.read_csv(file_path, dtype={'srtnCd': str}, encoding='utf-8-sig', low_memory=False)
+    return prepare_prices(df)
+
+
+def prepare_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    시세 데이터 정리 (필요 컬럼 선택, 날짜 파싱, 중복 제거, 정렬)
+
+    Args:
+        df: 원본 시세 DataFrame
+
+    Returns:
+        정렬된 시세 DataFrame
+    """
+    missing = [col for col in PRICE_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"시세 데이터에 필요한 컬럼이 없습니다: {missing}")
+
+    df = df[PRICE_COLUMNS].copy()
+    df['srtnCd'] = df['srtnCd'].astype(str).str.strip()
+    df['basDt'] = parse_basdt(df['basDt'])
+    df['clpr'] = pd.to_numeric(df['clpr'], errors='coerce')
+    df['bssIdxClpr'] = pd.to_numeric(df['bssIdxClpr'], errors='coerce')
+
+    df = df.dropna(subset=['basDt'])
+    df = df.drop_duplicates(subset=['srtnCd', 'basDt'], keep='last')
+    return df.sort_values(['srtnCd', 'basDt']).reset_index(drop=True)
+
+# =============================================================================
+# 롤링 위험도 지표 (단일 프로세스 / 워커 공용)
+# =============================================================================
+
+def rolling_risk_metrics(codes: np.ndarray, r: np.ndarray, mkt_r: np.ndarray,
+                         window: int) -> Dict[str, np.ndarray]:
+    """
+    정렬된 수익률 배열에서 7개 롤링 위험도 지표 계산
+
+    ETF(그룹)별로 독립적으로 계산되므로, ETF 경계에서 나눈 구간별 결과를
+    이어 붙이면 전체를 한 번에 계산한 결과와 비트 단위로 같습니다.
+
+    Args:
+        codes: 종목코드(또는 정수 그룹 ID) 배열, (종목코드, 날짜) 정렬
+        r: ETF 일간 수익률
+        mkt_r: 기초지수 일간 수익률
+        window: 롤링 윈도우 크기
+
+    Returns:
+        지표명 → 배열 딕셔너리 (RISK_METRICS)
+    """
+    roll = GroupedRolling(codes, window)
+
+    # 1. 변동성 (연율화된 표준편차)
+    vol = roll.std(r) * np.sqrt(252)
+    # 2. 최대낙폭
+    max_dd = roll.max_drawdown(r)
+    # 3. VaR - 95% 신뢰구간 하위 5% 수익률
+    var_95 = roll.quantile(r, 0.05)
+    # 4. 베타 - 시장 대비 민감도
+    with np.errstate(invalid='ignore', divide='ignore'):
+        beta = roll.cov(r, mkt_r) / roll.var(mkt_r)
+    # 5. 샤프비율 - 위험 대비 초과수익률
+    mean_r = roll.mean(r)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = mean_r / vol * np.sqrt(252)
+    # 6. 하방편차 - 손실 구간의 표준편차
+    down_dev = np.sqrt(roll.mean(np.minimum(r, 0) ** 2) * 252)
+    # 7. 소르티노비율 - 하방위험 대비 초과수익률
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sortino = mean_r / down_dev * np.sqrt(252)
+
+    return {
+        'vol': vol, 'max_dd': max_dd, 'VaR': var_95, 'beta': beta,
+        'sharpe': sharpe, 'sortino': sortino, 'down_dev': down_dev
+    }
+
+
+# 워커 프로세스에서 연결한 공유 배열 (프로세스 풀 initializer가 설정)
+_worker_arrays: Optional[SharedArrays] = None
+
+
+def _init_metrics_worker(spec):
+    """워커 초기화: 공유 메모리의 입력/출력 배열에 연결"""
+    global _worker_arrays
+    _worker_arrays = SharedArrays.attach(spec)
+
+
+def _metrics_shard(window: int, start: int, end: int) -> int:
+    """
+    워커 작업: [start, end) 행 구간의 지표를 계산해 공유 출력 배열에 기록
+
+    Returns:
+        처리한 행 수
+    """
+    arrays = _worker_arrays
+    result = rolling_risk_metrics(
+        arrays['codes'][start:end], arrays['r'][start:end], arrays['mkt_r'][start:end], window
+    )
+    for metric in RISK_METRICS:
+        arrays[metric][start:end] = result[metric]
+    return end - start
+
+
+def parallel_risk_metrics(codes: np.ndarray, r: np.ndarray, mkt_r: np.ndarray,
+                          window: int, n_workers: int) -> Dict[str, np.ndarray]:
+    """
+    프로세스 풀로 롤링 위험도 지표 계산
+
+    입력(그룹 ID, 수익률)과 출력(지표 배열)을 모두 공유 메모리에 두고,
+    워커에는 행 구간만 전달합니다. 샤드는 ETF 경계에서만 나뉘므로
+    결과는 rolling_risk_metrics 한 번 호출과 동일합니다.
+
+    Args:
+        codes: 정수 그룹 ID 배열, (종목코드, 날짜) 정렬
+        r: ETF 일간 수익률
+        mkt_r: 기초지수 일간 수익률
+        window: 롤링 윈도우 크기
+        n_workers: 워커 프로세스 수
+
+    Returns:
+        지표명 → 배열 딕셔너리 (RISK_METRICS)
+    """
+    shards = shard_groups(codes, n_workers * SHARDS_PER_WORKER)
+    n = len(codes)
+
+    inputs = SharedArrays.create({
+        'codes': np.asarray(codes, dtype=np.int64),
+        'r': np.asarray(r, dtype=float),
+        'mkt_r': np.asarray(mkt_r, dtype=float),
+    })
+    try:
+        outputs = SharedArrays.empty({m: ((n,), 'f8') for m in RISK_METRICS})
+    except Exception:
+        inputs.close()
+        inputs.unlink()
+        raise
+
+    with inputs, outputs:
+        spec = {**inputs.spec, **outputs.spec}
+        with ProcessPoolExecutor(
+            max_workers=min(n_workers, len(shards)),
+            initializer=_init_metrics_worker,
+            initargs=(spec,)
+        ) as pool:
+            futures = [pool.submit(_metrics_shard, window, start, end) for start, end in shards]
+            done = sum(f.result() for f in futures)
+
+        logger.info(f"병렬 지표 계산 완료: {done}행, 샤드 {len(shards)}개, 워커 {n_workers}개")
+        return {m: outputs.copy(m) for m in RISK_METRICS}
+
+
+# =============================================================================
+# 위험도 계산기
+# =============================================================================
+
+class RiskTierCalculator:
+    """
+    ETF 위험도 분류 계산기
+
+    전체 이력을 한 번에 계산하는 `run`과, 저장된 상태(ETF별 최근 WINDOW+1일 시세)를
+    이어 받아 새로 수집된 날짜만 계산하는 `update`를 제공합니다.
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULT_WINDOW,
+        risk_weights: Optional[Dict[str, float]] = None,
+        th_mdd: float = DEFAULT_TH_MDD,
+        n_workers: Optional[int] = 1
+    ):
+        """
+        계산기 초기화
+
+        Args:
+            window: 롤링 윈도우 크기 (영업일)
+            risk_weights: 위험도 지표별 가중치 (None이면 기본값)
+            th_mdd: B/P 분류 최대낙폭 임계값
+            n_workers: 지표 계산 워커 프로세스 수 (1이면 단일 프로세스, None/0이면 CPU 코어 수)
+        """
+        self.window = window
+        self.risk_weights = dict(risk_weights or DEFAULT_RISK_WEIGHTS)
+        self.th_mdd = th_mdd
+        self.n_workers = n_workers
+
+        unknown = set(self.risk_weights) - set(RISK_METRICS)
+        if unknown:
+            raise ValueError(f"알 수 없는 위험도 지표: {sorted(unknown)}")
+
+    # -------------------------------------------------------------------------
+    # 지표 계산
+    # -------------------------------------------------------------------------
+
+    def compute_metrics(self, prices: pd.DataFrame) -> pd.DataFrame:
+        """
+        수익률 및 롤링 위험도 지표 계산
+
+        n_workers가 2 이상이고 데이터가 충분히 크면 ETF 단위로 나눠 프로세스 풀에서
+        계산합니다. 병렬 계산이 실패하면 단일 프로세스로 다시 계산합니다.
+
+        Args:
+            prices: (srtnCd, basDt) 정렬된 시세 DataFrame
+
+        Returns:
+            지표 컬럼이 추가된 DataFrame (윈도우가 채워지지 않은 행은 NaN)
+        """
+        df = prices.copy()
+
+        # ETF 일간 수익률 / 기초지수 일간 수익률 (베타 계산용)
+        df['r'] = df.groupby('srtnCd')['clpr'].pct_change()
+        df['mkt_r'] = df.groupby('srtnCd')['bssIdxClpr'].pct_change(fill_method=None)
+
+        # 정렬된 종목코드 → 정수 그룹 ID (공유 메모리에 올릴 수 있는 형태)
+        codes, _ = pd.factorize(df['srtnCd'])
+        r = df['r'].to_numpy(dtype=float)
+        mkt_r = df['mkt_r'].to_numpy(dtype=float)
+
+        metrics = None
+        n_workers = resolve_workers(self.n_workers)
+        if n_workers > 1 and len(df) >= MIN_PARALLEL_ROWS:
+            try:
+                metrics = parallel_risk_metrics(codes, r, mkt_r, self.window, n_workers)
+            except Exception as e:
+                logger.warning(f"병렬 지표 계산 실패, 단일 프로세스로 계산합니다: {e}")
+
+        if metrics is None:
+            metrics = rolling_risk_metrics(codes, r, mkt_r, self.window)
+
+        for metric in RISK_METRICS:
+            df[metric] = metrics[metric]
+
+        return df
+
+    def classify(
+        self,
+        metrics: pd.DataFrame,
+        max_vals: Optional[Dict[str, float]] = None,
+        latest_only: bool = False
+    ) -> Tuple[pd.DataFrame, Dict[str, float]]:
+        """
+        Risk Score 계산 및 R/E, B/P, Risk Tier 분류
+
+        Args:
+            metrics: compute_metrics 결과
+            max_vals: 지표별 정규화 기준값 (None이면 입력 데이터의 최대 절대값)
+            latest_only: True면 각 ETF의 최신 날짜가 속한 기준일만 분류
+                         (해당 날짜의 전체 단면으로 등급화하므로 전체 분류 결과와 동일)
+
+        Returns:
+            (분류 결과 DataFrame, 사용한 정규화 기준값)
+        """
+        valid = metrics.dropna(subset=RISK_METRICS)
+
+        # 지표별 최대값으로 정규화 (0~1 스케일) - 기준값은 항상 전체 유효 행 기준
+        if max_vals is None:
+            max_vals = {m: float(valid[m].abs().max()) for m in RISK_METRICS}
+
+        if latest_only and not valid.empty:
+            needed_dates = valid.groupby('srtnCd')['basDt'].max().unique()
+            df = valid[valid['basDt'].isin(needed_dates)].copy()
+        else:
+            df = valid.copy()
+
+        # Risk Score 계산 (가중합)
+        df['Risk_Score'] = sum(
+            self.risk_weights.get(m, 0.0) * (df[m].abs() / max_vals[m]) for m in RISK_METRICS
+        )
+
+        # R/E 분류
+        df['risk_bin'] = np.where(df['Risk_Score'] <= TH_RISK_SCORE, 'R', 'E')
+
+        # Risk Tier: 날짜별로 Risk_Score를 5개 구간으로 분할
+        if not df.empty:
+            df['risk_tier'] = df.groupby('basDt')['Risk_Score']\
+                                .transform(lambda x: pd.qcut(x, 5, labels=False, duplicates='drop'))
+        else:
+            df['risk_tier'] = pd.Series(dtype=float)
+
+        # B/P 분류
+        df['strat_bin'] = np.where(df['max_dd'] <= self.th_mdd, 'B', 'P')
+
+        return df, max_vals
+
+    # -------------------------------------------------------------------------
+    # 전체 계산 / 증분 갱신
+    # -------------------------------------------------------------------------
+
+    def run(
+        self,
+        input_csv: str,
+        output_csv: Optional[str],
+        state_path: Optional[str] = None,
+        snapshot_path: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        전체 이력 계산 후 결과 저장
+
+        Args:
+            input_csv: 시세 데이터 CSV 경로
+            output_csv: 위험도 분류 이력 CSV 경로 (None이면 이력을 저장하지 않고
+                        최신 스냅샷에 필요한 날짜만 분류, .gz 확장자면 gzip 압축)
+            state_path: 증분 갱신용 상태 파일 경로 (None이면 저장하지 않음)
+            snapshot_path: ETF별 최신 위험등급 스냅샷 경로 (None이면 저장하지 않음)
+
+        Returns:
+            분류 결과 DataFrame
+        """
+        logger.info(f"위험도 전체 계산 시작: {input_csv}")
+        prices = load_prices(input_csv)
+        logger.info(f"데이터 로딩 완료: {len(prices)}행, {prices['srtnCd'].nunique()}개 ETF")
+
+        result, max_vals = self.classify(
+            self.compute_metrics(prices), latest_only=output_csv is None
+        )
+
+        history_size = None
+        if output_csv:
+            atomic_write_csv(result[OUTPUT_COLUMNS], output_csv)
+            history_size = os.path.getsize(output_csv)
+            logger.info(f"위험도 분류 결과 저장: {output_csv} ({len(result)}행)")
+
+        if snapshot_path:
+            save_snapshot(latest_snapshot(result), snapshot_path)
+
+        if state_path:
+            self.save_state(state_path, prices, max_vals, history_size)
+
+        return result
+
+    def update(
+        self,
+        input_csv: str,
+        output_csv: Optional[str],
+        state_path: str,
+        snapshot_path: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        증분 갱신: 상태 이후에 수집된 날짜만 계산하여 결과 파일에 추가
+
+        상태 파일(또는 기존 이력/스냅샷 파일)이 없으면 전체 계산(run)으로 대체합니다.
+        정규화 기준값은 저장된 값과 새 데이터의 최대값 중 큰 값을 사용하며,
+        이미 기록된 과거 행은 다시 계산하지 않습니다.
+
+        Args:
+            input_csv: 새로 수집된 시세 데이터 CSV 경로 (전체 이력 파일도 가능)
+            output_csv: 위험도 분류 이력 CSV 경로 (새 행을 추가, None이면 이력 미저장)
+            state_path: 상태 파일 경로
+            snapshot_path: ETF별 최신 위험등급 스냅샷 경로 (새 결과로 갱신)
+
+        Returns:
+            새로 추가된 분류 결과 DataFrame
+        """
+        state = self.load_state(state_path)
+        missing_output = (
+            (output_csv and not os.path.exists(output_csv)) or
+            (snapshot_path and not os.path.exists(snapshot_path))
+        )
+        if state is None or missing_output:
+            logger.info("증분 상태가 없어 전체 계산을 수행합니다.")
+            return self.run(input_csv, output_csv, state_path, snapshot_path)
+
+        tail, max_vals, last_date = state
+        incoming = load_prices(input_csv)
+
+        # 마지막 처리일 이후 데이터만 사용 (이전 날짜의 뒤늦은 데이터는 전체 재계산 필요)
+        late = incoming['basDt'] <= last_date
+        self._warn_unseen_rows(incoming[late], tail, last_date)
+        new_rows = incoming[~late]
+        if new_rows.empty:
+            logger.info(f"새로운 시세가 없습니다 (마지막 처리일: {last_date.date()})")
+            return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+        combined = prepare_prices(pd.concat([tail, new_rows], ignore_index=True))
+        metrics = self.compute_metrics(combined)
+        metrics = metrics[metrics['basDt'] > last_date]
+
+        # 정규화 기준값 갱신 (기존 기준값보다 작아지지 않음)
+        valid = metrics.dropna(subset=RISK_METRICS)
+        updated_max = dict(max_vals)
+        if not valid.empty:
+            for m in RISK_METRICS:
+                updated_max[m] = max(float(max_vals.get(m, 0.0)), float(valid[m].abs().max()))
+        result, _ = self.classify(metrics, updated_max, latest_only=output_csv is None)
+
+        # 이력 파일에 원자적으로 추가 (이전 실행이 상태 저장 전에 중단되었으면 중복 행 제거)
+        history_size = None
+        if output_csv:
+            history_size = append_history(
+                result[OUTPUT_COLUMNS], output_csv, last_date, self._history_size(state_path)
+            )
+        logger.info(
+            f"증분 갱신 완료: {new_rows['basDt'].nunique()}일, {len(result)}행 분류"
+            + (f" → {output_csv}" if output_csv else "")
+        )
+
+        # 스냅샷 갱신 (새 결과가 있는 ETF만 교체)
+        if snapshot_path:
+            snapshot = load_snapshot(snapshot_path)
+            fresh = latest_snapshot(result)
+            snapshot = snapshot[~snapshot['srtnCd'].isin(fresh['srtnCd'])]
+            save_snapshot(pd.concat([snapshot, fresh], ignore_index=True), snapshot_path)
+
+        self.save_state(state_path, combined, updated_max, history_size)
+        return result
+
+    @staticmethod
+    def _warn_unseen_rows(late: pd.DataFrame, tail: pd.DataFrame, last_date: pd.Timestamp):
+        """상태 구간 안에 있지만 반영되지 않은 과거 시세가 있으면 경고"""
+        if late.empty:
+            return
+        tail_start = late['srtnCd'].map(tail.groupby('srtnCd')['basDt'].min())
+        recent = late.loc[late['basDt'] >= tail_start, ['srtnCd', 'basDt']]
+        merged = recent.merge(tail[['srtnCd', 'basDt']], how='left', indicator=True)
+        unseen = int((merged['_merge'] == 'left_only').sum())
+        if unseen:
+            logger.warning(
+                f"마지막 처리일({last_date.date()}) 이전의 미반영 시세 {unseen}행은 무시됩니다. "
+                f"반영하려면 전체 계산을 다시 실행하세요."
+            )
+
+    # -------------------------------------------------------------------------
+    # 상태 관리
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _meta_path(state_path: str) -> str:
+        """상태 메타데이터(JSON) 경로"""
+        return os.path.splitext(state_path)[0] + '.json'
+
+    def save_state(
+        self,
+        state_path: str,
+        prices: pd.DataFrame,
+        max_vals: Dict[str, float],
+        history_size: Optional[int] = None
+    ):
+        """
+        증분 갱신용 상태 저장
+
+        - 시세: ETF별 최근 WINDOW+1일 (수익률 WINDOW개 계산에 필요)
+        - 메타데이터: 윈도우 크기, 정규화 기준값, 마지막 처리일, 이력 파일 크기
+
+        Args:
+            state_path: 상태 CSV 경로
+            prices: 정렬된 시세 DataFrame
+            max_vals: 지표별 정규화 기준값
+            history_size: 이 상태에 맞는 이력 파일 크기 (bytes, 이력을 저장하지 않으면 None)
+        """
+        tail = prices.groupby('srtnCd', sort=False).tail(self.window + 1)
+        atomic_write_csv(tail[PRICE_COLUMNS], state_path)
+
+        meta = {
+            'window': self.window,
+            'max_vals': max_vals,
+            'last_date': prices['basDt'].max().strftime('%Y-%m-%d'),
+            'history_size': history_size,
+        }
+        atomic_write_json(meta, self._meta_path(state_path))
+
+        logger.info(f"증분 상태 저장: {state_path} ({len(tail)}행)")
+
+    def load_state(self, state_path: str) -> Optional[Tuple[pd.DataFrame, Dict[str, float], pd.Timestamp]]:
+        """
+        증분 갱신용 상태 로드
+
+        Args:
+            state_path: 상태 CSV 경로
+
+        Returns:
+            (시세 tail, 정규화 기준값, 마지막 처리일) 또는 None (상태 없음/윈도우 불일치)
+        """
+        meta_path = self._meta_path(state_path)
+        if not (os.path.exists(state_path) and os.path.exists(meta_path)):
+            return None
+
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+
+        if meta.get('window') != self.window:
+            logger.warning(
+                f"상태 파일의 윈도우({meta.get('window')})가 현재 설정({self.window})과 달라 무시합니다."
+            )
+            return None
+
+        tail = load_prices(state_path)
+        return tail, meta['max_vals'], pd.Timestamp(meta['last_date'])
+
+    def _history_size(self, state_path: str) -> Optional[int]:
+        """마지막 상태 저장 시점의 이력 파일 크기 (기록이 없으면 None)"""
+        with open(self._meta_path(state_path), encoding='utf-8') as f:
+            return json.load(f).get('history_size')
+
+# =============================================================================
+# 최신 위험등급 스냅샷
+# =============================================================================
+
+# 스냅샷 컬럼 (ETF당 1행)
+SNAPSHOT_COLUMNS = ['srtnCd', 'itmsNm', 'risk_tier', 'Risk_Score', 'risk_bin', 'strat_bin', 'basDt']
+
+
+def normalize_code(code) -> str:
+    """
+    종목코드 정규화 (숫자만으로 된 코드는 6자리 0 채움)
+
+    CSV를 dtype 지정 없이 읽으면 '069500'이 69500으로 읽히므로 양쪽을 같은 형태로 맞춥니다.
+    """
+    text = str(code).strip()
+    if text.endswith('.0'):
+        text = text[:-2]
+    return text.zfill(6) if text.isdigit() else text
+
+
+def latest_snapshot(result: pd.DataFrame) -> pd.DataFrame:
+    """
+    분류 결과에서 ETF별 최신 행만 추출
+
+    Args:
+        result: classify 결과 (또는 위험도 분류 이력)
+
+    Returns:
+        ETF당 1행의 스냅샷 DataFrame
+    """
+    if result.empty:
+        return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+    latest = result.loc[result.groupby('srtnCd')['basDt'].idxmax()]
+    return latest[SNAPSHOT_COLUMNS].reset_index(drop=True)
+
+
+def append_history(
+    rows: pd.DataFrame,
+    path: str,
+    last_date: pd.Timestamp,
+    expected_size: Optional[int] = None
+) -> int:
+    """
+    위험도 분류 이력 파일에 새 행을 원자적으로 추가
+
+    기존 파일을 임시 파일로 복사해 새 행을 덧붙인 뒤 os.replace로 교체하므로, 도중에 중단되어도
+    이력 파일은 이전 내용 그대로 남습니다 (gzip 멤버가 잘린 채 남지 않음).
+    파일 크기가 마지막 상태 저장 시점(expected_size)과 다르면 이전 실행이 이력 추가 후 상태 저장 전에
+    중단된 것이므로, 마지막 처리일 이후의 기존 행을 제거하고 다시 써서 같은 날짜가 중복되지 않게 합니다.
+
+    Args:
+        rows: 추가할 분류 결과 (OUTPUT_COLUMNS)
+        path: 위험도 분류 이력 CSV 경로 (.gz 확장자면 gzip 압축)
+        last_date: 상태의 마지막 처리일 (이 날짜 이후 행만 추가)
+        expected_size: 마지막 상태 저장 시점의 이력 파일 크기 (None이면 기록 없음 → 다시 쓰기)
+
+    Returns:
+        갱신된 이력 파일 크기 (bytes)
+    """
+    rows = rows[rows['basDt'] > last_date]
+
+    if expected_size is not None and os.path.getsize(path) == expected_size:
+        # 이력이 상태와 일치: 기존 내용 복사 + 추가 (BOM 중복 방지를 위해 utf-8로 기록)
+        def write(tmp: str):
+            shutil.copyfile(path, tmp)
+            rows.to_csv(tmp, mode='a', header=False, index=False, encoding='utf-8')
+    else:
+        history = pd.read_csv(path, dtype={'srtnCd': str}, encoding='utf-8-sig', low_memory=False)
+        history['basDt'] = parse_basdt(history['basDt'])
+        stale = history['basDt'] > last_date
+        if stale.any():
+            logger.warning(
+                f"마지막 처리일({last_date.date()}) 이후의 이력 {int(stale.sum())}행은 "
+                f"이전 실행이 중단되며 남은 행이므로 다시 계산한 결과로 교체합니다."
+            )
+        merged = pd.concat([history.loc[~stale, OUTPUT_COLUMNS], rows], ignore_index=True)
+
+        def write(tmp: str):
+            merged.to_csv(tmp, index=False, encoding='utf-8-sig')
+
+    atomic_write(path, write)
+    logger.info(f"위험도 분류 이력 추가: {path} ({len(rows)}행)")
+    return os.path.getsize(path)
+
+
+def save_snapshot(snapshot: pd.DataFrame, path: str):
+    """스냅샷 저장"""
+    snapshot = snapshot.sort_values('srtnCd')
+    atomic_write_csv(snapshot, path)
+    logger.info(f"최신 위험등급 스냅샷 저장: {path} ({len(snapshot)}개 ETF)")
+
+
+def load_snapshot(path: str) -> pd.DataFrame:
+    """스냅샷 로드"""
+    snapshot = pd.read_csv(path, dtype={'srtnCd': str}, encoding='utf-8-sig')
+    snapshot['basDt'] = parse_basdt(snapshot['basDt'])
+    return snapshot
+
+
+class RiskTierIndex:
+    """
+    ETF별 최신 위험등급 조회 인덱스 (종목코드 → 스냅샷 레코드 딕셔너리)
+
+    위험도 분류 이력 전체를 ETF마다 다시 스캔하는 대신 한 번 만든 딕셔너리로 O(1) 조회합니다.
+    """
+
+    def __init__(self, snapshot: pd.DataFrame):
+        """
+        인덱스 초기화
+
+        Args:
+            snapshot: latest_snapshot 형식의 DataFrame
+        """
+        self._records: Dict[str, Dict] = {
+            normalize_code(record['srtnCd']): record
+            for record in snapshot.to_dict('records')
+        }
+
+    @classmethod
+    def from_file(cls, path: str) -> 'RiskTierIndex':
+        """스냅샷 파일에서 인덱스 생성"""
+        return cls(load_snapshot(path))
+
+    @classmethod
+    def from_history(cls, history: pd.DataFrame) -> 'RiskTierIndex':
+        """위험도 분류 이력에서 인덱스 생성 (스냅샷 파일이 없을 때)"""
+        history = history.copy()
+        history['srtnCd'] = history['srtnCd'].map(normalize_code)
+        history['basDt'] = parse_basdt(history['basDt'])
+        return cls(latest_snapshot(history))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, etf_code) -> bool:
+        return normalize_code(etf_code) in self._records
+
+    def get(self, etf_code) -> Optional[Dict]:
+        """
+        ETF 최신 스냅샷 레코드 조회
+
+        Args:
+            etf_code: ETF 종목코드
+
+        Returns:
+            {'srtnCd', 'itmsNm', 'risk_tier', 'Risk_Score', 'risk_bin', 'strat_bin', 'basDt'} 또는 None
+        """
+        return self._records.get(normalize_code(etf_code))
+
+    def get_tier(self, etf_code) -> int:
+        """
+        ETF 최신 risk_tier 조회
+
+        Returns:
+            risk_tier (-1: 측정불가, 0~4: 위험등급)
+        """
+        record = self.get(etf_code)
+        if record is None:
+            return -1
+
+        risk_tier = record.get('risk_tier')
+        if risk_tier is None or pd.isna(risk_tier) or risk_tier < 0:
+            return -1
+        return int(risk_tier)
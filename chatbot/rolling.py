@@ -0,0 +1,246 @@
+"""
+ETF 그룹별 롤링 통계 모듈
+- (종목코드, 날짜) 순으로 정렬된 시세 데이터를 대상으로 롤링 지표를 한 번에 계산
+- groupby().apply() 없이 전체 ETF를 벡터 연산으로 처리
+- 누적합(cumulative sum) + 그룹 경계 마스크 기반 평균/분산/공분산
+- 순서통계량(order statistics) 윈도우 기반 분위수, 최대낙폭
+
+주요 기능:
+1. 정렬된 1차원 배열을 (ETF × 거래일) 패널로 배치
+2. ETF(행)별 누적합 차분으로 롤링 합계 계산 (윈도우가 ETF 경계를 넘지 않음)
+3. 결측치가 포함된 윈도우는 NaN 처리 (pandas min_periods=window 와 동일)
+4. 슬라이딩 윈도우 뷰 + np.partition 으로 롤링 분위수 계산
+"""
+
+import numpy as np
+
+# 윈도우 단위 연산(분위수, 최대낙폭) 시 한 번에 처리할 최대 원소 수 (메모리 상한)
+_CHUNK_ELEMENTS = 4_000_000
+
+
+class GroupedRolling:
+    """
+    정렬된 (종목코드, 날짜) 레이아웃에 대한 그룹별 롤링 계산기
+
+    모든 지표는 pandas의 `rolling(window, min_periods=window)`와 같은 의미를 가집니다.
+    즉, 윈도우 안의 값이 모두 유효할 때만 결과를 계산하고 나머지는 NaN을 반환합니다.
+    """
+
+    def __init__(self, codes: np.ndarray, window: int):
+        """
+        그룹 레이아웃 초기화
+
+        Args:
+            codes: 종목코드 배열 (같은 종목이 연속으로 나열되어 있어야 함)
+            window: 롤링 윈도우 크기
+        """
+        if window < 1:
+            raise ValueError(f"window는 1 이상이어야 합니다: {window}")
+
+        codes = np.asarray(codes)
+        n = len(codes)
+
+        if n:
+            starts = np.r_[0, np.flatnonzero(codes[1:] != codes[:-1]) + 1]
+        else:
+            starts = np.zeros(0, dtype=np.int64)
+        lengths = np.diff(np.r_[starts, n])
+
+        self.window = window
+        self.size = n
+        self.starts = starts
+        self.lengths = lengths
+
+        # 각 원소의 패널 좌표 (행: ETF, 열: ETF 내 순번)
+        self.row = np.repeat(np.arange(len(starts)), lengths)
+        self.col = np.arange(n) - np.repeat(starts, lengths)
+        self.shape = (len(starts), int(lengths.max()) if n else 0)
+
+    # =========================================================================
+    # 패널 변환
+    # =========================================================================
+
+    def to_panel(self, values: np.ndarray) -> np.ndarray:
+        """1차원 값 배열을 (ETF × 순번) 패널로 변환 (빈 칸은 NaN)"""
+        panel = np.full(self.shape, np.nan)
+        panel[self.row, self.col] = np.asarray(values, dtype=float)
+        return panel
+
+    def from_panel(self, panel: np.ndarray) -> np.ndarray:
+        """패널을 원래의 1차원 정렬 순서로 되돌림"""
+        return panel[self.row, self.col]
+
+    def _window_sums(self, panel: np.ndarray) -> np.ndarray:
+        """
+        ETF(행)별 누적합 차분으로 롤링 합계 계산
+
+        윈도우 끝 위치가 window-1 보다 작은 칸(그룹 경계를 넘는 윈도우)은 NaN입니다.
+        """
+        rows, cols = panel.shape
+        out = np.full(panel.shape, np.nan)
+        if cols < self.window:
+            return out
+
+        cum = np.zeros((rows, cols + 1))
+        np.cumsum(np.nan_to_num(panel, nan=0.0), axis=1, out=cum[:, 1:])
+        out[:, self.window - 1:] = cum[:, self.window:] - cum[:, :-self.window]
+        return out
+
+    def _full_window_mask(self, *panels: np.ndarray) -> np.ndarray:
+        """윈도우 내 값이 모두 유효한 위치 마스크"""
+        valid = np.ones(self.shape, dtype=bool)
+        for panel in panels:
+            valid &= ~np.isnan(panel)
+        counts = self._window_sums(valid.astype(float))
+        return counts == self.window
+
+    @staticmethod
+    def _center(panel: np.ndarray) -> np.ndarray:
+        """
+        행별 첫 유효값을 빼서 누적합의 수치 오차를 줄임 (분산/공분산은 이동 불변)
+
+        행 평균 대신 첫 유효값을 쓰는 이유: 패널 폭(가장 긴 ETF 길이)에 따라
+        합계의 덧셈 순서가 달라지지 않으므로, ETF를 어떤 묶음으로 나눠 계산해도
+        (chatbot.parallel 샤드) 결과가 비트 단위로 같습니다.
+        """
+        if panel.size == 0 or panel.shape[1] == 0:
+            return panel
+        valid = ~np.isnan(panel)
+        first = valid.argmax(axis=1)
+        shift = panel[np.arange(panel.shape[0]), first]
+        shift = np.where(valid.any(axis=1), shift, 0.0)
+        return panel - shift[:, None]
+
+    # =========================================================================
+    # 누적합 기반 지표
+    # =========================================================================
+
+    def mean(self, values: np.ndarray) -> np.ndarray:
+        """
+        롤링 평균
+
+        Args:
+            values: 정렬된 값 배열
+
+        Returns:
+            롤링 평균 배열 (원래 순서)
+        """
+        panel = self.to_panel(values)
+        valid = self._full_window_mask(panel)
+        result = np.where(valid, self._window_sums(panel) / self.window, np.nan)
+        return self.from_panel(result)
+
+    def cov(self, x: np.ndarray, y: np.ndarray, ddof: int = 1) -> np.ndarray:
+        """
+        롤링 공분산
+
+        Args:
+            x, y: 정렬된 값 배열 (같은 길이)
+            ddof: 자유도 보정 (기본 1, 표본 공분산)
+
+        Returns:
+            롤링 공분산 배열 (원래 순서)
+        """
+        px = self.to_panel(x)
+        py = self.to_panel(y)
+        valid = self._full_window_mask(px, py)
+
+        # 두 값이 모두 유효한 위치만 사용
+        pair = ~(np.isnan(px) | np.isnan(py))
+        px = self._center(np.where(pair, px, np.nan))
+        py = self._center(np.where(pair, py, np.nan))
+
+        sx = self._window_sums(px)
+        sy = self._window_sums(py)
+        sxy = self._window_sums(px * py)
+
+        n = self.window
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = (sxy - sx * sy / n) / (n - ddof)
+        return self.from_panel(np.where(valid, result, np.nan))
+
+    def var(self, values: np.ndarray, ddof: int = 1) -> np.ndarray:
+        """롤링 분산 (음수 반올림 오차는 0으로 보정)"""
+        return np.maximum(self.cov(values, values, ddof=ddof), 0.0)
+
+    def std(self, values: np.ndarray, ddof: int = 1) -> np.ndarray:
+        """롤링 표준편차"""
+        return np.sqrt(self.var(values, ddof=ddof))
+
+    # =========================================================================
+    # 순서통계량 윈도우 기반 지표
+    # =========================================================================
+
+    def _iter_windows(self, panel: np.ndarray):
+        """
+        행 묶음 단위로 슬라이딩 윈도우 뷰 생성
+
+        Yields:
+            (행 슬라이스, (행 수 × 윈도우 수 × window) 뷰)
+        """
+        rows, cols = panel.shape
+        if cols < self.window:
+            return
+
+        n_windows = cols - self.window + 1
+        step = max(1, _CHUNK_ELEMENTS // max(1, n_windows * self.window))
+        for start in range(0, rows, step):
+            rows_slice = slice(start, min(rows, start + step))
+            windows = np.lib.stride_tricks.sliding_window_view(
+                panel[rows_slice], self.window, axis=1
+            )
+            yield rows_slice, windows
+
+    def quantile(self, values: np.ndarray, q: float) -> np.ndarray:
+        """
+        롤링 분위수 (선형 보간, pandas rolling().quantile() 과 동일)
+
+        Args:
+            values: 정렬된 값 배열
+            q: 분위수 (0~1)
+
+        Returns:
+            롤링 분위수 배열 (원래 순서)
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"q는 0~1 사이여야 합니다: {q}")
+
+        panel = self.to_panel(values)
+        valid = self._full_window_mask(panel)
+
+        pos = q * (self.window - 1)
+        lo = int(np.floor(pos))
+        hi = int(np.ceil(pos))
+        frac = pos - lo
+
+        result = np.full(self.shape, np.nan)
+        for rows_slice, windows in self._iter_windows(panel):
+            part = np.partition(windows, sorted({lo, hi}), axis=-1)
+            low_vals = part[..., lo]
+            result[rows_slice, self.window - 1:] = low_vals + frac * (part[..., hi] - low_vals)
+
+        return self.from_panel(np.where(valid, result, np.nan))
+
+    def max_drawdown(self, returns: np.ndarray) -> np.ndarray:
+        """
+        롤링 최대낙폭 (윈도우 내 누적수익률 기준, 0~1)
+
+        Args:
+            returns: 정렬된 일간 수익률 배열
+
+        Returns:
+            롤링 최대낙폭 배열 (원래 순서)
+        """
+        panel = self.to_panel(returns)
+        valid = self._full_window_mask(panel)
+
+        result = np.full(self.shape, np.nan)
+        for rows_slice, windows in self._iter_windows(panel):
+            cum = np.cumprod(1 + windows, axis=-1)
+            running_max = np.maximum.accumulate(cum, axis=-1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                drawdown = (running_max - cum) / running_max
+            result[rows_slice, self.window - 1:] = drawdown.max(axis=-1)
+
+        return self.from_panel(np.where(valid, result, np.nan))
+
@@ -0,0 +1,388 @@
+"""
+ETF 조건 검색(스크리닝) 모듈
+- "총보수 0.1% 이하, 자산규모 1000억 이상, 레버리지 제외 반도체 ETF" 같은 조건을 캐시 위에서 처리
+- 수치 컬럼(총보수, 자산규모, 거래량, 위험등급)은 값 기준으로 한 번 정렬해 두고
+  범위 조건을 이진 탐색(searchsorted)으로 위치 구간으로 변환
+- 값 목록 컬럼(운용사, 변동성)과 상품 특성(레버리지/인버스/합성/액티브)은 값별 비트맵(불리언 배열)을 미리 계산
+- 조건별 비트맵을 AND로 합친 마스크를 순위 계산 전에 카테고리 마스크와 함께 적용
+
+조건 형식 (JSON으로 저장/전달 가능한 딕셔너리):
+    {
+        '총보수': {'<=': 0.1},           # 범위: '<', '<=', '>', '>=' (%)
+        '자산규모': {'>=': 100000},       # 백만원 단위 (1000억 = 100000)
+        '거래량': {'>=': 10000},          # 평균 거래량 (주)
+        'risk_tier': {'<=': 2},           # 위험등급 (측정불가는 범위 조건에서 제외)
+        '변동성': ['매우낮음', '낮음'],    # 값 목록: 하나라도 일치
+        '운용사': ['미래에셋자산운용'],    # 값 목록: 부분 일치 (입력의 약칭/브랜드는 공식 이름으로 변환)
+        'leveraged': False                # 상품 특성: False = 제외, True = 해당 상품만
+    }
+
+주요 기능:
+1. ETFScreener.mask: 조건 → (캐시 행 수,) 불리언 마스크
+2. parse_screen_query: 사용자 입력에서 조건 추출 (나머지 문장은 카테고리 키워드 추출에 사용)
+3. describe_conditions: 조건을 사람이 읽는 문장으로 (추천 설명 프롬프트용)
+"""
+
+import re
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import Config
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 범위 조건 필드 (캐시 수치 컬럼)
+RANGE_FIELDS = ['총보수', '자산규모', '거래량', 'risk_tier']
+
+# 값 목록 조건 필드 (캐시 문자열 컬럼)
+MEMBER_FIELDS = ['운용사', '변동성']
+
+# 부분 일치로 비교하는 값 목록 필드 (나머지는 정확히 일치, 예: '낮음' ≠ '매우낮음')
+PARTIAL_MATCH_FIELDS = {'운용사'}
+
+# 범위 연산자 → (searchsorted side, 하한 여부)
+RANGE_OPERATORS = {
+    '>=': ('left', True),
+    '>': ('right', True),
+    '<=': ('right', False),
+    '<': ('left', False)
+}
+
+# 변동성 등급 (낮은 순서)
+VOLATILITY_GRADES = ['매우낮음', '낮음', '보통', '높음', '매우높음']
+
+
+def _numeric_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """수치 컬럼 (천 단위 쉼표 제거, 변환 불가 값은 NaN)"""
+    values = df[column]
+    if values.dtype == object:
+        values = values.astype(str).str.replace(',', '').str.strip()
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+
+
+class ETFScreener:
+    """
+    캐시 조건 검색 인덱스
+
+    캐시 행 위치 기준으로 동작하므로 팩터화된 캐시(ETF별 1행)와 기존 형식 캐시
+    (레벨 × 투자자 유형 1행) 모두에 사용할 수 있습니다. 캐시에 없는 컬럼의 조건은
+    경고 후 무시합니다 (운용사/복제방법은 캐시 형식 버전 3부터 저장). 값이 모두 비어 있는
+    수치 컬럼도 같은 방식으로 처리합니다 (자산규모는 캐시 형식 버전 4부터 저장).
+    """
+
+    # 조건별 마스크 보관 개수
+    MAX_MASK_CACHE = 256
+
+    def __init__(self, cache_df: pd.DataFrame, config: Optional[Config] = None):
+        """
+        인덱스 초기화
+
+        Args:
+            cache_df: 캐시 DataFrame
+            config: 설정 (None이면 기본 Config)
+        """
+        self.config = config or Config()
+        self.size = len(cache_df)
+
+        # 수치 컬럼: 값 오름차순 위치와 정렬된 값 (NaN 제외)
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for column in RANGE_FIELDS:
+            if column not in cache_df.columns:
+                continue
+            values = _numeric_column(cache_df, column)
+            if column == 'risk_tier':
+                values[values < 0] = np.nan  # 측정불가(-1)
+            order = np.argsort(values, kind='stable')
+            order = order[~np.isnan(values[order])]
+            self._sorted[column] = (order, values[order])
+
+        # 값 목록 컬럼: 고유값별 비트맵
+        self._bitmaps: Dict[str, Dict[str, np.ndarray]] = {}
+        for column in MEMBER_FIELDS:
+            if column not in cache_df.columns:
+                continue
+            codes, uniques = pd.factorize(cache_df[column].astype(str).str.strip())
+            self._bitmaps[column] = {str(value): codes == i for i, value in enumerate(uniques)}
+
+        # 상품 특성: ETF명 + 복제방법 키워드
+        text = pd.Series([''] * self.size, index=cache_df.index)
+        for column in ('ETF명', '복제방법'):
+            if column in cache_df.columns:
+                text = text + ' ' + cache_df[column].fillna('').astype(str)
+        text = text.str.upper()
+        self._flags: Dict[str, np.ndarray] = {}
+        for flag, keywords in self.config.SCREEN_FLAG_KEYWORDS.items():
+            mask = np.zeros(self.size, dtype=bool)
+            for keyword in keywords:
+                mask |= text.str.contains(keyword.upper(), regex=False).to_numpy(dtype=bool)
+            self._flags[flag] = mask
+
+        self._mask_cache: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def range_mask(self, column: str, operator: str, value: float) -> np.ndarray:
+        """
+        범위 조건 마스크 (정렬된 값에서 이진 탐색)
+
+        Args:
+            column: 수치 컬럼
+            operator: '<', '<=', '>', '>='
+            value: 기준값
+
+        Returns:
+            (캐시 행 수,) 불리언 배열 (값이 없는 행은 False)
+        """
+        if operator not in RANGE_OPERATORS:
+            raise ValueError(f"지원하지 않는 범위 연산자입니다: {operator} (지원: {', '.join(RANGE_OPERATORS)})")
+        order, values = self._sorted[column]
+        side, lower = RANGE_OPERATORS[operator]
+        cut = int(np.searchsorted(values, float(value), side=side))
+        mask = np.zeros(self.size, dtype=bool)
+        mask[order[cut:] if lower else order[:cut]] = True
+        return mask
+
+    def member_mask(self, column: str, values: List[str]) -> np.ndarray:
+        """
+        값 목록 조건 마스크 (고유값 비트맵 OR, PARTIAL_MATCH_FIELDS는 부분 일치)
+
+        Args:
+            column: 값 목록 컬럼
+            values: 허용 값 목록 (예: ['미래에셋'] → '미래에셋자산운용' 포함)
+
+        Returns:
+            (캐시 행 수,) 불리언 배열
+        """
+        mask = np.zeros(self.size, dtype=bool)
+        targets = [str(value).replace(' ', '') for value in values if str(value).strip()]
+        partial = column in PARTIAL_MATCH_FIELDS
+        for value, bitmap in self._bitmaps[column].items():
+            value = value.replace(' ', '')
+            if any(target in value if partial else target == value for target in targets):
+                mask |= bitmap
+        return mask
+
+    def mask(self, conditions: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        조건 전체 마스크 (조건별 비트맵 AND)
+
+        Args:
+            conditions: 조건 딕셔너리 (모듈 설명 참고)
+
+        Returns:
+            (캐시 행 수,) 불리언 배열 또는 None (적용할 조건 없음)
+
+        Raises:
+            ValueError: 알 수 없는 필드/연산자
+        """
+        if not conditions:
+            return None
+
+        key = repr(sorted(conditions.items(), key=lambda item: item[0]))
+        cached = self._mask_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = None
+        for field, condition in conditions.items():
+            if field in RANGE_FIELDS:
+                if field not in self._sorted:
+                    logger.warning(f"캐시에 '{field}' 컬럼이 없어 조건을 무시합니다.")
+                    continue
+                if len(self._sorted[field][0]) == 0:
+                    logger.warning(f"캐시의 '{field}' 값이 모두 비어 있어 조건을 무시합니다. (캐시를 다시 생성하세요)")
+                    continue
+                for operator, value in dict(condition).items():
+                    part = self.range_mask(field, operator, value)
+                    result = part if result is None else result & part
+            elif field in MEMBER_FIELDS:
+                if field not in self._bitmaps:
+                    logger.warning(f"캐시에 '{field}' 컬럼이 없어 조건을 무시합니다. (캐시를 다시 생성하세요)")
+                    continue
+                part = self.member_mask(field, [condition] if isinstance(condition, str) else list(condition))
+                result = part if result is None else result & part
+            elif field in self._flags:
+                part = self._flags[field] if condition else ~self._flags[field]
+                result = part if result is None else result & part
+            else:
+                raise ValueError(f"알 수 없는 검색 조건입니다: {field}")
+
+        if result is not None:
+            if len(self._mask_cache) >= self.MAX_MASK_CACHE:
+                self._mask_cache.pop(next(iter(self._mask_cache)))
+            self._mask_cache[key] = result
+        return result
+
+
+# =============================================================================
+# 사용자 입력 해석
+# =============================================================================
+
+# 범위 조건 필드 별칭 (긴 별칭 우선)
+_RANGE_ALIASES = {
+    '총보수': '총보수', '보수율': '총보수', '보수': '총보수', '수수료': '총보수',
+    '자산규모': '자산규모', '순자산총액': '자산규모', '순자산': '자산규모', 'AUM': '자산규모', '규모': '자산규모',
+    '거래량': '거래량',
+    '위험등급': 'risk_tier', '위험도': 'risk_tier'
+}
+
+# 금액/수량 단위 → 캐시 단위 배수 (자산규모는 백만원, 거래량은 주)
+_UNIT_SCALES = {
+    '자산규모': {'조': 1_000_000, '억': 100, '백만': 1, '': 1},
+    '거래량': {'만': 10_000, '천': 1_000, '주': 1, '': 1},
+    '총보수': {'%': 1, '': 1},
+    'risk_tier': {'등급': 1, '': 1}
+}
+
+_RANGE_WORDS = {'이하': '<=', '미만': '<', '이상': '>=', '초과': '>'}
+
+_RANGE_PATTERN = re.compile(
+    r'(' + '|'.join(sorted(map(re.escape, _RANGE_ALIASES), key=len, reverse=True)) + r')'
+    r'\s*(?:[은는이가]\s*)?(\d[\d,]*(?:\.\d+)?)\s*(조|억|백만|만|천|%|주|등급)?\s*(?:원|주)?\s*'
+    r'(이하|미만|이상|초과)'
+)
+
+_VOLATILITY_PATTERN = re.compile(
+    r'변동성\s*(?:[은는이가]\s*)?(매우\s*낮음|낮음|보통|높음|매우\s*높음)\s*(이하|이상)?'
+)
+
+_MANAGER_SUFFIX = r'(?:투자신탁운용|투자자산운용|자산운용|운용|에셋)'
+
+
+def _manager_names() -> Dict[str, str]:
+    """운용사 이름/별칭(대문자) → 공식 이름 (공식 이름, 접미사를 뺀 짧은 이름, 별칭, 브랜드)"""
+    names: Dict[str, str] = {}
+    for manager in Config.SCREEN_MANAGERS:
+        names[manager.upper()] = manager
+        names.setdefault(re.sub(_MANAGER_SUFFIX + '$', '', manager).upper(), manager)
+    for alias, manager in {**Config.SCREEN_MANAGER_ALIASES, **Config.SCREEN_MANAGER_BRANDS}.items():
+        names.setdefault(alias.upper(), manager)
+    return names
+
+
+_MANAGER_NAMES = _manager_names()
+_MANAGER_BRANDS = {brand.upper(): manager for brand, manager in Config.SCREEN_MANAGER_BRANDS.items()}
+
+
+def _name_alternation(names) -> str:
+    """이름 목록 → 정규식 선택 그룹 (긴 이름 우선)"""
+    return '(' + '|'.join(sorted(map(re.escape, names), key=len, reverse=True)) + ')'
+
+
+# "운용사 KB", "KB자산운용", "한국투자신탁운용의" 같은 운용사 표현 (알려진 이름만, 긴 이름 우선)
+_MANAGER_PATTERN = re.compile(
+    r'운용사\s*[은는이가:]?\s*' + _name_alternation(_MANAGER_NAMES) + _MANAGER_SUFFIX + r'?(?:의|에서|만|것)?(?=[\s,]|$)'
+    r'|(?<![가-힣A-Za-z0-9])' + _name_alternation(_MANAGER_NAMES) + _MANAGER_SUFFIX + r'(?:의|에서|만|것)?(?=[\s,]|$)'
+    r'|(?<![가-힣A-Za-z0-9])' + _name_alternation(Config.SCREEN_MANAGER_BRANDS) + r'(?![A-Za-z0-9])',
+    re.IGNORECASE
+)
+
+_FLAG_ALIASES = {
+    '레버리지': 'leveraged', '인버스': 'inverse', '곱버스': 'inverse',
+    '합성': 'synthetic', '액티브': 'active'
+}
+
+_FLAG_PATTERN = re.compile(
+    r'(' + '|'.join(_FLAG_ALIASES) + r')\s*(?:ETF\s*)?(?:(제외|빼고|말고|없는|아닌)|(만|전용))'
+)
+
+
+def parse_screen_query(text: str) -> Tuple[Dict[str, Any], str]:
+    """
+    사용자 입력에서 조건 검색 조건 추출
+
+    예: "총보수 0.1% 이하, 자산규모 1000억 이상, 레버리지 제외 반도체 ETF"
+        → ({'총보수': {'<=': 0.1}, '자산규모': {'>=': 100000}, 'leveraged': False}, '반도체 ETF')
+
+    Args:
+        text: 사용자 입력
+
+    Returns:
+        (조건 딕셔너리, 조건 문구를 제외한 나머지 문장)
+    """
+    conditions: Dict[str, Any] = {}
+    spans: List[Tuple[int, int]] = []
+
+    for match in _RANGE_PATTERN.finditer(text):
+        field = _RANGE_ALIASES[match.group(1)]
+        unit = match.group(3) or ''
+        scale = _UNIT_SCALES[field].get(unit)
+        if scale is None:
+            continue
+        value = float(match.group(2).replace(',', '')) * scale
+        conditions.setdefault(field, {})[_RANGE_WORDS[match.group(4)]] = value
+        spans.append(match.span())
+
+    for match in _VOLATILITY_PATTERN.finditer(text):
+        grade = match.group(1).replace(' ', '')
+        position = VOLATILITY_GRADES.index(grade)
+        if match.group(2) == '이하':
+            conditions['변동성'] = VOLATILITY_GRADES[:position + 1]
+        elif match.group(2) == '이상':
+            conditions['변동성'] = VOLATILITY_GRADES[position:]
+        else:
+            conditions['변동성'] = [grade]
+        spans.append(match.span())
+
+    for match in _FLAG_PATTERN.finditer(text):
+        conditions[_FLAG_ALIASES[match.group(1)]] = match.group(3) is not None
+        spans.append(match.span())
+
+    for match in _MANAGER_PATTERN.finditer(text):
+        if match.group(3):
+            manager = _MANAGER_BRANDS[match.group(3).upper()]
+        else:
+            manager = _MANAGER_NAMES[(match.group(1) or match.group(2)).upper()]
+        managers = conditions.setdefault('운용사', [])
+        if manager not in managers:
+            managers.append(manager)
+        spans.append(match.span())
+
+    remaining = text
+    for start, end in sorted(spans, reverse=True):
+        remaining = remaining[:start] + ' ' + remaining[end:]
+    remaining = ' '.join(remaining.replace(',', ' ').split())
+    return conditions, remaining
+
+
+def describe_conditions(conditions: Optional[Dict[str, Any]], config: Optional[Config] = None) -> str:
+    """
+    조건을 사람이 읽는 문장으로 변환
+
+    Args:
+        conditions: 조건 딕셔너리
+        config: 설정 (None이면 기본 Config)
+
+    Returns:
+        예: "총보수 0.1% 이하, 자산규모 1,000억원 이상, 레버리지 제외" (조건이 없으면 빈 문자열)
+    """
+    if not conditions:
+        return ""
+    config = config or Config()
+    words = {operator: word for word, operator in _RANGE_WORDS.items()}
+
+    parts = []
+    for field, condition in conditions.items():
+        if field in RANGE_FIELDS:
+            for operator, value in dict(condition).items():
+                if field == '총보수':
+                    amount = f"{value:g}%"
+                elif field == '자산규모':
+                    amount = f"{value / 1_000_000:g}조원" if value >= 1_000_000 else f"{value / 100:,.0f}억원"
+                elif field == '거래량':
+                    amount = f"{value:,.0f}주"
+                else:
+                    amount = f"{value:g}"
+                label = '위험등급' if field == 'risk_tier' else field
+                parts.append(f"{label} {amount} {words.get(operator, operator)}")
+        elif field in MEMBER_FIELDS:
+            values = [condition] if isinstance(condition, str) else list(condition)
+            parts.append(f"{field} {'/'.join(map(str, values))}")
+        else:
+            label = config.SCREEN_FLAG_LABELS.get(field, field)
+            parts.append(f"{label} {'만' if condition else '제외'}")
+    return ", ".join(parts)
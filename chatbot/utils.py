@@ -356,6 +356,24 @@ def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     
     return df
 
+def keyword_mask(df: pd.DataFrame, keyword: str, columns: List[str]) -> np.ndarray:
+    """
+    키워드 포함 여부 마스크 (행 복사 없이 위치 기준 불리언 배열)
+    
+    Args:
+        df: 검색할 DataFrame
+        keyword: 검색 키워드
+        columns: 검색할 컬럼들 (OR 조건)
+    
+    Returns:
+        (행 수,) 불리언 배열
+    """
+    mask = np.zeros(len(df), dtype=bool)
+    for col in columns:
+        if col in df.columns:
+            mask |= df[col].astype(str).str.contains(keyword, case=False, na=False).to_numpy(dtype=bool)
+    return mask
+
 def filter_dataframe_by_keyword(df: pd.DataFrame, keyword: str, columns: List[str]) -> pd.DataFrame:
     """
     키워드로 DataFrame 필터링
@@ -372,14 +390,7 @@ def filter_dataframe_by_keyword(df: pd.DataFrame, keyword: str, columns: List[st
         return df
     
     # 모든 지정된 컬럼에서 키워드 검색 (OR 조건)
-    mask = pd.Series([False] * len(df))
-    
-    for col in columns:
-        if col in df.columns:
-            col_mask = df[col].astype(str).str.contains(keyword, case=False, na=False)
-            mask = mask | col_mask
-    
-    return df[mask]
+    return df[keyword_mask(df, keyword, columns)]
 
 def calculate_percentage_change(current: float, previous: float) -> Optional[float]:
     """
@@ -1,56 +1,116 @@
 """
 ETF 점수 캐시 생성 스크립트
-- 모든 ETF에 대해 레벨별, 투자자 유형별 점수를 사전 계산
-- risk_tier 기반 레벨별 필터링 적용
-- 48,000개 조합 (995개 ETF × 3레벨 × 16유형) 캐시 생성
+- 모든 ETF에 대해 기본 점수, risk_tier, 8개 투자 차원 점수를 사전 계산
+- ETF별 1행의 팩터화된 캐시 생성 (약 1,000행)
+- 레벨별/투자자 유형별 최종 점수는 추천 엔진(ETFScoreIndex)이 조회 시점에
+  차원 점수 · 유형 가중치 내적과 risk_tier 레벨 마스크로 계산
 
 주요 기능:
 1. ETF 기본 정보 및 시세 데이터 로딩
-2. 개별 ETF 분석 및 기본 점수 계산
-3. 투자자 유형별 가중치 적용
-4. 레벨별 위험도 필터링
-5. 멀티스레딩을 통한 병렬 처리
-6. 캐시 파일 생성 및 저장
+2. ETF 일괄 분석(analyze_etfs_batch, 공유 인덱스) 및 기본 점수 계산
+3. 투자 차원 점수 계산 (ETF × 8 차원 점수 행렬)
+4. ETF 분석 병렬 처리 (스레드 풀 또는 공유 메모리 기반 프로세스 풀)
+5. 캐시 파일 원자적 게시 (임시 파일 + os.replace, 버전/스키마/입력 지문 매니페스트 동반)
+6. 카테고리 × 레벨 × 투자자 유형별 상위 K개 목록 사전 계산 (Config.CATEGORY_KEYWORDS)
+7. ETF별 입력 지문 기반 증분 빌드
+8. 단계별 성능 보고서 (벽시계/CPU 시간, 처리 행 수, 최대 RSS → etf_scores_cache.build.json,
+   --profile 로 cProfile/pyinstrument 함수 단위 프로파일 추가)
+9. 추천 다양성 재정렬용 ETF 유사 이웃(수익률 상관) 사전 계산 → etf_similarity.json
+
+사용법:
+    python scripts/precompute_etf_scores.py                          # 스레드 4개
+    python scripts/precompute_etf_scores.py --processes --workers 0  # 모든 CPU 코어 (프로세스 풀)
+    python scripts/precompute_etf_scores.py --incremental            # 바뀐 ETF만 다시 계산
+    python scripts/precompute_etf_scores.py --profile cprofile       # 함수 단위 프로파일 포함
 """
 
 import sys
 import os
 import time
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Any, Tuple, List
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import Dict, Any, Tuple, List, Optional
 
 # 프로젝트 루트 경로 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pandas as pd
 import numpy as np
-from chatbot.recommendation_engine import ETFRecommendationEngine
-from chatbot.etf_analysis import analyze_etf
+from chatbot.recommendation_engine import (
+    ETFRecommendationEngine, ETFScoreIndex, TopKViews, DIMENSION_COLUMNS
+)
+from chatbot.etf_analysis import analyze_etf, analyze_etfs_batch, ETFAnalysisIndex
 from chatbot.config import Config
+from chatbot.risk import RiskTierIndex
+from chatbot.parallel import SharedArrays, resolve_workers
+from chatbot.fingerprint import (
+    EMPTY_FINGERPRINT, group_fingerprints, combine_fingerprints, object_fingerprint
+)
+from chatbot.utils import normalize_etf_name
+from chatbot.cache_store import publish_cache, load_manifest
+from chatbot.profiling import StageProfiler, PROFILERS
+from chatbot.diversity import SimilarityIndex
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 캐시 계산 방식 버전 (점수 계산 로직/캐시 형식이 바뀌면 올려서 전체 재계산을 유도)
+CACHE_FORMAT_VERSION = 4
+
+# 워커 작업 1건당 ETF 수 (스레드/프로세스 공통)
+DEFAULT_BATCH_SIZE = 25
+
+# ETF별 기본 레코드 컬럼 (레벨/투자자 유형과 무관)
+BASE_COLUMNS = [
+    'ETF명', '종목코드', '분류체계', '기초지수',
+    'base_score', 'risk_tier',
+    '자산규모', '거래량', '변동성', '총보수',
+    '운용사', '복제방법'
+]
+
+# 프로세스 워커에 전달하는 공식 데이터 (부모가 로드한 DataFrame을 그대로 사용)
+WORKER_DATA_KEYS = ['info', 'performance', 'aum', 'reference', 'risk']
+
+# 캐시 파일 컬럼 (ETF별 1행, 팩터화된 형식)
+CACHE_COLUMNS = [
+    'ETF명', '종목코드', '분류체계', '기초지수',
+    'base_score', 'risk_tier',
+    *DIMENSION_COLUMNS,
+    '자산규모', '거래량', '변동성', '총보수',
+    '운용사', '복제방법'
+]
+
 class ETFCacheBuilder:
     """
     ETF 캐시 빌더 클래스
     
-    모든 ETF에 대해 사용자 레벨별, 투자자 유형별 점수를 사전 계산하여
-    추천 시스템의 응답 속도를 향상시키는 캐시를 생성합니다.
+    모든 ETF의 기본 점수와 투자 차원 점수를 사전 계산하여
+    추천 시스템의 응답 속도를 향상시키는 캐시(ETF별 1행)를 생성합니다.
     """
     
-    def __init__(self):
-        """캐시 빌더 초기화"""
+    def __init__(self, profiler: Optional[StageProfiler] = None):
+        """
+        캐시 빌더 초기화
+        
+        Args:
+            profiler: 단계별 성능 측정기 (None이면 새로 생성)
+        """
         self.config = Config()
         self.recommendation_engine = ETFRecommendationEngine()
+        self.profiler = profiler or StageProfiler()
         self.data = {}  # 로드된 데이터 저장
+        self.fingerprints = None  # 마지막 빌드의 입력 지문 (증분 빌드용)
         
-    def load_data(self):
+    def load_data(self, include_prices: bool = True):
         """
         모든 필요한 데이터 로드
         
+        Args:
+            include_prices: 시세 데이터 로드 여부 (프로세스 워커는 공유 메모리의 시세를 사용)
+        
         로드하는 데이터:
         - ETF 기본 정보 (종목명, 종목코드, 분류체계 등)
         - 시세 데이터 (수익률, 변동성 계산용)
@@ -73,6 +133,9 @@ class ETFCacheBuilder:
                 'risk': 'etf_risk'            # 위험도 데이터
             }
             
+            if not include_prices:
+                data_types.pop('prices')
+            
             # 각 데이터 타입별로 파일 로드
             for key, data_type in data_types.items():
                 file_path = self.config.get_data_path(data_type)
@@ -92,16 +155,20 @@ class ETFCacheBuilder:
                     logger.error(f"{key} 파일을 찾을 수 없습니다: {file_path}")
                     raise FileNotFoundError(f"Required file not found: {file_path}")
             
-            # Risk tier 데이터 로드 (위험도 분류 결과)
-            risk_tier_path = self.config.get_data_path('risk_tier')
-            if os.path.exists(risk_tier_path):
-                self.data['risk_tier'] = pd.read_csv(risk_tier_path, encoding='utf-8-sig')
-                # 날짜 컬럼을 datetime으로 변환
-                self.data['risk_tier']['basDt'] = pd.to_datetime(self.data['risk_tier']['basDt'])
-                logger.info(f"Risk tier 데이터 로딩 완료: {len(self.data['risk_tier'])}행")
+            # Risk tier 데이터 로드 (ETF별 최신 위험등급 스냅샷 → 딕셔너리 인덱스)
+            snapshot_path = self.config.get_data_path('risk_tier_latest')
+            history_path = self.config.get_risk_tier_history_path()
+            if os.path.exists(snapshot_path):
+                self.data['risk_tier'] = RiskTierIndex.from_file(snapshot_path)
+                logger.info(f"Risk tier 스냅샷 로딩 완료: {len(self.data['risk_tier'])}개 ETF")
+            elif os.path.exists(history_path):
+                # 스냅샷이 없으면 이력 파일에서 한 번만 최신 행을 추출
+                history = pd.read_csv(history_path, encoding='utf-8-sig', dtype={'srtnCd': str})
+                self.data['risk_tier'] = RiskTierIndex.from_history(history)
+                logger.info(f"Risk tier 이력에서 스냅샷 생성: {len(self.data['risk_tier'])}개 ETF")
             else:
-                logger.error(f"Risk tier 파일을 찾을 수 없습니다: {risk_tier_path}")
-                raise FileNotFoundError(f"Risk tier file not found: {risk_tier_path}")
+                logger.error(f"Risk tier 파일을 찾을 수 없습니다: {snapshot_path}")
+                raise FileNotFoundError(f"Risk tier file not found: {snapshot_path}")
             
         except Exception as e:
             logger.error(f"데이터 로딩 중 오류: {e}")
@@ -124,45 +191,39 @@ class ETFCacheBuilder:
                 - 4: 매우 위험
         """
         try:
-            # 해당 ETF의 risk_tier 데이터 조회
-            etf_risk_data = self.data['risk_tier'][
-                self.data['risk_tier']['srtnCd'].astype(str).str.strip() == str(etf_code).strip()
-            ]
-            
-            if etf_risk_data.empty:
-                return -1  # 측정불가
-            
-            # 최신 날짜의 risk_tier 반환
-            latest_data = etf_risk_data.loc[etf_risk_data['basDt'].idxmax()]
-            risk_tier = latest_data.get('risk_tier', -1)
-            
-            # 유효한 risk_tier 값 확인
-            if pd.isna(risk_tier) or not isinstance(risk_tier, (int, float)) or risk_tier < 0:
-                return -1
-            
-            return int(risk_tier)
+            return self.data['risk_tier'].get_tier(etf_code)
             
         except Exception as e:
             logger.warning(f"ETF {etf_code}의 risk_tier 조회 오류: {e}")
             return -1
 
-    def process_single_etf(self, etf_row: pd.Series) -> List[Dict[str, Any]]:
+    def analysis_index(self) -> ETFAnalysisIndex:
+        """
+        현재 로드된 데이터로 일괄 분석 인덱스 생성
+        
+        Returns:
+            ETFAnalysisIndex (종목명/공식 데이터 조회표 + 종목코드별 시세 구간)
+        """
+        return ETFAnalysisIndex(
+            self.data['prices'], self.data['info'],
+            self.data['performance'], self.data['aum'],
+            self.data['reference'], self.data['risk']
+        )
+
+    def process_single_etf(self, etf_row: pd.Series) -> Optional[Dict[str, Any]]:
         """
-        단일 ETF에 대한 모든 조합 처리
+        단일 ETF 분석 및 기본 레코드 생성
         
-        각 ETF에 대해 다음 조합을 생성:
-        - 3개 레벨 (Level 1, 2, 3)
-        - 16개 투자자 유형 (ARSB, ARSE, ..., IESE)
-        - 총 48개 조합 per ETF
+        투자 차원 점수는 build_cache에서 전체 ETF에 대해 행렬 연산으로 한 번에 계산합니다
+        (factorize_scores). 여러 ETF는 process_etf_batch를 사용하세요.
         
         Args:
             etf_row: ETF 기본 정보 (종목명, 종목코드 등)
         
         Returns:
-            처리된 레코드 리스트 (최대 48개)
+            기본 레코드 딕셔너리 (분석 실패시 None)
         """
         etf_name = etf_row['종목명']
-        etf_code = etf_row.get('단축코드', etf_row.get('종목코드', ''))
         
         try:
             # ETF 분석 수행 (기본 프로필 사용)
@@ -173,58 +234,94 @@ class ETFCacheBuilder:
                 self.data['performance'], self.data['aum'],
                 self.data['reference'], self.data['risk']
             )
-            
-            # 분석 실패시 빈 리스트 반환
-            if etf_info is None or (isinstance(etf_info, dict) and etf_info.get('설명')):
-                return []
-            
-            # 기본 점수 계산 (수익률, 비용, 유동성, 변동성 종합)
-            base_score = self._calculate_base_score(etf_info)
-            
-            # Risk tier 조회 (위험도 등급)
-            risk_tier = self.get_latest_risk_tier(etf_code)
-            
-            records = []
-            
-            # 모든 레벨과 투자자 유형 조합 생성
-            for level in [1, 2, 3]:
-                # 레벨별 risk_tier 제한 확인
-                risk_limit = self.config.get_risk_tier_limit(level)
-                
-                # risk_tier 필터링 적용
-                if risk_tier == -1:  # 측정불가
-                    # Level 1은 측정불가 제외, Level 2,3은 포함
-                    if level == 1:
-                        continue
-                    effective_score = base_score * 0.5 
-                elif risk_tier > risk_limit:
-                    # 해당 레벨 제한 초과시 제외
-                    continue
-                else:
-                    effective_score = base_score
-                
-                # 모든 투자자 유형에 대해 처리
-                for investor_type in self.config.INVESTOR_TYPE_WEIGHTS.keys():
-                    # 투자자 유형별 가중치 계산
-                    type_weight = self.recommendation_engine.calculate_type_weight_cache(
-                        etf_row, investor_type
-                    )
-                    
-                    # 최종 점수 계산
-                    final_score = effective_score * type_weight
-                    
-                    # 레코드 생성
-                    record = self._create_record(
-                        etf_row, etf_info, level, investor_type,
-                        base_score, type_weight, final_score, risk_tier
-                    )
-                    records.append(record)
-            
-            return records
+            return self._record_from_analysis(etf_row, etf_info)
             
         except Exception as e:
             logger.error(f"ETF {etf_name} 처리 중 오류: {e}")
-            return []
+            return None
+
+    def process_etf_batch(
+        self, etf_rows: pd.DataFrame, analysis_index: Optional[ETFAnalysisIndex] = None,
+        include_risk_tier: bool = True
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        여러 ETF 일괄 분석 및 기본 레코드 생성 (analyze_etfs_batch 사용)
+        
+        Args:
+            etf_rows: ETF 기본 정보 행들
+            analysis_index: 공유 분석 인덱스 (None이면 현재 데이터로 생성)
+            include_risk_tier: False면 risk_tier를 None으로 두고 조회하지 않음
+                               (build_cache는 별도 단계에서 assign_risk_tiers로 일괄 조회)
+        
+        Returns:
+            etf_rows 순서의 기본 레코드 리스트 (분석 실패한 ETF는 None)
+        """
+        index = analysis_index or self.analysis_index()
+        codes = [str(code) for code in etf_rows['종목코드']]
+        analyses = analyze_etfs_batch(codes, analysis_index=index)
+        
+        records = []
+        for code, (_, etf_row) in zip(codes, etf_rows.iterrows()):
+            try:
+                records.append(self._record_from_analysis(etf_row, analyses.get(code), include_risk_tier))
+            except Exception as e:
+                logger.error(f"ETF {etf_row['종목명']} 처리 중 오류: {e}")
+                records.append(None)
+        return records
+
+    def _record_from_analysis(
+        self, etf_row: pd.Series, etf_info: Optional[Dict[str, Any]], include_risk_tier: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """분석 결과로 기본 레코드 생성 (분석 실패시 None)"""
+        if etf_info is None or (isinstance(etf_info, dict) and etf_info.get('설명')):
+            return None
+        
+        etf_code = etf_row.get('단축코드', etf_row.get('종목코드', ''))
+        
+        # 기본 점수 계산 (수익률, 비용, 유동성, 변동성 종합)
+        base_score = self._calculate_base_score(etf_info)
+        
+        # Risk tier 조회 (위험도 등급)
+        risk_tier = self.get_latest_risk_tier(etf_code) if include_risk_tier else None
+        
+        return self._create_base_record(etf_row, etf_info, base_score, risk_tier)
+
+    def assign_risk_tiers(self, base_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        기본 레코드의 risk_tier를 최신 위험등급으로 채움
+        
+        Args:
+            base_df: 기본 레코드 DataFrame (include_risk_tier=False로 만든 레코드)
+        
+        Returns:
+            risk_tier가 채워진 DataFrame
+        """
+        base_df['risk_tier'] = [self.get_latest_risk_tier(code) for code in base_df['종목코드']]
+        return base_df
+
+    def factorize_scores(self, base_df: pd.DataFrame, etf_rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        기본 레코드에 투자 차원 점수를 붙여 팩터화된 캐시 생성
+        
+        레벨 × 투자자 유형 조합은 저장하지 않습니다. 조회 시점에 추천 엔진이
+        유효 기본 점수 × max(차원 점수 · 유형 가중치, 0.1)로 최종 점수를 계산합니다.
+        base_score는 반올림하지 않고 저장해 기존 조합 캐시와 같은 최종 점수를 재현합니다.
+        
+        Args:
+            base_df: ETF별 기본 레코드 DataFrame (process_single_etf 결과)
+            etf_rows: base_df와 같은 순서의 ETF 기본 정보 행 (차원 점수 계산용)
+        
+        Returns:
+            캐시 DataFrame (CACHE_COLUMNS)
+        """
+        dimension_scores = self.recommendation_engine.calculate_dimension_matrix(etf_rows)
+        
+        cache_df = base_df.reset_index(drop=True).copy()
+        cache_df['risk_tier'] = cache_df['risk_tier'].astype(int)
+        for i, column in enumerate(DIMENSION_COLUMNS):
+            cache_df[column] = dimension_scores[:, i]
+        
+        return cache_df[CACHE_COLUMNS]
 
     def _calculate_base_score(self, etf_info: Dict[str, Any]) -> float:
         """
@@ -345,32 +442,24 @@ class ETFCacheBuilder:
         }
         return grade_scores.get(volatility, 0.6)
 
-    def _create_record(
+    def _create_base_record(
         self, 
         etf_row: pd.Series, 
         etf_info: Dict[str, Any],
-        level: int, 
-        investor_type: str,
         base_score: float, 
-        type_weight: float, 
-        final_score: float,
         risk_tier: int
     ) -> Dict[str, Any]:
         """
-        캐시 레코드 생성
+        ETF별 기본 레코드 생성 (레벨/투자자 유형과 무관한 값)
         
         Args:
             etf_row: ETF 기본 정보
             etf_info: ETF 분석 정보
-            level: 사용자 레벨
-            investor_type: 투자자 유형
             base_score: 기본 점수
-            type_weight: 유형별 가중치
-            final_score: 최종 점수
             risk_tier: 위험도 등급
         
         Returns:
-            캐시 레코드 딕셔너리
+            기본 레코드 딕셔너리
         """
         return {
             # ETF 기본 정보
@@ -379,102 +468,618 @@ class ETFCacheBuilder:
             '분류체계': etf_row.get('분류체계', ''),
             '기초지수': etf_row.get('기초지수', ''),
             
-            # 사용자 프로필
-            'level': level,
-            'investor_type': investor_type,
-            
             # 점수 정보
-            'base_score': round(base_score, 4),
-            'type_weight': round(type_weight, 4),
-            'final_score': round(final_score, 4),
+            'base_score': base_score,
             'risk_tier': risk_tier,
             
             # 추가 메타데이터 (추천 시 참고용)
-            '자산규모': etf_info.get('자산규모/유동성', {}).get('자산규모'),
+            '자산규모': etf_info.get('자산규모/유동성', {}).get('평균 순자산총액'),  # 백만원
             '거래량': etf_info.get('자산규모/유동성', {}).get('평균 거래량'),
             '변동성': etf_info.get('위험', {}).get('변동성'),
             '총보수': etf_info.get('수익률/보수', {}).get('총 보수'),
+            
+            # 조건 검색용 (운용사, 합성/액티브 여부)
+            '운용사': etf_row.get('운용사', ''),
+            '복제방법': etf_row.get('복제방법', ''),
         }
 
-    def build_cache(self, max_workers: int = 4) -> pd.DataFrame:
+    def build_cache(
+        self,
+        max_workers: int = 4,
+        use_processes: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        incremental: bool = False
+    ) -> pd.DataFrame:
         """
-        ETF 캐시 빌드 (멀티스레딩 사용)
+        ETF 캐시 빌드
+        
+        1단계에서 ETF 배치별 일괄 분석(공유 인덱스)과 기본 점수를 병렬로 계산하고,
+        2단계에서 전체 ETF의 투자 차원 점수를 행렬 연산으로 한 번에 계산합니다.
         
-        모든 ETF에 대해 병렬로 점수를 계산하여 캐시를 생성합니다.
+        증분 모드에서는 ETF별 입력 지문(시세 행, 공식 데이터 행, risk tier)을 이전 빌드와
+        비교해 바뀐 ETF만 다시 계산하고 기존 캐시에 병합합니다. CACHE_FORMAT_VERSION이
+        바뀌었거나 이전 지문/캐시가 없으면 전체를 다시 계산합니다.
+        (투자자 유형 가중치와 레벨별 risk tier 제한은 조회 시점에 적용되므로 재계산 불필요)
         
         Args:
-            max_workers: 최대 워커 수 (CPU 코어 수에 따라 조정)
+            max_workers: 최대 워커 수 (CPU 코어 수에 따라 조정, 프로세스 모드에서 0이면 코어 수)
+            use_processes: True면 프로세스 풀 사용 (시세는 공유 메모리로 전달),
+                           False면 스레드 풀 사용
+            batch_size: 워커 작업 1건당 ETF 수
+            incremental: True면 지문이 바뀐 ETF만 다시 계산
         
         Returns:
             완성된 캐시 DataFrame
         """
         logger.info("ETF 캐시 빌드 시작")
         start_time = time.time()
+        profiler = self.profiler
         
         # ETF 목록 준비
         etf_list = self.data['info'].copy()
-        total_etfs = len(etf_list)
         
-        all_records = []
+        # 입력 지문 계산 (save_cache에서 함께 저장)
+        with profiler.stage('fingerprints', rows=len(etf_list)):
+            global_fp, etf_fps = self.compute_fingerprints(etf_list)
+            self.fingerprints = {'global': global_fp, 'etfs': etf_fps}
+        
+        targets = list(range(len(etf_list)))
+        previous_cache = None
+        if incremental:
+            with profiler.stage('incremental_plan', rows=len(etf_list)):
+                plan = self._plan_incremental(etf_list, global_fp, etf_fps)
+            if plan is not None:
+                targets, previous_cache = plan
+        
+        # 1단계: ETF별 분석 및 기본 점수
+        with profiler.stage('analysis', rows=len(targets)) as stage:
+            if not targets:
+                positions, base_df = [], pd.DataFrame(columns=BASE_COLUMNS)
+            elif use_processes:
+                positions, base_df = self._analyze_with_processes(
+                    etf_list, targets, max_workers, batch_size, start_time
+                )
+            else:
+                positions, base_df = self._analyze_with_threads(
+                    etf_list, targets, max_workers, batch_size, start_time
+                )
+            stage.result['succeeded'] = len(positions)
+        
+        # 위험등급 조회
+        with profiler.stage('risk_tier', rows=len(base_df)):
+            base_df = self.assign_risk_tiers(base_df)
+        
+        # 2단계: 투자 차원 점수 (행렬 연산, ETF 원래 순서 유지)
+        with profiler.stage('dimension_scores', rows=len(positions)):
+            cache_df = self.factorize_scores(base_df, etf_list.iloc[positions])
+        logger.info(f"차원 점수 계산 완료: {len(cache_df)}개 ETF")
+        
+        # 증분 모드: 변경되지 않은 ETF의 기존 레코드와 병합
+        if previous_cache is not None:
+            with profiler.stage('merge', rows=len(previous_cache)) as stage:
+                cache_df = self._merge_cache(previous_cache, cache_df, etf_list)
+                stage.rows = len(cache_df)
+        
+        # 통계 출력
+        elapsed_time = time.time() - start_time
+        logger.info(f"캐시 빌드 완료: {len(cache_df)}개 레코드, {elapsed_time:.1f}초 소요")
+        logger.info(f"Risk tier별 분포: {cache_df['risk_tier'].value_counts().to_dict()}")
+        
+        return cache_df
+
+    # =========================================================================
+    # 입력 지문 / 증분 빌드
+    # =========================================================================
+
+    @staticmethod
+    def _etf_key(etf_row: pd.Series) -> str:
+        """캐시의 종목코드 값과 같은 ETF 식별 키"""
+        return str(etf_row.get('단축코드', etf_row.get('종목코드', '')))
+
+    def compute_fingerprints(self, etf_list: pd.DataFrame) -> Tuple[str, Dict[str, str]]:
+        """
+        전역 지문 및 ETF별 입력 지문 계산
+        
+        ETF별 지문은 해당 ETF의 점수에 영향을 주는 입력만 포함합니다.
+        - 기본 정보 행 (차원 점수, 메타데이터)
+        - 시세 행 (analyze_etf가 조회하는 종목코드 기준)
+        - 성과/자산규모/참고지수/위험도 행 (종목명 기준)
+        - 최신 risk tier 스냅샷 항목
+        
+        전역 지문은 캐시 계산 버전만 포함합니다. 투자자 유형 가중치와 레벨별 risk tier 제한은
+        조회 시점에 적용되므로 바뀌어도 캐시를 다시 만들 필요가 없습니다.
+        
+        Args:
+            etf_list: ETF 기본 정보 DataFrame
+        
+        Returns:
+            (전역 지문, 종목코드 → ETF 지문)
+        """
+        global_fp = object_fingerprint({'version': CACHE_FORMAT_VERSION})
+        
+        prices = self.data['prices']
+        price_fps = group_fingerprints(prices, prices['srtnCd'].astype(str))
+        official_fps = {
+            key: group_fingerprints(self.data[key], self.data[key]['종목명'].map(normalize_etf_name))
+            for key in ['performance', 'aum', 'reference', 'risk']
+            if '종목명' in self.data[key].columns
+        }
+        row_fps = group_fingerprints(etf_list, pd.Series(range(len(etf_list)), index=etf_list.index))
+        code_by_name = exact_code_map(self.data['info'])
+        
+        etf_fps = {}
+        for position, (_, row) in enumerate(etf_list.iterrows()):
+            key = self._etf_key(row)
+            name = normalize_etf_name(row['종목명'])
+            tier_entry = self.data['risk_tier'].get(key)
+            etf_fps[key] = combine_fingerprints(
+                row_fps.get(str(position), EMPTY_FINGERPRINT),
+                price_fps.get(code_by_name.get(name, ''), EMPTY_FINGERPRINT),
+                *[official_fps[k].get(name, EMPTY_FINGERPRINT) for k in sorted(official_fps)],
+                json.dumps(tier_entry, sort_keys=True, ensure_ascii=False, default=str)
+            )
+        
+        return global_fp, etf_fps
+
+    def load_fingerprints(self) -> Optional[Dict[str, Any]]:
+        """
+        이전 빌드의 입력 지문 로드 (캐시 매니페스트에 저장됨)
+        
+        Returns:
+            {'global': 전역 지문, 'etfs': {종목코드: 지문}} 또는 None (없거나 읽기 실패)
+        """
+        manifest = load_manifest(self.config.get_data_path('cache_manifest'))
+        if not manifest or not manifest.get('fingerprints'):
+            return None
+        return manifest['fingerprints']
+
+    def _plan_incremental(
+        self, etf_list: pd.DataFrame, global_fp: str, etf_fps: Dict[str, str]
+    ) -> Optional[Tuple[List[int], pd.DataFrame]]:
+        """
+        증분 빌드 계획 수립
+        
+        Args:
+            etf_list: ETF 기본 정보 DataFrame
+            global_fp: 현재 전역 지문
+            etf_fps: 현재 ETF별 지문
+        
+        Returns:
+            (다시 계산할 ETF 위치 리스트, 유지할 기존 캐시 레코드) 또는 None (전체 재계산)
+        """
+        previous = self.load_fingerprints()
+        cache_path = self.config.get_data_path('cache')
+        
+        if previous is None or not os.path.exists(cache_path):
+            logger.info("이전 지문/캐시가 없어 전체 계산을 수행합니다.")
+            return None
+        if previous.get('global') != global_fp:
+            logger.info("캐시 계산 버전이 바뀌어 전체 계산을 수행합니다.")
+            return None
+        
+        try:
+            # round_trip: 유지하는 레코드의 실수 값이 전체 재계산 결과와 비트 단위로 같도록 읽음
+            previous_cache = pd.read_csv(
+                cache_path, encoding='utf-8-sig', dtype={'종목코드': str}, float_precision='round_trip'
+            )
+        except Exception as e:
+            logger.warning(f"기존 캐시 로드 실패, 전체 계산을 수행합니다: {e}")
+            return None
+        
+        previous_fps = previous.get('etfs', {})
+        targets = [
+            position for position, (_, row) in enumerate(etf_list.iterrows())
+            if previous_fps.get(self._etf_key(row)) != etf_fps[self._etf_key(row)]
+        ]
+        
+        # 바뀐 ETF와 목록에서 빠진 ETF의 기존 레코드 제거
+        changed = {self._etf_key(etf_list.iloc[pos]) for pos in targets}
+        keep = previous_cache['종목코드'].isin(set(etf_fps) - changed)
+        removed = set(previous_cache['종목코드']) - set(etf_fps)
+        
+        logger.info(f"증분 빌드: 전체 {len(etf_list)}개 중 {len(targets)}개 ETF 재계산, "
+                    f"목록에서 빠진 ETF {len(removed)}개 제거")
+        return targets, previous_cache[keep]
+
+    def _merge_cache(
+        self, previous_cache: pd.DataFrame, new_cache: pd.DataFrame, etf_list: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        유지할 기존 레코드와 새로 계산한 레코드를 ETF 목록 순서로 병합
+        
+        Args:
+            previous_cache: 유지할 기존 캐시 레코드
+            new_cache: 새로 계산한 캐시 레코드
+            etf_list: ETF 기본 정보 DataFrame (정렬 기준)
+        
+        Returns:
+            병합된 캐시 DataFrame (CACHE_COLUMNS)
+        """
+        order = {self._etf_key(row): pos for pos, (_, row) in enumerate(etf_list.iterrows())}
+        parts = [df for df in [previous_cache[CACHE_COLUMNS], new_cache] if not df.empty]
+        if not parts:
+            return new_cache
+        merged = pd.concat(parts, ignore_index=True)
+        rank = merged['종목코드'].astype(str).map(order)
+        return merged.iloc[np.argsort(rank.to_numpy(), kind='stable')].reset_index(drop=True)
+
+    def _log_progress(self, completed: int, previous: int, total: int, start_time: float):
+        """진행률 출력 (50개 단위를 넘을 때마다)"""
+        if completed // 50 > previous // 50:
+            progress = (completed / total) * 100
+            elapsed = time.time() - start_time
+            logger.info(f"진행률: {progress:.1f}% ({completed}/{total}) - {elapsed:.1f}초 경과")
+
+    def _analyze_with_threads(
+        self, etf_list: pd.DataFrame, targets: List[int], max_workers: int,
+        batch_size: int, start_time: float
+    ) -> Tuple[List[int], pd.DataFrame]:
+        """
+        공유 분석 인덱스 + 스레드 풀로 ETF 배치별 기본 레코드 계산
+        
+        분석 인덱스(종목명/공식 데이터 조회표, 종목코드별 시세 구간)는 한 번만 만들고
+        모든 배치가 읽기 전용으로 공유합니다.
+        
+        Args:
+            etf_list: ETF 기본 정보 DataFrame
+            targets: 계산할 ETF의 etf_list 내 위치 리스트
+            max_workers: 스레드 수
+            batch_size: 작업 1건당 ETF 수
+            start_time: 빌드 시작 시각 (진행률 출력용)
+        
+        Returns:
+            (성공한 ETF의 etf_list 내 위치 리스트, 기본 레코드 DataFrame)
+        """
+        total_etfs = len(targets)
+        batch_size = max(1, batch_size)
+        batches = [targets[start:start + batch_size] for start in range(0, total_etfs, batch_size)]
+        
+        with self.profiler.stage('analysis_index', rows=len(self.data['prices'])):
+            analysis_index = self.analysis_index()
+        
+        base_records = {}
         completed = 0
         
-        # 멀티스레딩으로 처리
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 모든 ETF에 대해 작업 제출
-            future_to_etf = {
-                executor.submit(self.process_single_etf, row): idx 
-                for idx, (_, row) in enumerate(etf_list.iterrows())
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            # ETF 배치 단위로 작업 제출
+            future_to_batch = {
+                executor.submit(self.process_etf_batch, etf_list.iloc[batch], analysis_index, False): batch
+                for batch in batches
             }
             
             # 결과 수집
-            for future in as_completed(future_to_etf):
+            for future in as_completed(future_to_batch):
+                batch = future_to_batch[future]
                 try:
-                    records = future.result()
-                    all_records.extend(records)
-                    completed += 1
-                    
-                    # 진행률 출력 (50개마다)
-                    if completed % 50 == 0:
-                        progress = (completed / total_etfs) * 100
-                        elapsed = time.time() - start_time
-                        logger.info(f"진행률: {progress:.1f}% ({completed}/{total_etfs}) - {elapsed:.1f}초 경과")
-                        
+                    for position, record in zip(batch, future.result()):
+                        if record is not None:
+                            base_records[position] = record
                 except Exception as e:
-                    logger.error(f"ETF 처리 중 오류: {e}")
-                    completed += 1
+                    logger.error(f"ETF 배치 처리 중 오류: {e}")
+                completed += len(batch)
+                self._log_progress(completed, completed - len(batch), total_etfs, start_time)
         
-        # DataFrame 생성
-        cache_df = pd.DataFrame(all_records)
+        positions = sorted(base_records)
+        base_df = pd.DataFrame([base_records[pos] for pos in positions], columns=BASE_COLUMNS)
+        return positions, base_df
+
+    def _analyze_with_processes(
+        self, etf_list: pd.DataFrame, targets: List[int], max_workers: int,
+        batch_size: int, start_time: float
+    ) -> Tuple[List[int], pd.DataFrame]:
+        """
+        프로세스 풀로 ETF별 기본 레코드 계산
         
-        # 통계 출력
-        elapsed_time = time.time() - start_time
-        logger.info(f"캐시 빌드 완료: {len(cache_df)}개 레코드, {elapsed_time:.1f}초 소요")
-        logger.info(f"레벨별 분포: {cache_df['level'].value_counts().to_dict()}")
-        logger.info(f"Risk tier별 분포: {cache_df['risk_tier'].value_counts().to_dict()}")
+        - 시세 데이터는 종목코드 순으로 정렬해 공유 메모리에 올리고,
+          워커에는 공유 메모리 이름과 종목코드별 (시작, 끝) 위치만 전달
+        - 작은 공식 데이터(기본정보/성과/자산규모/참고지수/위험도)와 설정은 부모가 로드한 것을
+          워커 초기화 인자로 한 번만 전달 (워커가 파일을 다시 읽지 않으므로 빌드 중 파일이 바뀌어도 일관됨,
+          risk tier는 부모가 assign_risk_tiers로 조회하므로 전달하지 않음)
+        - ETF 배치는 종목코드 목록으로 나누고, 결과는 종목코드가 붙은 컬럼 단위 청크로 받아 합침
         
-        return cache_df
+        Args:
+            etf_list: ETF 기본 정보 DataFrame (self.data['info'] 사본)
+            targets: 계산할 ETF의 etf_list 내 위치 리스트
+            max_workers: 프로세스 수 (0 이하면 CPU 코어 수)
+            batch_size: 작업 1건당 ETF 수
+            start_time: 빌드 시작 시각 (진행률 출력용)
+        
+        Returns:
+            (성공한 ETF의 etf_list 내 위치 리스트, 기본 레코드 DataFrame)
+        """
+        n_workers = resolve_workers(max_workers)
+        total_etfs = len(targets)
+        batch_size = max(1, batch_size)
+        
+        # 종목코드 → etf_list 내 위치 (종목코드가 중복된 행은 첫 행만 계산)
+        codes = etf_list['종목코드'].astype(str).tolist()
+        position_by_code = {}
+        for position in targets:
+            position_by_code.setdefault(codes[position], position)
+        target_codes = list(position_by_code)
+        if len(target_codes) < total_etfs:
+            logger.warning(f"종목코드가 중복된 ETF {total_etfs - len(target_codes)}개는 첫 행만 계산합니다.")
+            total_etfs = len(target_codes)
+        batches = [target_codes[start:start + batch_size] for start in range(0, len(target_codes), batch_size)]
+        
+        chunks = []
+        completed = 0
+        worker_data = {key: self.data[key] for key in WORKER_DATA_KEYS}
+        
+        shared_prices, offsets = share_prices(self.data['prices'])
+        with shared_prices:
+            logger.info(f"프로세스 풀 시작: 워커 {n_workers}개, 배치 {len(batches)}개 "
+                        f"(시세 {len(shared_prices['clpr'])}행 공유 메모리)")
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_build_worker,
+                initargs=(shared_prices.spec, offsets, worker_data, self.config)
+            ) as executor:
+                futures = {executor.submit(_process_batch, batch): len(batch) for batch in batches}
+                
+                # 완료되는 배치부터 컬럼 청크 수집
+                for future in as_completed(futures):
+                    try:
+                        chunks.append(future.result())
+                    except Exception as e:
+                        logger.error(f"ETF 배치 처리 중 오류: {e}")
+                    completed += futures[future]
+                    self._log_progress(completed, completed - futures[future], total_etfs, start_time)
+        
+        # 컬럼 청크 병합 후 ETF 원래 순서로 정렬 (종목코드 → 부모 etf_list 내 위치)
+        columns = {
+            column: [value for chunk in chunks for value in chunk[column]]
+            for column in ['code'] + BASE_COLUMNS
+        }
+        columns['position'] = [position_by_code[code] for code in columns.pop('code')]
+        base_df = pd.DataFrame(columns, columns=['position'] + BASE_COLUMNS)
+        base_df = base_df.sort_values('position', kind='stable').reset_index(drop=True)
+        positions = base_df.pop('position').astype(int).tolist()
+        return positions, base_df
+
+    def build_topk_views(self, cache_df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        카테고리 키워드(+ 전체) × 레벨 × 투자자 유형별 상위 K개 목록 계산
+        
+        Args:
+            cache_df: 완성된 캐시 DataFrame (팩터화된 형식)
+        
+        Returns:
+            TopKViews.to_dict() 형식의 딕셔너리 (캐시 행 위치 목록)
+        """
+        with self.profiler.stage('topk_views', rows=len(cache_df)) as stage:
+            views = TopKViews.build(
+                ETFScoreIndex(cache_df, self.config),
+                self.config.CATEGORY_KEYWORDS,
+                self.config.TOPK_VIEW_SIZE
+            )
+            n_lists = sum(len(profiles) for profiles in views.views.values())
+            stage.result['lists'] = n_lists
+        logger.info(f"상위 {views.k}개 목록 계산 완료: 카테고리 {len(views.views)}개, 목록 {n_lists}개")
+        return views.to_dict()
 
     def save_cache(self, cache_df: pd.DataFrame):
         """
-        캐시를 파일로 저장
+        캐시를 원자적으로 게시 (CSV 교체 후 매니페스트 교체)
+        
+        서비스 중인 조회기(CacheStore)는 매니페스트가 바뀐 뒤에 새 버전으로 교체하므로,
+        빌드 중이거나 쓰기 도중인 파일을 읽지 않습니다.
         
         Args:
             cache_df: 저장할 캐시 DataFrame
         """
         cache_path = self.config.get_data_path('cache')
+        manifest_path = self.config.get_data_path('cache_manifest')
+        topk_path = self.config.get_data_path('cache_topk')
         
         try:
-            cache_df.to_csv(cache_path, index=False, encoding='utf-8-sig')
+            topk_views = self.build_topk_views(cache_df)
+            with self.profiler.stage('write_cache', rows=len(cache_df)):
+                manifest = publish_cache(
+                    cache_df, cache_path, manifest_path,
+                    version=CACHE_FORMAT_VERSION, fingerprints=self.fingerprints,
+                    topk_views=topk_views, topk_path=topk_path
+                )
+            self.profiler.metadata.update({
+                'cache_version': CACHE_FORMAT_VERSION,
+                'cache_rows': len(cache_df),
+                'cache_sha256': manifest['sha256']
+            })
             logger.info(f"캐시 저장 완료: {cache_path} ({len(cache_df)}개 레코드)")
             
             # 파일 크기 출력
             file_size = os.path.getsize(cache_path) / (1024 * 1024)  # MB
             logger.info(f"파일 크기: {file_size:.1f} MB")
+            logger.info(f"매니페스트 저장: {manifest_path} (빌드 {manifest['built_at']}, "
+                        f"sha256 {manifest['sha256'][:12]})")
             
         except Exception as e:
             logger.error(f"캐시 저장 중 오류: {e}")
             raise
 
+    def save_similarity(self):
+        """
+        추천 다양성 재정렬용 유사 이웃 계산 및 저장
+        
+        시세 데이터만 사용하고 계산이 가벼우므로 증분 빌드에서도 전체를 다시 계산합니다.
+        실패해도 캐시는 그대로 사용할 수 있으므로 경고만 남깁니다.
+        """
+        path = self.config.get_data_path('cache_similarity')
+        try:
+            with self.profiler.stage('similarity', rows=len(self.data['prices'])) as stage:
+                similarity = SimilarityIndex.build(self.data['prices'], self.config.SIMILARITY_SETTINGS)
+                similarity.save(path)
+                stage.result['etfs_with_neighbours'] = len(similarity)
+            logger.info(f"유사 이웃 저장 완료: {path} (이웃이 있는 ETF {len(similarity)}개)")
+        except Exception as e:
+            logger.warning(f"유사 이웃 계산 실패 (다양성 재정렬 없이 서비스됩니다): {e}")
+
+
+# =============================================================================
+# 프로세스 풀 워커
+# =============================================================================
+
+def exact_code_map(info: pd.DataFrame) -> Dict[str, str]:
+    """
+    정규화된 종목명 → 종목코드 조회표
+    
+    analyze_etf의 정확 매칭 규칙(정규화된 종목명이 같은 첫 행)과 같은 종목코드를 반환하므로,
+    ETF 목록의 종목명으로 analyze_etf가 시세를 조회할 종목코드를 미리 알 수 있습니다.
+    """
+    code_by_name = {}
+    for name, code in zip(info['종목명'].map(normalize_etf_name), info['종목코드'].astype(str)):
+        code_by_name.setdefault(name, code)
+    return code_by_name
+
+
+def share_prices(prices: pd.DataFrame) -> Tuple[SharedArrays, Dict[str, Tuple[int, int]]]:
+    """
+    시세 데이터를 종목코드 순으로 정렬해 공유 메모리에 올림
+    
+    analyze_etf가 사용하는 컬럼(basDt, clpr)만 공유하며, 같은 종목 안의 원래 행 순서는
+    유지합니다 (stable 정렬).
+    
+    Args:
+        prices: 시세 DataFrame
+    
+    Returns:
+        (공유 배열, 종목코드 → (시작 행, 끝 행) 딕셔너리)
+    """
+    keys = prices['srtnCd'].astype(str).to_numpy()
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    
+    if len(sorted_keys):
+        starts = np.r_[0, np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1]
+    else:
+        starts = np.zeros(0, dtype=np.int64)
+    ends = np.r_[starts[1:], len(sorted_keys)]
+    offsets = {str(sorted_keys[s]): (int(s), int(e)) for s, e in zip(starts, ends)}
+    
+    arrays = {
+        'basDt': np.array(prices['basDt'].astype(str).to_numpy()[order], dtype=str),
+        'clpr': pd.to_numeric(prices['clpr'], errors='coerce').to_numpy(dtype=float)[order],
+    }
+    return SharedArrays.create(arrays), offsets
+
+
+# 워커 프로세스 상태 (initializer가 설정)
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_build_worker(spec, offsets: Dict[str, Tuple[int, int]], data: Dict[str, pd.DataFrame], config: Config):
+    """
+    워커 초기화: 부모가 로드한 공식 데이터/설정 사용, 시세는 공유 메모리에 연결
+    
+    Args:
+        spec: 공유 시세 배열 명세
+        offsets: 종목코드 → (시작 행, 끝 행)
+        data: 부모의 공식 데이터 (WORKER_DATA_KEYS)
+        config: 부모의 설정
+    """
+    builder = ETFCacheBuilder()
+    builder.config = config
+    builder.data = dict(data)
+    
+    info = builder.data['info']
+    row_by_code = {}
+    for position, code in enumerate(info['종목코드'].astype(str)):
+        row_by_code.setdefault(code, position)
+    
+    _worker_state.update({
+        'builder': builder,
+        'prices': SharedArrays.attach(spec),
+        'offsets': offsets,
+        'row_by_code': row_by_code,
+        'code_by_name': exact_code_map(info),
+    })
+
+
+def _slice_prices(codes: List[str]) -> pd.DataFrame:
+    """공유 시세에서 지정 종목들의 행만 꺼내 DataFrame 구성"""
+    prices = _worker_state['prices']
+    offsets = _worker_state['offsets']
+    spans = [(code, offsets[code]) for code in dict.fromkeys(codes) if code in offsets]
+    if not spans:
+        return pd.DataFrame({'srtnCd': [], 'basDt': [], 'clpr': []})
+    
+    index = np.concatenate([np.arange(start, end) for _, (start, end) in spans])
+    return pd.DataFrame({
+        'srtnCd': np.repeat([code for code, _ in spans], [end - start for _, (start, end) in spans]),
+        'basDt': prices['basDt'][index],
+        'clpr': prices['clpr'][index],
+    })
+
+
+def _process_batch(etf_codes: List[str]) -> Dict[str, list]:
+    """
+    워커 작업: ETF 배치의 기본 레코드를 컬럼 단위로 계산
+    
+    Args:
+        etf_codes: 종목코드 리스트
+    
+    Returns:
+        컬럼명 → 값 리스트 (code + BASE_COLUMNS, code는 요청한 종목코드)
+    """
+    builder = _worker_state['builder']
+    code_by_name = _worker_state['code_by_name']
+    row_by_code = _worker_state['row_by_code']
+    codes = [code for code in etf_codes if code in row_by_code]
+    rows = builder.data['info'].iloc[[row_by_code[code] for code in codes]]
+    
+    # 배치에 필요한 종목의 시세만 공유 메모리에서 꺼냄
+    price_codes = codes + [code_by_name.get(normalize_etf_name(name), '') for name in rows['종목명']]
+    builder.data['prices'] = _slice_prices(price_codes)
+    
+    chunk = {column: [] for column in ['code'] + BASE_COLUMNS}
+    for code, record in zip(codes, builder.process_etf_batch(rows, include_risk_tier=False)):
+        if record is None:
+            continue
+        chunk['code'].append(code)
+        for column in BASE_COLUMNS:
+            chunk[column].append(record[column])
+    return chunk
+
+
+def parse_arguments():
+    """
+    명령행 인수 파싱
+    
+    Returns:
+        argparse.Namespace: 파싱된 인수들
+    """
+    parser = argparse.ArgumentParser(description='ETF 점수 캐시 생성')
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='병렬 워커 수 (기본: 4, 프로세스 모드에서 0이면 CPU 코어 수)'
+    )
+    parser.add_argument(
+        '--processes',
+        action='store_true',
+        help='스레드 대신 프로세스 풀 사용 (시세 데이터는 공유 메모리로 전달)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='입력 지문이 바뀐 ETF만 다시 계산하여 기존 캐시에 병합'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f'워커 작업 1건당 ETF 수 (기본: {DEFAULT_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--profile',
+        choices=PROFILERS,
+        default=None,
+        help='함수 단위 프로파일 저장 (단계별 성능 보고서 옆에 .prof / .html, 프로세스 워커 내부 제외)'
+    )
+    
+    return parser.parse_args()
 
 def main():
     """
@@ -484,27 +1089,48 @@ def main():
     1. 데이터 로딩
     2. 캐시 빌드
     3. 결과 저장
+    4. 단계별 성능 보고서 저장
     
     Returns:
         0: 성공, 1: 실패
     """
+    args = parse_arguments()
+    
     print("=" * 60)
     print("ETF 점수 캐시 생성 시작")
     print("=" * 60)
     
     try:
-        # 캐시 빌더 초기화
-        builder = ETFCacheBuilder()
+        # 캐시 빌더 초기화 (단계별 성능 측정)
+        profiler = StageProfiler(capture=args.profile)
+        profiler.metadata['args'] = vars(args)
+        builder = ETFCacheBuilder(profiler)
+        profiler.start_capture()
         
         # 데이터 로딩
-        builder.load_data()
+        with profiler.stage('load_data') as stage:
+            builder.load_data()
+            stage.rows = sum(len(df) for key, df in builder.data.items() if key != 'risk_tier')
         
-        # 캐시 빌드 (4개 워커로 병렬 처리)
-        cache_df = builder.build_cache(max_workers=4)
+        # 캐시 빌드 (스레드 풀 또는 프로세스 풀로 병렬 처리)
+        cache_df = builder.build_cache(
+            max_workers=args.workers,
+            use_processes=args.processes,
+            batch_size=args.batch_size,
+            incremental=args.incremental
+        )
         
         # 캐시 저장
         builder.save_cache(cache_df)
         
+        # 다양성 재정렬용 유사 이웃
+        builder.save_similarity()
+        
+        # 단계별 성능 보고서 저장 (캐시 옆, 빌드 이력에 요약 1줄 추가)
+        report_path = builder.config.get_data_path('cache_build_report')
+        profiler.stop_capture(os.path.splitext(report_path)[0])
+        profiler.write_report(report_path, builder.config.get_data_path('cache_build_history'))
+        
         print("=" * 60)
         print("ETF 점수 캐시 생성 완료!")
         print("=" * 60)